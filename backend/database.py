@@ -1,34 +1,427 @@
-import motor.motor_asyncio
+import base64
+import hashlib
+import json
 import os
 from dotenv import load_dotenv
 from bson import ObjectId
-from datetime import datetime
+from bson.errors import InvalidId
+from datetime import datetime, timedelta
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.errors import DuplicateKeyError, OperationFailure
 import logging
+from backend.utils.metrics import OPERATION_SECONDS
+from backend.utils.risk_bands import RISKY_SCORE
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/privacypulse")
-client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URI)
-db = client.get_default_database()
+
+class _LazyDatabase:
+    """The default database of MONGO_URI; motor is imported and the client built on first use."""
+
+    def __init__(self, uri: str):
+        self._uri = uri
+        self._db = None
+
+    def _get(self):
+        if self._db is None:
+            import motor.motor_asyncio
+            self._db = motor.motor_asyncio.AsyncIOMotorClient(self._uri).get_default_database()
+        return self._db
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def __getitem__(self, name):
+        return self._get()[name]
+
+db = _LazyDatabase(MONGO_URI)
+
+# Left out of history queries unless asked for; policy text lives in `policy_texts`
+HEAVY_FIELDS = ("raw_policy_text", "policy_changes", "policy_passages", "rolled_up")
+HISTORY_PROJECTION = {field: 0 for field in HEAVY_FIELDS}
+HISTORY_SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
+MAX_PAGE_SIZE = 200
+
+SCAN_INDEXES = [
+    [("created_at", DESCENDING), ("_id", DESCENDING)],
+    [("url", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+    [("classification", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+    [("geo.country", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+]
+
+# Persistent summaries are deleted this long after they were written
+SUMMARY_CACHE_DB_TTL = int(os.getenv("SUMMARY_CACHE_DB_TTL", str(30 * 24 * 3600)))
+
+class InvalidCursor(ValueError):
+    pass
+
+async def ensure_indexes():
+    """Create the indexes history and dashboard queries rely on; safe to run on every start."""
+    try:
+        for keys in SCAN_INDEXES:
+            await db.scans.create_index(keys)
+        await db.geo_cache.create_index("expires_at", expireAfterSeconds=0)
+        await db.stats_trackers.create_index([("count", DESCENDING)])
+        await db.stats_countries.create_index([("scans", DESCENDING)])
+        try:
+            await db.summary_cache.create_index("created_at", name="created_at_ttl",
+                                                expireAfterSeconds=SUMMARY_CACHE_DB_TTL)
+        except OperationFailure:
+            # The index exists with another SUMMARY_CACHE_DB_TTL; change it in place
+            await db.command("collMod", "summary_cache",
+                             index={"name": "created_at_ttl", "expireAfterSeconds": SUMMARY_CACHE_DB_TTL})
+        logging.info("MongoDB indexes ensured")
+    except Exception as e:
+        logging.error(f"Failed to create indexes: {e}")
+
+def policy_text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def _policy_text_upsert(text: str, now: datetime):
+    """Moves the text into `policy_texts` under its hash; identical policies are stored once."""
+    return UpdateOne(
+        {"_id": policy_text_hash(text)},
+        {"$setOnInsert": {"text": text, "length": len(text), "first_seen": now}, "$set": {"last_seen": now}},
+        upsert=True,
+    )
+
+def _split_policy_text(result: dict, now: datetime):
+    text = result.pop("raw_policy_text", None)
+    if not text:
+        return None
+    result["policy_text_hash"] = policy_text_hash(text)
+    return _policy_text_upsert(text, now)
 
 async def save_scan_result(result: dict):
     try:
-        result["created_at"] = datetime.utcnow()
-        res = await db.scans.insert_one(result)
-        logging.info(f" Inserted document with ID: {res.inserted_id}")
-        return str(res.inserted_id)
+        with OPERATION_SECONDS.labels(operation="db_write").time():
+            result["created_at"] = datetime.utcnow()
+            text_op = _split_policy_text(result, result["created_at"])
+            if text_op is not None:
+                await db.policy_texts.bulk_write([text_op], ordered=False)
+            result["rolled_up"] = True
+            res = await db.scans.insert_one(result)
+            logging.info(f" Inserted document with ID: {res.inserted_id}")
+            await update_rollups([result])
+            return str(res.inserted_id)
     except Exception as e:
         logging.error(f"Failed to insert: {e}")
         raise
 
-async def get_scan_history(limit: int = 100):
+async def save_scan_results(results: list):
+    """Bulk insert of many scan results in one round-trip."""
+    if not results:
+        return []
+    try:
+        with OPERATION_SECONDS.labels(operation="db_write").time():
+            now = datetime.utcnow()
+            text_ops = {}
+            for result in results:
+                result.setdefault("created_at", now)
+                result["rolled_up"] = True
+                op = _split_policy_text(result, now)
+                if op is not None:
+                    text_ops[result["policy_text_hash"]] = op
+            if text_ops:
+                await db.policy_texts.bulk_write(list(text_ops.values()), ordered=False)
+            res = await db.scans.insert_many(results, ordered=False)
+            logging.info(f" Inserted {len(res.inserted_ids)} documents")
+            await update_rollups(results)
+            return [str(i) for i in res.inserted_ids]
+    except Exception as e:
+        logging.error(f"Failed to bulk insert: {e}")
+        raise
+
+# ------------------ Dashboard rollups ------------------
+# Pre-aggregated counters, updated as scans are saved, so dashboard queries read
+# one document per bucket (class, day, tracker, country) instead of every scan.
+ROLLUP_COLLECTIONS = ("stats_totals", "stats_classification", "stats_daily", "stats_trackers", "stats_countries")
+ROLLUP_BACKFILL_BATCH = 500
+# A backfill lock not renewed for this long belongs to a process that died; the next start takes it over
+ROLLUP_BACKFILL_LOCK_SECONDS = int(os.getenv("ROLLUP_BACKFILL_LOCK_SECONDS", "600"))
+
+def _field_key(value) -> str:
+    # Mongo field names cannot contain "." or start with "$"
+    return str(value).replace(".", "_").lstrip("$") or "Unknown"
+
+def _rollup_ops(results: list) -> dict:
+    """$inc updates per rollup collection, merged across `results`."""
+    incs = {name: {} for name in ROLLUP_COLLECTIONS}
+    sets = {}
+
+    def inc(collection, key, field, amount=1):
+        bucket = incs[collection].setdefault(key, {})
+        bucket[field] = bucket.get(field, 0) + amount
+
+    for result in results:
+        score = result.get("score")
+        classification = result.get("classification") or "Unknown"
+        country = (result.get("geo") or {}).get("country") or "Unknown"
+        day = (result.get("created_at") or datetime.utcnow()).strftime("%Y-%m-%d")
+        trackers = result.get("trackers") or []
+        scored = {"score_sum": score, "score_count": 1} if isinstance(score, (int, float)) else {}
+        for collection, key in (("stats_totals", "all"), ("stats_daily", day), ("stats_countries", country)):
+            inc(collection, key, "scans")
+            for field, amount in scored.items():
+                inc(collection, key, field, amount)
+        inc("stats_totals", "all", "cookies", len(result.get("cookies") or []))
+        if trackers:
+            inc("stats_totals", "all", "scans_with_trackers")
+        # Same band the scan is labelled Risky in, so the dashboard count matches the labels
+        if isinstance(score, (int, float)) and score >= RISKY_SCORE:
+            inc("stats_totals", "all", "high_risk")
+        inc("stats_classification", classification, "count")
+        inc("stats_countries", country, f"classifications.{_field_key(classification)}")
+        for name in {t.get("name") for t in trackers if t.get("name")}:
+            inc("stats_trackers", name, "count")
+        for t in trackers:
+            if t.get("name") and t.get("category"):
+                sets.setdefault(t["name"], {"category": t["category"], "owner": t.get("owner")})
+
+    ops = {}
+    for collection, buckets in incs.items():
+        ops[collection] = [
+            UpdateOne(
+                {"_id": key},
+                {"$inc": fields, **({"$set": sets[key]} if collection == "stats_trackers" and key in sets else {})},
+                upsert=True,
+            )
+            for key, fields in buckets.items()
+        ]
+    return ops
+
+async def update_rollups(results: list):
+    """Fold saved scans into the rollups; a failure only costs dashboard accuracy, never the save."""
+    try:
+        for collection, ops in _rollup_ops(results).items():
+            if ops:
+                await db[collection].bulk_write(ops, ordered=False)
+    except Exception as e:
+        logging.error(f"Failed to update dashboard rollups: {e}")
+
+async def backfill_rollups():
+    """
+    Fold scans saved before rollups existed (no `rolled_up` flag) into them.
+    A lock document, renewed after every batch, makes sure only one process does this at a time.
+    """
+    renewed_at = datetime.utcnow()
+    expired = renewed_at - timedelta(seconds=ROLLUP_BACKFILL_LOCK_SECONDS)
+    try:
+        # Matches only a missing or expired lock; a live one makes the upsert collide on _id
+        await db.stats_totals.update_one(
+            {"_id": "backfill_lock", "$or": [{"renewed_at": {"$lt": expired}}, {"renewed_at": {"$exists": False}}]},
+            {"$set": {"renewed_at": renewed_at}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        return
+    except Exception as e:
+        logging.error(f"Failed to take the rollup backfill lock: {e}")
+        return
+    try:
+        total = 0
+        while True:
+            docs = await db.scans.find(
+                {"rolled_up": {"$ne": True}},
+                {"score": 1, "classification": 1, "geo.country": 1, "created_at": 1, "trackers": 1, "cookies": 1},
+            ).limit(ROLLUP_BACKFILL_BATCH).to_list(ROLLUP_BACKFILL_BATCH)
+            if not docs:
+                break
+            # Flag first: a crash then under-counts a batch instead of double-counting it on retry
+            await db.scans.update_many({"_id": {"$in": [d["_id"] for d in docs]}}, {"$set": {"rolled_up": True}})
+            await update_rollups(docs)
+            total += len(docs)
+            now = datetime.utcnow()
+            await db.stats_totals.update_one(
+                {"_id": "backfill_lock", "renewed_at": renewed_at}, {"$set": {"renewed_at": now}}
+            )
+            renewed_at = now
+        if total:
+            logging.info(f"Backfilled dashboard rollups from {total} scans")
+    except Exception as e:
+        logging.error(f"Failed to backfill dashboard rollups: {e}")
+    finally:
+        # Only our own lock: if it expired and another process took it over, that one keeps it
+        await db.stats_totals.delete_one({"_id": "backfill_lock", "renewed_at": renewed_at})
+
+async def get_rollup_totals() -> dict:
+    doc = await db.stats_totals.find_one({"_id": "all"}) or {}
+    count = doc.get("score_count", 0)
+    return {
+        "scans": doc.get("scans", 0),
+        "average_score": round(doc.get("score_sum", 0) / count, 2) if count else None,
+        "cookies": doc.get("cookies", 0),
+        "scans_with_trackers": doc.get("scans_with_trackers", 0),
+        "high_risk": doc.get("high_risk", 0),
+    }
+
+async def get_classification_stats() -> dict:
+    docs = await db.stats_classification.find().to_list(None)
+    return {doc["_id"]: doc.get("count", 0) for doc in docs}
+
+async def get_score_trend(days: int = 30) -> list:
+    """One entry per calendar day of the last `days` (UTC), today included; days without scans count zero."""
+    today = datetime.utcnow().date()
+    dates = [(today - timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(days - 1, -1, -1)]
+    docs = await db.stats_daily.find({"_id": {"$gte": dates[0], "$lte": dates[-1]}}).to_list(days)
+    by_day = {doc["_id"]: doc for doc in docs}
+    trend = []
+    for date in dates:
+        doc = by_day.get(date, {})
+        trend.append({
+            "date": date,
+            "scans": doc.get("scans", 0),
+            "average_score": round(doc["score_sum"] / doc["score_count"], 2) if doc.get("score_count") else None,
+        })
+    return trend
+
+async def get_top_trackers(limit: int = 10) -> list:
+    docs = await db.stats_trackers.find().sort("count", DESCENDING).to_list(limit)
+    return [
+        {"name": doc["_id"], "category": doc.get("category"), "owner": doc.get("owner"), "scans": doc.get("count", 0)}
+        for doc in docs
+    ]
+
+async def get_country_stats() -> list:
+    docs = await db.stats_countries.find().sort("scans", DESCENDING).to_list(None)
+    return [
+        {
+            "country": doc["_id"],
+            "scans": doc.get("scans", 0),
+            "average_score": round(doc["score_sum"] / doc["score_count"], 2) if doc.get("score_count") else None,
+            "classifications": doc.get("classifications", {}),
+        }
+        for doc in docs
+    ]
+
+def _serialize(doc: dict) -> dict:
+    doc["_id"] = str(doc["_id"])
+    return doc
+
+async def get_scan_history(limit: int = 100, include_heavy: bool = False):
     try:
-        docs = await db.scans.find().sort("created_at", -1).to_list(limit)
+        projection = None if include_heavy else HISTORY_PROJECTION
+        docs = await db.scans.find({}, projection).sort(HISTORY_SORT).to_list(limit)
         for doc in docs:
-            doc["_id"] = str(doc["_id"])
+            _serialize(doc)
         logging.info(f"Retrieved {len(docs)} docs")
         return docs
     except Exception as e:
         logging.error(f"Failed to fetch history: {e}")
         return []
+
+def encode_cursor(doc: dict) -> str:
+    raw = json.dumps([doc["created_at"].isoformat(), str(doc["_id"])])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, doc_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), ObjectId(doc_id)
+    except (ValueError, TypeError, InvalidId) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+async def get_scan_page(limit: int = 50, cursor: str = None, url: str = None,
+                        classification: str = None, country: str = None):
+    """
+    Keyset-paginated history, newest first. `cursor` is the `next_cursor` of the
+    previous page; each page is one index range scan regardless of its depth.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = {}
+    if url:
+        query["url"] = url
+    if classification:
+        query["classification"] = classification
+    if country:
+        query["geo.country"] = country
+    if cursor:
+        created_at, doc_id = decode_cursor(cursor)
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": doc_id}},
+        ]
+    docs = await db.scans.find(query, HISTORY_PROJECTION).sort(HISTORY_SORT).to_list(limit + 1)
+    next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+    return {"items": [_serialize(doc) for doc in docs[:limit]], "next_cursor": next_cursor}
+
+async def get_policy_text(text_hash: str):
+    doc = await db.policy_texts.find_one({"_id": text_hash}, {"text": 1})
+    return doc["text"] if doc else None
+
+async def get_scan(scan_id: str, include_policy_text: bool = False):
+    """One scan by ID, with its policy text re-attached on request."""
+    try:
+        doc = await db.scans.find_one({"_id": ObjectId(scan_id)})
+    except InvalidId:
+        return None
+    if doc is None:
+        return None
+    if include_policy_text and doc.get("policy_text_hash") and "raw_policy_text" not in doc:
+        doc["raw_policy_text"] = await get_policy_text(doc["policy_text_hash"])
+    return _serialize(doc)
+
+
+async def get_cached_summary(key: str, prompt_version: str):
+    try:
+        doc = await db.summary_cache.find_one({"_id": key, "prompt_version": prompt_version}, {"summary": 1})
+        return doc["summary"] if doc else None
+    except Exception as e:
+        logging.error(f"Failed to read summary cache: {e}")
+        return None
+
+async def save_cached_summary(key: str, summary: dict, prompt_version: str):
+    try:
+        await db.summary_cache.update_one(
+            {"_id": key},
+            {"$set": {"summary": summary, "prompt_version": prompt_version, "created_at": datetime.utcnow()}},
+            upsert=True
+        )
+    except Exception as e:
+        logging.error(f"Failed to write summary cache: {e}")
+
+async def prune_summary_cache(prompt_version: str) -> int:
+    """Delete cached summaries made with any other prompt version; they can never be served again."""
+    try:
+        result = await db.summary_cache.delete_many({"prompt_version": {"$ne": prompt_version}})
+        return result.deleted_count
+    except Exception as e:
+        logging.error(f"Failed to prune summary cache: {e}")
+        return 0
+
+async def get_cached_geo(ip: str):
+    try:
+        doc = await db.geo_cache.find_one({"_id": ip, "expires_at": {"$gt": datetime.utcnow()}}, {"geo": 1})
+        return doc["geo"] if doc else None
+    except Exception as e:
+        logging.error(f"Failed to read geo cache: {e}")
+        return None
+
+async def save_cached_geo(ip: str, geo: dict, ttl: float):
+    try:
+        await db.geo_cache.update_one(
+            {"_id": ip},
+            {"$set": {"geo": geo, "expires_at": datetime.utcnow() + timedelta(seconds=ttl)}},
+            upsert=True
+        )
+    except Exception as e:
+        logging.error(f"Failed to write geo cache: {e}")
+
+async def get_policy_version(url: str):
+    try:
+        return await db.policy_versions.find_one({"_id": url})
+    except Exception as e:
+        logging.error(f"Failed to read policy version: {e}")
+        return None
+
+async def save_policy_version(url: str, version: dict):
+    try:
+        await db.policy_versions.update_one(
+            {"_id": url},
+            {"$set": {**version, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+    except Exception as e:
+        logging.error(f"Failed to write policy version: {e}")
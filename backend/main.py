@@ -1,13 +1,37 @@
+import time
+_import_started = time.perf_counter()
+
 import asyncio
 import logging
 import sys
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from backend.routes import scan, dashboard, awareness_router, webscan_router
+from backend.routes import scan, dashboard, awareness_router, webscan_router, jobs, batch, metrics as metrics_router
+from backend.database import db, ensure_indexes, backfill_rollups
+from backend.services.browser_pool import browser_pool
+from backend.services.job_queue import job_queue
+from backend.services.summary_cache import summary_cache
+from backend.services.http_client import http_client
+from backend.utils.executor import shutdown_executor
+from backend.utils.cpu_pool import cpu_pool
+from backend.utils.service_registry import registry
+from backend.utils.metrics import HTTP_REQUEST_SECONDS
+from backend.utils.tracing import RequestIdFilter, request_context
 import os
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+IMPORT_MS = round((time.perf_counter() - _import_started) * 1000, 1)
+
+# Configure logging; force replaces the bare handler some modules install on import.
+# Every line carries the request ID it was logged under ("-" outside requests)
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s - %(levelname)s - [%(request_id)s] %(message)s",
+    force=True,
+)
+for handler in logging.getLogger().handlers:
+    handler.addFilter(RequestIdFilter())
 logger = logging.getLogger(__name__)
 
 # Set WindowsSelectorEventLoopPolicy at module level
@@ -22,7 +46,50 @@ if os.name == 'nt':
         logger.error(f"Failed to set event loop policy: {str(e)}")
         sys.exit(1)
 
-app = FastAPI(title="PrivacyPulse AI")
+async def _prepare_database():
+    # Stay "loading" (not ready) until MongoDB answers, instead of failing for good
+    while True:
+        try:
+            await db.command("ping")
+            break
+        except Exception as e:
+            logger.warning(f"MongoDB not reachable yet: {str(e)}")
+            await asyncio.sleep(DB_RETRY_SECONDS)
+    await ensure_indexes()
+    try:
+        await job_queue.store.ensure_indexes()
+    except Exception as e:
+        logger.error(f"Failed to create job indexes: {str(e)}")
+    await summary_cache.prune()
+    # Folds scans saved before the dashboard rollups existed into them
+    return asyncio.create_task(backfill_rollups())
+
+DB_RETRY_SECONDS = float(os.getenv("DB_RETRY_SECONDS", "5"))
+
+# Warmed in the background after startup; the browser pool relaunches lazily on first use
+# and the models fall back to heuristics, so only the database must come up for readiness
+registry.register("database", _prepare_database, required=True)
+registry.register("browser", browser_pool.start)
+registry.register("cpu_pool", cpu_pool.start)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await http_client.start()
+    await job_queue.start()
+    registry.start_warm_up()
+    logger.info(f"Accepting requests {round((time.monotonic() - registry.started_at) * 1000)}ms after start")
+    yield
+    registry.stop_warm_up()
+    backfill = registry.loaded("database")
+    if backfill is not None:
+        backfill.cancel()
+    await job_queue.stop()
+    await cpu_pool.stop()
+    await browser_pool.close()
+    await http_client.close()
+    shutdown_executor()
+
+app = FastAPI(title="PrivacyPulse AI", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -39,10 +106,40 @@ app.add_middleware(
 
 
 app.include_router(scan.router, prefix="/api/scan", tags=["scan"])
+app.include_router(batch.router, prefix="/api/scan", tags=["batch"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["dashboard"])
 app.include_router(awareness_router.router)
 app.include_router(webscan_router.router)
+app.include_router(metrics_router.router, tags=["metrics"])
+
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    """Run each request under its X-Request-ID (or a new one), echo it back and time the request."""
+    started = time.perf_counter()
+    with request_context(request.headers.get("x-request-id")) as request_id:
+        response = await call_next(request)
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.labels(
+        method=request.method,
+        # The route template, not the raw path, so IDs in URLs do not explode the label set
+        route=getattr(route, "path", "unmatched"),
+        status=response.status_code,
+    ).observe(time.perf_counter() - started)
+    response.headers["X-Request-ID"] = request_id
+    return response
 
 @app.get("/")
 def root():
-    return {"message": "PrivacyPulse AI Backend is running"}
\ No newline at end of file
+    return {"message": "PrivacyPulse AI Backend is running"}
+
+@app.get("/healthz")
+def liveness():
+    """The process is up and serving; says nothing about its dependencies."""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+def readiness():
+    """200 once warm-up has finished and every required service loaded, 503 until then."""
+    status = {**registry.status(), "import_ms": IMPORT_MS}
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
\ No newline at end of file
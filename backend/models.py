@@ -1,12 +1,21 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 
 class ScanRequest(BaseModel):
     url: str
 
+class BatchScanRequest(BaseModel):
+    urls: List[str]
+
+class ClassifyHostsRequest(BaseModel):
+    url: str
+    hosts: List[str]
+
 class TrackerInfo(BaseModel):
     name: str
     category: Optional[str] = None
+    owner: Optional[str] = None
+    domain: Optional[str] = None
     blocked: bool = False
 
 class ScanResult(BaseModel):
@@ -15,6 +24,27 @@ class ScanResult(BaseModel):
     classification: str
     score: Optional[float] = None
     trackers: List[TrackerInfo] = Field(default_factory=list)
+    # Other third-party sites the page loads from (eTLD+1), which are not on the tracker list
+    third_party: List[str] = Field(default_factory=list)
     cookies: List[str] = Field(default_factory=list)
     raw_policy_text: Optional[str] = None
     features: Dict[str, float] = Field(default_factory=dict)
+    timings: Dict[str, float] = Field(default_factory=dict)
+    policy_changes: Optional[Dict[str, Any]] = None
+    # Which parts of the policy the summary was built from, when it was abridged
+    policy_passages: Optional[Dict[str, Any]] = None
+
+class PageResource(BaseModel):
+    src: str
+    domain: str
+    tag: str
+
+class PageCapture(BaseModel):
+    url: str
+    status: Optional[int] = None
+    text: str = ""
+    resources: List[PageResource] = Field(default_factory=list)
+    cookies: List[str] = Field(default_factory=list)
+    headers: Dict[str, str] = Field(default_factory=dict)
+    source: str = "playwright"
+    error: Optional[str] = None
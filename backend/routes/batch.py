@@ -0,0 +1,29 @@
+import json
+from fastapi import APIRouter, File, UploadFile
+from fastapi.responses import StreamingResponse
+from backend.models import BatchScanRequest
+from backend.services.batch_scan import run_batch, parse_url_list
+
+router = APIRouter()
+
+def _ndjson(urls: list, include_policy_text: bool) -> StreamingResponse:
+    async def stream():
+        async for line in run_batch(urls, include_policy_text=include_policy_text):
+            yield json.dumps(line, default=str) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@router.post("/batch")
+async def scan_batch(request: BatchScanRequest, include_policy_text: bool = False):
+    """
+    Scans a list of URLs and streams one NDJSON line per URL as each scan completes.
+    """
+    return _ndjson(request.urls, include_policy_text)
+
+@router.post("/batch/upload")
+async def scan_batch_upload(file: UploadFile = File(...), include_policy_text: bool = False):
+    """
+    Same as /batch for an uploaded text or CSV file with one URL per line.
+    """
+    content = (await file.read()).decode("utf-8", errors="replace")
+    return _ndjson(parse_url_list(content), include_policy_text)
@@ -1,10 +1,52 @@
-from fastapi import APIRouter
-from backend.database import get_scan_history
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from backend.database import get_scan_history, get_scan_page, get_scan, InvalidCursor
+from backend.services import dashboard_stats
 
 router = APIRouter()
 
 @router.get("/history")
 async def history(limit: int = 50):
+    # Heavy fields (policy text, diffs) are projected out; fetch a single scan for them
     docs = await get_scan_history(limit)
-    # Optionally sanitize before returning
     return docs
+
+@router.get("/history/page")
+async def history_page(limit: int = 50, cursor: Optional[str] = None, url: Optional[str] = None,
+                       classification: Optional[str] = None, country: Optional[str] = None):
+    """
+    Cursor-paginated history with optional filters. Pass `next_cursor` from the
+    response to get the following page; it is null on the last page.
+    """
+    try:
+        return await get_scan_page(limit, cursor, url, classification, country)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/scans/{scan_id}")
+async def scan_detail(scan_id: str, include_policy_text: bool = False):
+    doc = await get_scan(scan_id, include_policy_text)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    return doc
+
+@router.get("/stats")
+async def stats_overview():
+    """Scan totals, average score and classification counts, served from the rollups."""
+    return await dashboard_stats.overview()
+
+@router.get("/stats/classification")
+async def stats_classification():
+    return await dashboard_stats.classification_distribution()
+
+@router.get("/stats/score-trend")
+async def stats_score_trend(days: int = Query(30, ge=1, le=365)):
+    return await dashboard_stats.score_trend(days)
+
+@router.get("/stats/trackers")
+async def stats_trackers(limit: int = Query(10, ge=1, le=100)):
+    return await dashboard_stats.top_trackers(limit)
+
+@router.get("/stats/countries")
+async def stats_countries():
+    return await dashboard_stats.countries()
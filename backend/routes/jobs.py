@@ -0,0 +1,44 @@
+import json
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from backend.models import ScanRequest
+from backend.services.job_queue import job_queue
+
+router = APIRouter()
+
+@router.post("/", status_code=202)
+async def submit_scan(request: ScanRequest):
+    """
+    Queues a scan and returns its job ID immediately.
+    """
+    job_id = await job_queue.submit(request.url)
+    return {"job_id": job_id, "status": "queued"}
+
+@router.get("/{job_id}")
+async def job_status(job_id: str):
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {k: v for k, v in job.items() if k not in ("result", "lease_until")}
+
+@router.get("/{job_id}/result")
+async def job_result(job_id: str):
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=job["error"] or "Scan failed")
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return await job_queue.full_result(job)
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Server-sent events: one `stage` event per pipeline stage start/finish, then `done` or `failed`.
+    """
+    async def stream():
+        async for event, data in job_queue.events(job_id):
+            yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
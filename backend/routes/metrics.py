@@ -0,0 +1,56 @@
+from typing import Optional
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from backend.services.ai_service import get_llm_client
+from backend.services.geo_service import geo_service
+from backend.services.scan_cache import scan_cache
+from backend.services.summary_cache import summary_cache
+from backend.utils import metrics
+from backend.utils.cpu_pool import cpu_pool
+from backend.utils.dns_cache import dns_cache
+from backend.utils.tracing import recent_traces
+
+router = APIRouter()
+
+def _cache_metrics():
+    """Hit/miss totals and hit ratios of the in-process caches, read from their own counters."""
+    caches = {
+        "scan": (scan_cache.hits + scan_cache.stale_hits, scan_cache.misses),
+        "summary": (summary_cache.memory_hits + summary_cache.persistent_hits, summary_cache.misses),
+        "dns": (dns_cache.hits, dns_cache.misses),
+    }
+    geo = geo_service.stats_counts
+    caches["geo"] = (geo["memory_hits"] + geo["persistent_hits"], geo["backend_lookups"] + geo["misses"])
+    return [
+        ("cache_hits_total", "counter", "Cache lookups answered from the cache",
+         [({"cache": name}, hits) for name, (hits, _) in caches.items()]),
+        ("cache_misses_total", "counter", "Cache lookups that had to do the work",
+         [({"cache": name}, misses) for name, (_, misses) in caches.items()]),
+        ("cache_hit_ratio", "gauge", "Hits over lookups since start",
+         [({"cache": name}, hits / (hits + misses) if hits + misses else 0.0) for name, (hits, misses) in caches.items()]),
+    ]
+
+def _worker_metrics():
+    samples = [
+        ("cpu_tasks_in_flight", "gauge", "Tasks submitted to the CPU pool and not yet finished", [({}, cpu_pool.in_flight)]),
+        ("cpu_tasks_rejected_total", "counter", "CPU pool tasks refused for lack of a free slot",
+         [({}, cpu_pool.stats_counts["rejected"])]),
+    ]
+    breaker = getattr(get_llm_client(), "breaker", None)
+    if breaker is not None:
+        samples.append(("llm_circuit_open", "gauge", "1 while the LLM circuit breaker rejects calls",
+                        [({}, 0 if breaker.available() else 1)]))
+    return samples
+
+metrics.register_collector(_cache_metrics)
+metrics.register_collector(_worker_metrics)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@router.get("/traces")
+def traces(request_id: Optional[str] = None, limit: int = 20):
+    """Recently finished traces (newest first), optionally only those of one request ID."""
+    found = [t for t in reversed(recent_traces) if request_id is None or t["request_id"] == request_id]
+    return found[:limit]
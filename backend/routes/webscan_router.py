@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Query
-from backend.utils.web_scanner import analyze_website
+from backend.models import ClassifyHostsRequest
+from backend.utils.web_scanner import analyze_website, classify_hosts
 
 router = APIRouter(prefix="/scan", tags=["webscan"])
 
@@ -8,5 +9,14 @@ async def scan_site(url: str = Query(..., description="Website URL to scan")):
     """
     Scans a website for security headers, cookies, and trackers.
     """
-    result = analyze_website(url)
+    result = await analyze_website(url)
     return {"status": "success", "data": result}
+
+@router.post("/classify")
+def classify(request: ClassifyHostsRequest):
+    """
+    Classifies hosts a page loads resources from (as seen by the browser extension)
+    with the same tracker list the scanner uses.
+    """
+    trackers, third_party = classify_hosts(request.url, request.hosts[:500])
+    return {"status": "success", "data": {"url": request.url, "trackers": trackers, "third_party": third_party}}
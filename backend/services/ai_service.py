@@ -2,21 +2,85 @@ import os
 import json
 import logging
 from dotenv import load_dotenv
-import google.generativeai as genai
-import re
+import threading
+import time
+from contextvars import ContextVar, copy_context
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from backend.services.llm_client import LLMClient, GeminiClient, ResilientLLMClient
+from backend.services.summarizer_backend import SummarizerBackend, empty_summary
+from backend.services.local_summarizer import LocalSummarizer
+from backend.utils.cpu_pool import cpu_pool, parse_json
+from backend.utils.passage_ranker import select_passages
+from backend.utils.service_registry import registry
 
 # ------------------ Setup -----------------
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if not GEMINI_API_KEY:
-    raise RuntimeError("Gemini API key missing!")
-
-genai.configure(api_key=GEMINI_API_KEY)
+    logging.warning("GEMINI_API_KEY not set; summaries will use the local extractive engine")
 logging.basicConfig(level=logging.INFO)
 
+# local | gemini | hybrid (local first, refined by the LLM within the latency budget)
+SUMMARIZER_MODE = os.getenv("SUMMARIZER_MODE", "gemini" if GEMINI_API_KEY else "local")
+# Seconds an LLM-backed summary may take before the local result is used instead
+SUMMARY_LATENCY_BUDGET = float(os.getenv("SUMMARY_LATENCY_BUDGET", "60"))
+
 MAX_PROMPT_LENGTH = 12000
+# Send the highest-risk passages in one call instead of map-reducing policies that do not fit
+PASSAGE_SELECTION = os.getenv("PASSAGE_SELECTION", "1") == "1"
 SAFE_MIN_LENGTH = 30
 SAFE_MAX_LENGTH = 250
+# Upper bound on LLM calls in flight across all scans
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))
+
+_llm_client: LLMClient = ResilientLLMClient(GeminiClient())
+_llm_semaphore = threading.BoundedSemaphore(LLM_CONCURRENCY)
+_map_executor = ThreadPoolExecutor(max_workers=LLM_CONCURRENCY, thread_name_prefix="llm-map")
+# Separate pool for budgeted calls, which themselves fan out onto _map_executor
+_budget_executor = ThreadPoolExecutor(max_workers=LLM_CONCURRENCY * 2, thread_name_prefix="llm-budget")
+
+# Monotonic time by which the summary being built must be done. LLM calls made for it stop
+# waiting, retrying and starting once it passes, so an abandoned summary frees its slots and quota
+_summary_deadline: ContextVar = ContextVar("summary_deadline", default=None)
+
+def _submit(executor, fn, *args, **kwargs):
+    """executor.submit carrying the caller's context, and with it the summary deadline."""
+    return executor.submit(copy_context().run, fn, *args, **kwargs)
+
+def _run_with_deadline(deadline: float, fn, *args):
+    # Runs inside a copied context, so the deadline never leaks into the pool thread's own
+    _summary_deadline.set(deadline)
+    return fn(*args)
+
+def _time_left():
+    deadline = _summary_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+def _generate(prompt_text: str, max_output_tokens: int) -> str:
+    """One LLM call under the global concurrency limit, cut short by the summary deadline."""
+    left = _time_left()
+    if left is not None and left <= 0:
+        raise TimeoutError("Summary budget spent, LLM call skipped")
+    if not _llm_semaphore.acquire(timeout=left):
+        raise TimeoutError("Summary budget spent waiting for an LLM slot")
+    try:
+        left = _time_left()
+        if left is not None and left <= 0:
+            raise TimeoutError("Summary budget spent, LLM call skipped")
+        return _llm_client.generate(prompt_text, max_output_tokens=max_output_tokens, timeout=left)
+    finally:
+        _llm_semaphore.release()
+
+def set_llm_client(client: LLMClient, resilient: bool = True):
+    """
+    Swap the backing LLM, e.g. for a FakeLLMClient in local runs. It is wrapped
+    in the rate limiting/retry/circuit-breaker policies unless `resilient` is False.
+    """
+    global _llm_client
+    _llm_client = ResilientLLMClient(client) if resilient else client
+
+def get_llm_client() -> LLMClient:
+    return _llm_client
 
 # ------------------ Helpers -----------------
 def clean_json_string(s: str) -> str:
@@ -42,17 +106,7 @@ def _call_gemini(prompt_text: str, max_output_tokens: int = 1500, hf_fallback: s
         if len(prompt_text) > MAX_PROMPT_LENGTH:
             prompt_text = prompt_text[:MAX_PROMPT_LENGTH]
 
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(
-            prompt_text,
-            generation_config={"max_output_tokens": max_output_tokens},
-        )
-
-        text_output = ""
-        for c in getattr(response, "candidates", []):
-            for part in getattr(getattr(c, "content", None), "parts", []):
-                if hasattr(part, "text") and part.text.strip():
-                    text_output += part.text.strip() + " "
+        text_output = _generate(prompt_text, max_output_tokens)
 
         return clean_json_string(text_output) or hf_fallback or "Gemini produced no output."
     except Exception as e:
@@ -60,66 +114,248 @@ def _call_gemini(prompt_text: str, max_output_tokens: int = 1500, hf_fallback: s
         return hf_fallback or f"Gemini error: {str(e)}"
 
 # ------------------ Summarization ------------------
+REDUCE_PROMPT = (
+    "Combine the following into one clear summary. "
+    "Provide JSON with keys: summary, bullets, tone, risks.\n\n"
+)
+INTERMEDIATE_REDUCE_PROMPT = (
+    "Merge the following partial summaries of one privacy policy into a single concise summary. "
+    "Keep every detail about data collection, sharing, sale, tracking, retention and user rights.\n\n"
+)
+
+def _map_chunk(prompt, index, total, chunk, max_tokens):
+    """Summarize one chunk; returns None if the LLM call fails."""
+    gemini_prompt = f"(Part {index+1}/{total})\n{prompt}\n{chunk}"
+    try:
+        if len(gemini_prompt) > MAX_PROMPT_LENGTH:
+            gemini_prompt = gemini_prompt[:MAX_PROMPT_LENGTH]
+        refined = _generate(gemini_prompt, max_tokens)
+        return clean_json_string(refined) or None
+    except Exception as e:
+        logging.error(f"[Gemini API Error] chunk {index+1}/{total}: {str(e)}")
+        return None
+
+def _group_for_reduce(partials, budget):
+    """Pack partial summaries into groups whose joined length fits `budget`."""
+    groups, current, size = [], [], 0
+    # Cap each partial so at least two always fit in one group and the tree shrinks every level
+    cap = budget // 2
+    for p in partials:
+        p = p[:cap]
+        if current and size + len(p) + 1 > budget:
+            groups.append(current)
+            current, size = [], 0
+        current.append(p)
+        size += len(p) + 1
+    if current:
+        groups.append(current)
+    return groups
+
+def tree_reduce(partials, max_tokens=2000):
+    """
+    Reduce partial summaries level by level until they fit in one prompt,
+    running each level's merge calls concurrently.
+    """
+    budget = MAX_PROMPT_LENGTH - len(INTERMEDIATE_REDUCE_PROMPT)
+    level = 0
+    while len(" ".join(partials)) > MAX_PROMPT_LENGTH - len(REDUCE_PROMPT) and len(partials) > 1:
+        level += 1
+        groups = _group_for_reduce(partials, budget)
+        logging.info(f"Tree reduce level {level}: {len(partials)} partials -> {len(groups)} groups")
+        futures = [
+            _submit(
+                _map_executor,
+                _call_gemini,
+                INTERMEDIATE_REDUCE_PROMPT + " ".join(g),
+                max_output_tokens=max_tokens,
+                hf_fallback=" ".join(g)[:budget // len(groups)]
+            )
+            for g in groups
+        ]
+        partials = [f.result().strip() for f in futures]
+
+    combined_summary = " ".join(partials)
+    return _call_gemini(
+        REDUCE_PROMPT + combined_summary,
+        max_output_tokens=max_tokens,
+        hf_fallback=combined_summary[:500] + "..."
+    )
+
 def summarize_large_policy_with_gemini(prompt, text, max_tokens=1500):
+    """Map-reduce: summarize chunks concurrently, then tree-reduce the partial summaries."""
     chunks = chunk_text(text)
-    summaries = []
-
-    for i, chunk in enumerate(chunks):
-        hf_summary_text = fallback_summary(chunk)
-        gemini_prompt = f"{prompt}\n\nPolicy Summary (Part {i+1}/{len(chunks)}):\n{hf_summary_text}"
-        refined = _call_gemini(
-            gemini_prompt,
-            max_output_tokens=max(max_tokens, len(hf_summary_text)//2),
-            hf_fallback=hf_summary_text
+    futures = [
+        _submit(_map_executor, _map_chunk, prompt, i, len(chunks), chunk, max_tokens)
+        for i, chunk in enumerate(chunks)
+    ]
+    results = [f.result() for f in futures]
+
+    failed = sum(1 for r in results if r is None)
+    if failed:
+        logging.warning(f"{failed}/{len(chunks)} chunk summaries failed, using excerpts in their place")
+    summaries = [
+        (r if r is not None else fallback_summary(chunk)).strip()
+        for r, chunk in zip(results, chunks)
+    ]
+    if failed == len(chunks):
+        combined_summary = " ".join(summaries)
+        return combined_summary[:500] + "..."
+
+    return tree_reduce(summaries, max_tokens=2000)
+
+# ------------------ Summarizer Backends ------------------
+REFINE_PROMPT = (
+    "You are a privacy policy summarizer and analyzer. Below is an extractive draft analysis "
+    "built from the most important sentences of a privacy policy. Rewrite it into a JSON object "
+    "with exactly these keys: 'summary' (a concise 3-sentence summary), "
+    "'bullets' (an array of exactly 5 short bullet highlights), "
+    "'tone' (one of: friendly, neutral, legalistic), "
+    "'risks' (an array of high-risk clauses related to data sharing, sale, or tracking). "
+    "Only use facts present in the draft. Return only the JSON object.\n\n"
+)
+
+def _parse_summary_json(out_text: str):
+    """Schema dict from an LLM reply, or None if it is not a JSON object."""
+    try:
+        # Parsed in a CPU worker when the pool runs, off this process's GIL
+        parsed = cpu_pool.call(parse_json, clean_json_string(out_text))
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(parsed, dict):
+        return None
+    bullets_list = parsed.get("bullets") or [
+        s.strip() for s in parsed.get("summary", "").split(". ")[:5] if s.strip()
+    ]
+    return {
+        "summary": parsed.get("summary", out_text),
+        "bullets": bullets_list,
+        "tone": parsed.get("tone", "unknown"),
+        "risks": parsed.get("risks", []),
+    }
+
+
+class GeminiSummarizer(SummarizerBackend):
+    """
+    One LLM call over the most risk-relevant passages of the policy, packed into
+    the prompt budget. With PASSAGE_SELECTION off, policies that do not fit are
+    map-reduced over every chunk instead.
+    """
+
+    name = "gemini"
+
+    def summarize(self, prompt: str, text: str, max_tokens: int = 1500) -> dict:
+        budget = MAX_PROMPT_LENGTH - len(prompt) - 1
+        if PASSAGE_SELECTION or len(text) <= budget:
+            selected, passages = select_passages(text, budget)
+            if passages["strategy"] == "ranked":
+                logging.info(
+                    f"Selected {len(passages['spans'])} passages "
+                    f"({passages['selected_chars']}/{passages['total_chars']} characters) for the prompt"
+                )
+            out_text = _call_gemini(
+                f"{prompt}\n{selected}",
+                max_output_tokens=max_tokens,
+                hf_fallback=fallback_summary(text)
+            )
+        else:
+            passages = None
+            out_text = summarize_large_policy_with_gemini(prompt, text, max_tokens)
+        parsed = _parse_summary_json(out_text)
+        if parsed is None:
+            # _call_gemini hands back the raw excerpt when the API fails
+            raise ValueError("Gemini returned no JSON summary")
+        return {**parsed, "engine": self.name, "passages": passages}
+
+
+class HybridSummarizer(SummarizerBackend):
+    """Local extractive summary first, rewritten by the LLM when it answers within the latency budget."""
+
+    name = "hybrid"
+
+    def __init__(self, local: SummarizerBackend):
+        self.local = local
+
+    def summarize(self, prompt: str, text: str, max_tokens: int = 1500) -> dict:
+        draft = self.local.summarize(prompt, text, max_tokens)
+        future = _submit(
+            _budget_executor, _run_with_deadline, time.monotonic() + SUMMARY_LATENCY_BUDGET,
+            _call_gemini, REFINE_PROMPT + json.dumps(draft), max_tokens, "",
         )
-        summaries.append(refined.strip())
+        try:
+            refined = _parse_summary_json(future.result(timeout=SUMMARY_LATENCY_BUDGET))
+        except FuturesTimeout:
+            logging.warning(f"LLM refinement exceeded {SUMMARY_LATENCY_BUDGET}s, using local summary")
+            return draft
+        return {**refined, "engine": self.name} if refined else draft
 
-    combined_summary = " ".join(summaries)
-    final_prompt = (
-        "Combine the following into one clear summary. "
-        "Provide JSON with keys: summary, bullets, tone, risks.\n\n"
-        f"{combined_summary}"
-    )
 
-    return _call_gemini(final_prompt, max_output_tokens=2000, hf_fallback=combined_summary[:500] + "...")
+_local_summarizer = LocalSummarizer()
+SUMMARIZERS = {
+    "local": _local_summarizer,
+    "gemini": GeminiSummarizer(),
+    "hybrid": HybridSummarizer(_local_summarizer),
+}
+
+def get_summarizer() -> SummarizerBackend:
+    mode = SUMMARIZER_MODE
+    if mode != "local" and not GEMINI_API_KEY and isinstance(getattr(_llm_client, "inner", _llm_client), GeminiClient):
+        mode = "local"
+    return SUMMARIZERS.get(mode, _local_summarizer)
+
+def set_summarizer_mode(mode: str):
+    global SUMMARIZER_MODE
+    if mode not in SUMMARIZERS:
+        raise ValueError(f"Unknown summarizer mode: {mode}")
+    SUMMARIZER_MODE = mode
+
+def _warm_llm():
+    """Build the LLM model handle ahead of the first scan, unless summaries are local-only."""
+    if get_summarizer().name != "local":
+        _llm_client.warm()
+    return _llm_client
+
+registry.register("llm", _warm_llm)
+
+def _summarize_within_budget(backend: SummarizerBackend, prompt: str, text: str, max_tokens: int,
+                             local_fallback: bool = True) -> dict:
+    """Run an LLM-backed summarizer, falling back to the local engine on failure or when over budget."""
+    # The deadline travels with the work: once it passes, pending chunk calls return at once
+    # and in-flight ones stop at their next wait, instead of running on unobserved
+    future = _submit(
+        _budget_executor, _run_with_deadline, time.monotonic() + SUMMARY_LATENCY_BUDGET,
+        backend.summarize, prompt, text, max_tokens,
+    )
+    try:
+        return future.result(timeout=SUMMARY_LATENCY_BUDGET)
+    except FuturesTimeout:
+        reason = f"exceeded {SUMMARY_LATENCY_BUDGET}s"
+    except Exception as e:
+        reason = f"failed ({str(e)})"
+    if not local_fallback:
+        logging.error(f"{backend.name} summarizer {reason}")
+        return empty_summary(f"AI summarization unavailable: {backend.name} summarizer {reason}")
+    logging.warning(f"{backend.name} summarizer {reason}, using local summary")
+    return _local_summarizer.summarize(prompt, text, max_tokens)
 
 # ------------------ Main Entry ------------------
 def ai_summarize(params: dict):
     prompt = params.get("prompt", "")
     text = params.get("text", "")
     max_tokens = params.get("max_tokens", 1500)
+    # False when `text` is only part of a policy, so an extractive fallback over it would mislead
+    local_fallback = params.get("local_fallback", True)
 
     if not text or len(text.strip()) < 80:
-        return {"summary": "Insufficient policy text.", "bullets": [], "tone": "unknown", "risks": []}
+        return empty_summary("Insufficient policy text.")
 
     try:
-        if len(text) > MAX_PROMPT_LENGTH:
-            out_text = summarize_large_policy_with_gemini(prompt, text, max_tokens)
-        else:
-            hf_summary_text = fallback_summary(text)
-            out_text = _call_gemini(
-                f"{prompt}\n\nPolicy Summary:\n{hf_summary_text}",
-                max_output_tokens=max_tokens,
-                hf_fallback=hf_summary_text
-            )
-
-        out_text = clean_json_string(out_text)
-
-        try:
-            parsed = json.loads(out_text)
-            bullets_list = parsed.get("bullets") or [
-                s.strip() for s in parsed.get("summary", "").split(". ")[:5] if s.strip()
-            ]
-            return {
-                "summary": parsed.get("summary", out_text),
-                "bullets": bullets_list,
-                "tone": parsed.get("tone", "unknown"),
-                "risks": parsed.get("risks", []),
-            }
-        except:
-            bullets_list = [s.strip() for s in out_text.split(". ")[:5] if s.strip()]
-            return {"summary": out_text.strip(), "bullets": bullets_list, "tone": "unknown", "risks": []}
-
+        backend = get_summarizer()
+        if backend.name == "gemini" and local_fallback and not _llm_client.available():
+            logging.warning("LLM circuit is open, using local summary")
+            return _local_summarizer.summarize(prompt, text, max_tokens)
+        if backend.name == "gemini":
+            return _summarize_within_budget(backend, prompt, text, max_tokens, local_fallback)
+        return backend.summarize(prompt, text, max_tokens)
     except Exception as e:
         logging.exception("[AI Error]")
-        return {"summary": f"AI summarization unavailable: {str(e)}", "bullets": [], "tone": "unknown", "risks": []}
+        return empty_summary(f"AI summarization unavailable: {str(e)}")
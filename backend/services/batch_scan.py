@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from urllib.parse import urlsplit
+from backend.database import save_scan_result, save_scan_results
+from backend.services.scan_cache import scan_cache
+from backend.services.scan_pipeline import run_scan, scan_document
+from backend.utils.url_utils import normalize_url
+
+# Worker tasks, and so scans in flight, per batch; browser pages and LLM calls are further bounded by their own shared limits
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+BATCH_MAX_URLS = int(os.getenv("BATCH_MAX_URLS", "10000"))
+BATCH_WRITE_SIZE = int(os.getenv("BATCH_WRITE_SIZE", "50"))
+# Politeness: concurrent scans and minimum seconds between scan starts per host
+BATCH_PER_HOST_CONCURRENCY = int(os.getenv("BATCH_PER_HOST_CONCURRENCY", "1"))
+BATCH_HOST_DELAY = float(os.getenv("BATCH_HOST_DELAY", "1.0"))
+
+
+class _HostScheduler:
+    """
+    Hands out the batch's URLs host by host. A worker only takes a URL whose host has a free
+    slot and has waited out its politeness delay, so a busy or slow host never parks workers
+    that could be scanning other hosts.
+    """
+    def __init__(self, items: list, concurrency: int, delay: float):
+        self.concurrency = concurrency
+        self.delay = delay
+        self._queues = {}
+        for index, url in items:
+            # By site, so example.com and www.example.com share one politeness budget
+            self._queues.setdefault(dedupe_key(url)[0], deque()).append((index, url))
+        self._active = {}
+        self._last_start = {}
+        self._changed = asyncio.Condition()
+
+    async def take(self):
+        """The next (host, index, url) to scan, or None once every URL has been handed out."""
+        async with self._changed:
+            while self._queues:
+                now = time.monotonic()
+                free = [(self._last_start.get(host, -math.inf) + self.delay, host)
+                        for host in self._queues if self._active.get(host, 0) < self.concurrency]
+                timeout = None
+                if free:
+                    ready_at, host = min(free, key=lambda f: f[0])
+                    if ready_at <= now:
+                        return self._claim(host, now)
+                    timeout = ready_at - now
+                # Until a slot frees up or the earliest host's delay has passed
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            return None
+
+    def _claim(self, host: str, now: float):
+        queue = self._queues[host]
+        index, url = queue.popleft()
+        if not queue:
+            del self._queues[host]
+            if not self._queues:
+                self._changed.notify_all()
+        self._active[host] = self._active.get(host, 0) + 1
+        self._last_start[host] = now
+        return host, index, url
+
+    async def release(self, host: str):
+        async with self._changed:
+            self._active[host] -= 1
+            self._changed.notify_all()
+
+
+def parse_url_list(text: str) -> list:
+    """One URL per line (or first CSV column); blank lines and `#` comments are ignored."""
+    urls = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        urls.append(line.split(",")[0].strip().strip('"'))
+    return urls
+
+def dedupe_key(url: str) -> tuple:
+    """Same site and policy path: scheme, a leading `www.` and trailing slashes don't matter."""
+    parts = urlsplit(normalize_url(url))
+    host = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    return host, parts.path, parts.query
+
+def dedupe_urls(urls: list):
+    """Split into (index, url) pairs to scan and duplicates of an earlier entry."""
+    seen = {}
+    unique, duplicates = [], []
+    for i, url in enumerate(urls):
+        key = dedupe_key(url)
+        if key in seen:
+            duplicates.append({"index": i, "url": url, "status": "duplicate", "duplicate_of": seen[key]})
+        else:
+            seen[key] = i
+            unique.append((i, url))
+    return unique, duplicates
+
+async def _flush(pending: list):
+    docs = pending[:]
+    pending.clear()
+    if docs:
+        try:
+            await save_scan_results(docs)
+        except Exception:
+            logging.exception(f"Failed to persist {len(docs)} batch results")
+
+async def run_batch(urls: list, include_policy_text: bool = False):
+    """
+    Scan many URLs, yielding one result dict per input URL as soon as it completes.
+    Fresh results are persisted with bulk inserts every BATCH_WRITE_SIZE scans.
+    """
+    urls = urls[:BATCH_MAX_URLS]
+    unique, duplicates = dedupe_urls(urls)
+    logging.info(f"Batch of {len(urls)} URLs: {len(unique)} unique, {len(duplicates)} duplicates")
+    for line in duplicates:
+        yield line
+
+    scheduler = _HostScheduler(unique, BATCH_PER_HOST_CONCURRENCY, BATCH_HOST_DELAY)
+    completed = asyncio.Queue()
+    pending_docs = []
+    # Policy each finished scan resolved to (a fallback path may differ from the URL given), by dedupe key
+    resolved = {}
+    closed = False
+
+    async def scan_one(index: int, url: str):
+        if dedupe_key(url) in resolved:
+            await completed.put({"index": index, "url": url, "status": "duplicate",
+                                 "duplicate_of": resolved[dedupe_key(url)]})
+            return
+
+        async def fresh_scan():
+            result = await run_scan(url, persist=False)
+            doc = scan_document(result)
+            if closed:
+                # Finished after the batch ended (the scan is shielded from its cancellation)
+                await save_scan_result(doc)
+            else:
+                pending_docs.append(doc)
+            return result
+
+        try:
+            # A stale hit refreshes in the background, outliving this batch, so it saves its own result
+            result = await scan_cache.get_or_scan(url, fresh_scan, refresh_fn=lambda: run_scan(url))
+            resolved.setdefault(dedupe_key(result.get("url") or url), index)
+            if not include_policy_text:
+                result = {k: v for k, v in result.items() if k != "raw_policy_text"}
+            line = {"index": index, "url": url, "status": "done", "result": result}
+        except Exception as e:
+            logging.exception(f"Batch scan failed for {url}")
+            line = {"index": index, "url": url, "status": "failed", "error": str(e)}
+        await completed.put(line)
+
+    async def worker():
+        # A fixed pool of consumers pulls URLs as it goes, instead of one task per URL up front
+        while True:
+            job = await scheduler.take()
+            if job is None:
+                return
+            host, index, url = job
+            try:
+                await scan_one(index, url)
+            finally:
+                await scheduler.release(host)
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(BATCH_CONCURRENCY, len(unique)))]
+    try:
+        for _ in range(len(unique)):
+            line = await completed.get()
+            if len(pending_docs) >= BATCH_WRITE_SIZE:
+                await _flush(pending_docs)
+            yield line
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        closed = True
+        await _flush(pending_docs)
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from backend.utils.metrics import OPERATION_SECONDS
+
+
+logger = logging.getLogger(__name__)
+
+BROWSER_HEADLESS = os.getenv("BROWSER_HEADLESS", "true").lower() != "false"
+BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "4"))
+BROWSER_MAX_NAVIGATIONS = int(os.getenv("BROWSER_MAX_NAVIGATIONS", "50"))
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36"
+EXTRA_HTTP_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Connection": "keep-alive"
+}
+
+
+class _PageSlot:
+    """A browser context with its single page, reused across navigations."""
+
+    def __init__(self, context, page, generation: int):
+        self.context = context
+        self.page = page
+        self.generation = generation
+        self.navigations = 0
+        self.crashed = False
+        page.on("crash", lambda _: setattr(self, "crashed", True))
+
+    def usable(self, generation: int) -> bool:
+        return self.generation == generation and not self.crashed and not self.page.is_closed()
+
+
+class BrowserPool:
+    """
+    One long-lived Chromium shared by every fetcher.
+    At most `max_pages` pages are checked out at once; each context is
+    recycled after `max_navigations` uses, and a crashed or disconnected
+    browser is relaunched on the next checkout.
+    """
+
+    def __init__(self, max_pages: int = BROWSER_MAX_PAGES,
+                 max_navigations: int = BROWSER_MAX_NAVIGATIONS,
+                 headless: bool = BROWSER_HEADLESS):
+        self.max_pages = max_pages
+        self.max_navigations = max_navigations
+        self.headless = headless
+        self._semaphore = asyncio.Semaphore(max_pages)
+        self._lock = asyncio.Lock()
+        self._playwright = None
+        self._browser = None
+        self._generation = 0
+        self._idle = []
+
+    async def start(self):
+        async with self._lock:
+            await self._ensure_browser()
+
+    async def close(self):
+        async with self._lock:
+            for slot in self._idle:
+                await self._discard(slot)
+            self._idle.clear()
+            if self._browser:
+                try:
+                    await self._browser.close()
+                except Exception:
+                    logger.exception("Failed to close browser")
+                self._browser = None
+            if self._playwright:
+                await self._playwright.stop()
+                self._playwright = None
+            logger.info("Browser pool closed")
+
+    async def _ensure_browser(self):
+        if self._browser and self._browser.is_connected():
+            return
+        if self._browser:
+            logger.warning("Browser disconnected, relaunching")
+        self._idle.clear()
+        self._generation += 1
+        if self._playwright is None:
+            # Imported on first launch so app startup does not pay for it
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+        with OPERATION_SECONDS.labels(operation="browser_launch").time():
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        logger.info(f"Launched browser (generation {self._generation}, headless={self.headless})")
+
+    async def _acquire_slot(self) -> _PageSlot:
+        async with self._lock:
+            await self._ensure_browser()
+            while self._idle:
+                slot = self._idle.pop()
+                if slot.usable(self._generation):
+                    return slot
+                await self._discard(slot)
+            context = await self._browser.new_context(
+                user_agent=USER_AGENT,
+                extra_http_headers=EXTRA_HTTP_HEADERS
+            )
+            try:
+                page = await context.new_page()
+            except BaseException:
+                # Including cancellation: the context is not in any slot yet, so nothing else would close it
+                try:
+                    await context.close()
+                except Exception:
+                    logger.debug("Context already closed")
+                raise
+            return _PageSlot(context, page, self._generation)
+
+    async def _release(self, slot: _PageSlot):
+        connected = self._browser is not None and self._browser.is_connected()
+        if not connected or not slot.usable(self._generation) or slot.navigations >= self.max_navigations:
+            await self._discard(slot)
+            return
+        try:
+            await slot.context.clear_cookies()
+            await slot.page.goto("about:blank")
+        except Exception:
+            await self._discard(slot)
+            return
+        self._idle.append(slot)
+
+    async def _discard(self, slot: _PageSlot):
+        try:
+            await slot.context.close()
+        except Exception:
+            logger.debug("Context already closed")
+
+    @asynccontextmanager
+    async def page(self):
+        """Check out a page for one navigation; it is returned to the pool on exit."""
+        async with self._semaphore:
+            slot = await self._acquire_slot()
+            slot.navigations += 1
+            try:
+                yield slot.page
+            finally:
+                await self._release(slot)
+
+
+browser_pool = BrowserPool()
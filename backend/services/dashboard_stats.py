@@ -0,0 +1,38 @@
+import os
+from backend.database import (
+    get_rollup_totals, get_classification_stats, get_score_trend, get_top_trackers, get_country_stats,
+)
+from backend.utils.lru_cache import TTLCache
+
+# Seconds a dashboard aggregate may be served from memory before the rollups are re-read
+STATS_CACHE_TTL = float(os.getenv("STATS_CACHE_TTL", "30"))
+
+_cache = TTLCache(max_entries=256, ttl=STATS_CACHE_TTL)
+
+async def _cached(key: tuple, loader):
+    value = _cache.get(key)
+    if value is None:
+        value = await loader()
+        _cache.set(key, value)
+    return value
+
+async def overview() -> dict:
+    """Totals plus the classification split: everything the dashboard header cards need."""
+    async def load():
+        return {**await get_rollup_totals(), "classifications": await get_classification_stats()}
+    return await _cached(("overview",), load)
+
+async def classification_distribution() -> dict:
+    return await _cached(("classification",), get_classification_stats)
+
+async def score_trend(days: int = 30) -> list:
+    return await _cached(("score_trend", days), lambda: get_score_trend(days))
+
+async def top_trackers(limit: int = 10) -> list:
+    return await _cached(("trackers", limit), lambda: get_top_trackers(limit))
+
+async def countries() -> list:
+    return await _cached(("countries",), get_country_stats)
+
+def clear():
+    _cache.clear()
@@ -0,0 +1,280 @@
+import asyncio
+import csv
+import ipaddress
+import itertools
+import logging
+import os
+from array import array
+from bisect import bisect_right
+from backend.database import get_cached_geo, save_cached_geo
+from backend.services.http_client import http_client
+from backend.utils.executor import run_blocking
+from backend.utils.lru_cache import TTLCache
+
+try:
+    import maxminddb  # memory-mapped reader for .mmdb databases
+    MAXMINDDB_AVAILABLE = True
+except ImportError:
+    MAXMINDDB_AVAILABLE = False
+
+try:
+    import pycountry  # country names for databases that only carry ISO codes
+except ImportError:
+    pycountry = None
+
+# Offline IP database: a GeoLite2/DB-IP .mmdb file, or a CSV of IP ranges (see LocalRangeGeoBackend)
+GEO_DB_PATH = os.getenv("GEO_DB_PATH", "")
+# Set to 1 to never call the remote API (lookups missing from the local database come back Unknown)
+GEO_OFFLINE = os.getenv("GEO_OFFLINE", "0") == "1"
+GEO_REMOTE_URL = os.getenv("GEO_REMOTE_URL", "https://ipapi.co/{ip}/json/")
+GEO_CACHE_SIZE = int(os.getenv("GEO_CACHE_SIZE", "10000"))
+GEO_CACHE_TTL = float(os.getenv("GEO_CACHE_TTL", str(7 * 24 * 3600)))
+GEO_NEGATIVE_TTL = float(os.getenv("GEO_NEGATIVE_TTL", "300"))
+
+# CSV header aliases from common free range databases, mapped to our field names
+CSV_COLUMNS = {
+    "start": "start", "ip_start": "start", "start_ip": "start", "ip_from": "start", "network_start": "start",
+    "end": "end", "ip_end": "end", "end_ip": "end", "ip_to": "end", "network_end": "end",
+    "country": "country", "country_name": "country",
+    "country_code": "country_code", "country_iso_code": "country_code",
+    "region": "region", "region_name": "region", "stateprov": "region", "subdivision": "region",
+    "city": "city", "city_name": "city",
+    "latitude": "latitude", "lat": "latitude",
+    "longitude": "longitude", "lon": "longitude", "lng": "longitude",
+    "org": "org", "organization": "org", "asn_org": "org",
+}
+DBIP_LITE_COLUMNS = {
+    3: ["start", "end", "country_code"],
+    8: ["start", "end", None, "country_code", "region", "city", "latitude", "longitude"],
+}
+
+
+def _country_name(code: str):
+    if not code or pycountry is None:
+        return code or None
+    country = pycountry.countries.get(alpha_2=code.upper())
+    return country.name if country else code
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _is_ip_cell(value: str) -> bool:
+    try:
+        ipaddress.ip_address(value.strip())
+        return True
+    except ValueError:
+        return False
+
+def _ip_int(value: str) -> int:
+    value = value.strip()
+    return int(value) if value.isdigit() else int(ipaddress.ip_address(value))
+
+def make_geo(ip: str, source: str, country=None, region=None, city=None, org=None,
+             latitude=None, longitude=None) -> dict:
+    return {
+        "ip": ip,
+        "country": country or "Unknown",
+        "city": city or "Unknown",
+        "region": region or "Unknown",
+        "org": org or "Unknown",
+        "latitude": latitude,
+        "longitude": longitude,
+        "source": source,
+    }
+
+
+class GeoBackend:
+    """Resolves an IP address to a geo record (the `make_geo` shape), or None if unknown."""
+
+    name = "base"
+
+    async def lookup(self, ip: str):
+        raise NotImplementedError
+
+
+class LocalRangeGeoBackend(GeoBackend):
+    """
+    Offline lookups from a CSV of IP ranges: either with a header row of
+    DB-IP/IP2Location-style column names, or in the headerless DB-IP lite layouts.
+    Ranges are held in sorted compact arrays and found by binary search;
+    identical locations are stored once.
+    """
+
+    name = "local"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._tables = None
+        self._load_lock = asyncio.Lock()
+
+    def _load(self):
+        rows = {4: [], 6: []}
+        locations, location_ids = [], {}
+        with open(self.path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            if header and _is_ip_cell(header[0]):
+                # Headerless DB-IP "lite" layouts, told apart by their column count
+                fieldnames = DBIP_LITE_COLUMNS.get(len(header), [])
+                reader = itertools.chain([header], reader)
+            else:
+                fieldnames = [CSV_COLUMNS.get(name.strip().lower()) for name in header]
+            for raw in reader:
+                row = {field: value for field, value in zip(fieldnames, raw) if field}
+                try:
+                    start, end = _ip_int(row["start"]), _ip_int(row["end"])
+                except (KeyError, ValueError):
+                    continue
+                version = 6 if ":" in row["start"] or start > 0xFFFFFFFF else 4
+                location = (
+                    row.get("country") or _country_name(row.get("country_code")),
+                    row.get("region") or None,
+                    row.get("city") or None,
+                    _float(row.get("latitude")),
+                    _float(row.get("longitude")),
+                    row.get("org") or None,
+                )
+                if location not in location_ids:
+                    location_ids[location] = len(locations)
+                    locations.append(location)
+                rows[version].append((start, end, location_ids[location]))
+
+        tables = {}
+        for version, entries in rows.items():
+            entries.sort()
+            if version == 4:
+                # 12 bytes per range instead of three boxed ints
+                tables[4] = (array("I", (e[0] for e in entries)), array("I", (e[1] for e in entries)),
+                             array("I", (e[2] for e in entries)))
+            else:
+                tables[6] = ([e[0] for e in entries], [e[1] for e in entries], array("I", (e[2] for e in entries)))
+        logging.info(f"Loaded {len(rows[4])} IPv4 and {len(rows[6])} IPv6 ranges from {self.path}")
+        return tables, locations
+
+    async def lookup(self, ip: str):
+        if self._tables is None:
+            async with self._load_lock:
+                if self._tables is None:
+                    self._tables = await run_blocking(self._load)
+        tables, locations = self._tables
+        address = ipaddress.ip_address(ip)
+        starts, ends, location_index = tables[address.version]
+        n = int(address)
+        i = bisect_right(starts, n) - 1
+        if i < 0 or n > ends[i]:
+            return None
+        country, region, city, latitude, longitude, org = locations[location_index[i]]
+        return make_geo(ip, self.name, country, region, city, org, latitude, longitude)
+
+
+class MaxMindGeoBackend(GeoBackend):
+    """Offline lookups from a GeoLite2/DB-IP City .mmdb file, memory-mapped by `maxminddb`."""
+
+    name = "local"
+
+    def __init__(self, path: str):
+        self.reader = maxminddb.open_database(path, maxminddb.MODE_MMAP)
+
+    async def lookup(self, ip: str):
+        record = self.reader.get(ip)
+        if not record:
+            return None
+        names = lambda key: (record.get(key) or {}).get("names", {}).get("en")
+        subdivisions = record.get("subdivisions") or [{}]
+        location = record.get("location") or {}
+        return make_geo(
+            ip, self.name,
+            country=names("country") or _country_name((record.get("country") or {}).get("iso_code")),
+            region=subdivisions[0].get("names", {}).get("en"),
+            city=names("city"),
+            org=record.get("autonomous_system_organization"),
+            latitude=location.get("latitude"),
+            longitude=location.get("longitude"),
+        )
+
+
+class RemoteGeoBackend(GeoBackend):
+    """The ipapi.co JSON API through the shared HTTP client."""
+
+    name = "remote"
+
+    def __init__(self, url_template: str = GEO_REMOTE_URL):
+        self.url_template = url_template
+
+    async def lookup(self, ip: str):
+        data = await http_client.get_json(self.url_template.format(ip=ip))
+        if data.get("error"):
+            logging.warning(f"Remote geo lookup for {ip} failed: {data.get('reason')}")
+            return None
+        return make_geo(
+            ip, self.name,
+            country=data.get("country_name"), region=data.get("region"), city=data.get("city"),
+            org=data.get("org"), latitude=data.get("latitude"), longitude=data.get("longitude"),
+        )
+
+
+class GeoService:
+    """
+    Tries each backend in order (local before remote) behind an in-memory LRU and
+    the persistent `geo_cache` collection, both keyed by IP. Only remote answers
+    are persisted; local ones are cheaper to recompute than to fetch.
+    """
+
+    def __init__(self, backends: list):
+        self.backends = backends
+        self.memory = TTLCache(max_entries=GEO_CACHE_SIZE, ttl=GEO_CACHE_TTL)
+        self.stats_counts = {"memory_hits": 0, "persistent_hits": 0, "backend_lookups": 0, "misses": 0}
+
+    async def lookup(self, ip: str):
+        cached = self.memory.get(ip)
+        if cached is not None:
+            self.stats_counts["memory_hits"] += 1
+            return cached or None
+        cached = await get_cached_geo(ip)
+        if cached is not None:
+            self.stats_counts["persistent_hits"] += 1
+            self.memory.set(ip, cached)
+            return cached
+
+        for backend in self.backends:
+            try:
+                geo = await backend.lookup(ip)
+            except Exception as e:
+                logging.warning(f"{backend.name} geo lookup failed for {ip}: {e}")
+                continue
+            if geo is not None:
+                self.stats_counts["backend_lookups"] += 1
+                self.memory.set(ip, geo)
+                if backend.name == "remote":
+                    await save_cached_geo(ip, geo, GEO_CACHE_TTL)
+                return geo
+        self.stats_counts["misses"] += 1
+        # Remember the miss briefly so a flapping API is not hit on every scan
+        self.memory.set(ip, {}, ttl=GEO_NEGATIVE_TTL)
+        return None
+
+    def stats(self) -> dict:
+        return {**self.stats_counts, "memory_entries": len(self.memory), "backends": [b.name for b in self.backends]}
+
+
+def build_backends() -> list:
+    backends = []
+    if GEO_DB_PATH:
+        if not os.path.exists(GEO_DB_PATH):
+            logging.warning(f"GEO_DB_PATH {GEO_DB_PATH} does not exist; offline geo lookups disabled")
+        elif GEO_DB_PATH.endswith(".mmdb"):
+            if MAXMINDDB_AVAILABLE:
+                backends.append(MaxMindGeoBackend(GEO_DB_PATH))
+            else:
+                logging.warning("maxminddb is not installed; cannot read .mmdb geo database")
+        else:
+            backends.append(LocalRangeGeoBackend(GEO_DB_PATH))
+    if not GEO_OFFLINE:
+        backends.append(RemoteGeoBackend())
+    return backends
+
+
+geo_service = GeoService(build_backends())
@@ -0,0 +1,196 @@
+import asyncio
+import json
+import logging
+import os
+from contextlib import asynccontextmanager
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from urllib.parse import urlsplit
+import httpx
+from backend.utils.lru_cache import TTLCache
+from backend.services.browser_pool import USER_AGENT, EXTRA_HTTP_HEADERS
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", "4"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+# Responses remembered for ETag/Last-Modified revalidation
+HTTP_VALIDATOR_CACHE_SIZE = int(os.getenv("HTTP_VALIDATOR_CACHE_SIZE", "256"))
+HTTP_VALIDATOR_CACHE_TTL = float(os.getenv("HTTP_VALIDATOR_CACHE_TTL", str(7 * 24 * 3600)))
+
+
+class FetchResult:
+    def __init__(self, url: str, status_code: int, headers: dict, content: bytes,
+                 cookies: list, encoding: str, from_cache: bool = False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.cookies = cookies
+        self.encoding = encoding
+        self.from_cache = from_cache
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise httpx.HTTPError(f"HTTP {self.status_code} for {self.url}")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class HttpClient:
+    """
+    One shared httpx.AsyncClient: pooled keep-alive connections (HTTP/2 when `h2`
+    is installed), global and per-host concurrency limits, and conditional
+    re-fetches so an unchanged resource costs a 304.
+    """
+
+    def __init__(self, max_connections: int = HTTP_MAX_CONNECTIONS, max_per_host: int = HTTP_MAX_PER_HOST,
+                 timeout: float = HTTP_TIMEOUT):
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self._client = None
+        self._global = asyncio.Semaphore(max_connections)
+        # host -> [semaphore, holders and waiters]; dropped when nobody uses it, so it only grows with active hosts
+        self._hosts = {}
+        self._validators = TTLCache(max_entries=HTTP_VALIDATOR_CACHE_SIZE, ttl=HTTP_VALIDATOR_CACHE_TTL)
+        self.revalidated = 0
+
+    async def start(self):
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=self.timeout,
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT, **EXTRA_HTTP_HEADERS},
+            # Never keep cookies between requests; each scan must see the site fresh
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+        )
+        logging.info(f"HTTP client started (http2={HTTP2_AVAILABLE})")
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @asynccontextmanager
+    async def _host_slot(self, url: str):
+        host = urlsplit(url).hostname or ""
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = [asyncio.Semaphore(self.max_per_host), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1] and self._hosts.get(host) is entry:
+                del self._hosts[host]
+
+    @asynccontextmanager
+    async def stream(self, url: str, headers: dict = None):
+        """
+        Open a GET under the per-host and global limits and yield the httpx response
+        with its body unread, for callers that consume it with `iter_body`.
+        """
+        await self.start()
+        # Per-host slot first, so requests queued behind a busy host do not hold global capacity
+        async with self._host_slot(url), self._global:
+            async with self._client.stream("GET", url, headers=headers) as response:
+                yield response
+
+    @staticmethod
+    async def iter_body(response, max_bytes: int = None, chunk_size: int = None):
+        """The response body in chunks, stopping after `max_bytes`."""
+        read = 0
+        async for chunk in response.aiter_bytes(chunk_size):
+            if max_bytes and read + len(chunk) >= max_bytes:
+                yield chunk[:max_bytes - read]
+                logging.warning(f"Body of {response.url} truncated at {max_bytes} bytes")
+                return
+            read += len(chunk)
+            yield chunk
+
+    def conditional_headers(self, url: str, headers: dict = None):
+        """
+        (request headers, remembered value): `headers` plus If-None-Match /
+        If-Modified-Since when a previous response for `url` carried an ETag or
+        Last-Modified, and what the caller stored for it with `remember`.
+        """
+        request_headers = dict(headers or {})
+        entry = self._validators.get(url)
+        if entry is None:
+            return request_headers, None
+        validators, value = entry
+        if "etag" in validators:
+            request_headers["If-None-Match"] = validators["etag"]
+        if "last-modified" in validators:
+            request_headers["If-Modified-Since"] = validators["last-modified"]
+        return request_headers, value
+
+    def not_modified(self, url: str, response, cached) -> bool:
+        """True when `response` is a 304 for a request made with `conditional_headers`, so `cached` stands."""
+        if response.status_code != 304 or cached is None:
+            return False
+        self.revalidated += 1
+        logging.info(f"{url} not modified, reusing cached result")
+        return True
+
+    def remember(self, url: str, headers: dict, value):
+        """Keep `value` (what the caller made of a 200 response) for revalidation, if `headers` carry validators."""
+        validators = {k: headers[k] for k in ("etag", "last-modified") if k in headers}
+        if validators:
+            self._validators.set(url, (validators, value))
+
+    async def get(self, url: str, headers: dict = None, max_bytes: int = None,
+                  conditional: bool = True) -> FetchResult:
+        """
+        GET `url`, reading at most `max_bytes` of the body. When a previous
+        response carried an ETag or Last-Modified it is revalidated, and a 304
+        returns the remembered response with `from_cache=True`.
+        """
+        if conditional:
+            request_headers, cached = self.conditional_headers(url, headers)
+        else:
+            request_headers, cached = dict(headers or {}), None
+
+        async with self.stream(url, request_headers) as response:
+            if self.not_modified(url, response, cached):
+                return FetchResult(cached.url, 200, cached.headers, cached.content,
+                                   [], cached.encoding, from_cache=True)
+            content = bytearray()
+            async for chunk in self.iter_body(response, max_bytes):
+                content.extend(chunk)
+            result = FetchResult(
+                url=str(response.url),
+                status_code=response.status_code,
+                headers={k.lower(): v for k, v in response.headers.items()},
+                content=bytes(content),
+                cookies=list(response.cookies.keys()),
+                encoding=response.encoding or "utf-8",
+            )
+
+        if conditional and result.status_code == 200:
+            self.remember(url, result.headers, result)
+        return result
+
+    async def get_json(self, url: str):
+        result = await self.get(url, conditional=False)
+        result.raise_for_status()
+        return result.json()
+
+
+http_client = HttpClient()
@@ -0,0 +1,416 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import OperationFailure
+from backend.database import db, get_policy_text, policy_text_hash
+from backend.services.scan_cache import scan_cache
+from backend.services.scan_pipeline import run_scan
+from backend.utils.url_utils import normalize_url
+from backend.utils.tracing import request_context, request_id_var
+
+# "mongo" falls back to "memory" if MongoDB does not answer within JOB_STORE_PING_TIMEOUT at start
+JOB_STORE = os.getenv("JOB_STORE", "mongo")
+JOB_STORE_PING_TIMEOUT = float(os.getenv("JOB_STORE_PING_TIMEOUT", "2"))
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", "4"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.5"))
+# A running job whose lease lapses (e.g. its worker process died) is picked up again
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "600"))
+# Finished jobs are deleted this long after they finish
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", "3600"))
+# Claims (including reclaims after a lapsed lease) before a job that keeps killing its worker is failed
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+TERMINAL_STATUSES = ("done", "failed")
+
+
+def _new_job(url: str) -> dict:
+    now = datetime.utcnow()
+    return {
+        "_id": uuid.uuid4().hex,
+        "url": url,
+        # Lets the worker's logs and trace carry the ID of the request that queued the job
+        "request_id": request_id_var.get(),
+        "status": "queued",
+        "events": [],
+        "result": None,
+        "error": None,
+        "attempts": 0,
+        "created_at": now,
+        "updated_at": now,
+        "finished_at": None,
+    }
+
+
+def _stored_result(result: dict) -> dict:
+    """
+    The job's copy of a scan result. The policy text is left out, since the result
+    cache and `policy_texts` already hold it; its hash lets `full_result` re-attach it.
+    """
+    stored = {k: v for k, v in result.items() if k != "raw_policy_text"}
+    if result.get("raw_policy_text"):
+        stored["policy_text_hash"] = policy_text_hash(result["raw_policy_text"])
+    return stored
+
+
+class JobStore:
+    """Persistence for scan jobs; workers claim queued jobs and record progress."""
+
+    async def ensure_indexes(self):
+        pass
+
+    async def create(self, job: dict):
+        raise NotImplementedError
+
+    async def get(self, job_id: str):
+        raise NotImplementedError
+
+    async def claim(self):
+        raise NotImplementedError
+
+    async def add_event(self, job_id: str, event: dict):
+        raise NotImplementedError
+
+    async def finish(self, job_id: str, status: str, result: dict = None, error: str = None):
+        raise NotImplementedError
+
+
+class MemoryJobStore(JobStore):
+    """Process-local stand-in for development and single-worker deployments."""
+
+    def __init__(self, ttl: float = JOB_RESULT_TTL):
+        self.ttl = ttl
+        self._jobs = {}
+        self._queue = deque()
+        # (monotonic finish time, job ID) in finishing order, which is also expiry order
+        self._finished = deque()
+
+    def _evict(self):
+        cutoff = time.monotonic() - self.ttl
+        while self._finished and self._finished[0][0] <= cutoff:
+            self._jobs.pop(self._finished.popleft()[1], None)
+
+    async def create(self, job: dict):
+        self._evict()
+        self._jobs[job["_id"]] = job
+        self._queue.append(job["_id"])
+
+    async def get(self, job_id: str):
+        self._evict()
+        return self._jobs.get(job_id)
+
+    async def claim(self):
+        self._evict()
+        while self._queue:
+            job = self._jobs.get(self._queue.popleft())
+            if job and job["status"] == "queued":
+                job["status"] = "running"
+                job["attempts"] += 1
+                job["updated_at"] = datetime.utcnow()
+                return job
+        return None
+
+    async def add_event(self, job_id: str, event: dict):
+        job = self._jobs[job_id]
+        job["events"].append(event)
+        job["updated_at"] = datetime.utcnow()
+
+    async def finish(self, job_id: str, status: str, result: dict = None, error: str = None):
+        job = self._jobs[job_id]
+        now = datetime.utcnow()
+        job.update(status=status, result=result, error=error, updated_at=now, finished_at=now)
+        self._finished.append((time.monotonic(), job_id))
+
+
+class MongoJobStore(JobStore):
+    """Jobs in the `scan_jobs` collection, shared by every API process."""
+
+    def __init__(self, collection=None):
+        self._collection = collection
+
+    @property
+    def collection(self):
+        # Resolved on use so building the store does not open the database connection
+        return self._collection if self._collection is not None else db.scan_jobs
+
+    async def reachable(self, timeout: float = JOB_STORE_PING_TIMEOUT) -> bool:
+        try:
+            await asyncio.wait_for(self.collection.database.command("ping"), timeout)
+            return True
+        except Exception as e:
+            logging.warning(f"Job store unreachable: {e!r}")
+            return False
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([("status", ASCENDING), ("created_at", ASCENDING)])
+        # Only finished jobs have `finished_at`, so queued and running ones never expire
+        try:
+            await self.collection.create_index("finished_at", name="finished_at_ttl", expireAfterSeconds=JOB_RESULT_TTL)
+        except OperationFailure:
+            # The index exists with another JOB_RESULT_TTL; change it in place
+            await db.command("collMod", self.collection.name,
+                             index={"name": "finished_at_ttl", "expireAfterSeconds": JOB_RESULT_TTL})
+
+    async def create(self, job: dict):
+        await self.collection.insert_one(job)
+
+    async def get(self, job_id: str):
+        return await self.collection.find_one({"_id": job_id})
+
+    async def claim(self):
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {"$or": [
+                {"status": "queued"},
+                {"status": "running", "lease_until": {"$lt": now}},
+            ]},
+            {
+                "$set": {"status": "running", "lease_until": now + timedelta(seconds=JOB_LEASE_SECONDS), "updated_at": now},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def add_event(self, job_id: str, event: dict):
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": job_id},
+            {
+                "$push": {"events": event},
+                "$set": {"updated_at": now, "lease_until": now + timedelta(seconds=JOB_LEASE_SECONDS)},
+            }
+        )
+
+    async def finish(self, job_id: str, status: str, result: dict = None, error: str = None):
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": job_id},
+            {"$set": {"status": status, "result": result, "error": error, "updated_at": now, "finished_at": now},
+             "$unset": {"lease_until": ""}}
+        )
+
+
+class _Watch:
+    """Waiters on one job and the event set when it next changes."""
+
+    __slots__ = ("event", "waiters")
+
+    def __init__(self):
+        self.event = asyncio.Event()
+        self.waiters = 0
+
+
+class _Broadcast:
+    """Local jobs sharing one in-flight scan of a URL, and the stage events reported so far."""
+
+    __slots__ = ("job_ids", "events")
+
+    def __init__(self):
+        self.job_ids = []
+        self.events = []
+
+
+class JobQueue:
+    """
+    Asynchronous scan jobs: `submit` returns an ID immediately and a pool of
+    worker tasks runs the scan pipeline, recording each stage as an event.
+    """
+
+    def __init__(self, store: JobStore, workers: int = SCAN_WORKERS):
+        self.store = store
+        self.workers = workers
+        self._tasks = []
+        self._wakeup = asyncio.Event()
+        self._signals = {}
+        # Normalized URL -> _Broadcast, while local jobs for it are running
+        self._broadcasts = {}
+
+    async def start(self):
+        if isinstance(self.store, MongoJobStore) and not await self.store.reachable():
+            # Keeps the synchronous /api/scan/ working without a database, as it did before jobs
+            logging.warning("MongoDB unreachable; scan jobs will be kept in this process's memory")
+            self.store = MemoryJobStore()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logging.info(f"Started {self.workers} scan workers ({self.store.__class__.__name__})")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, url: str) -> str:
+        job = _new_job(url)
+        await self.store.create(job)
+        self._wakeup.set()
+        logging.info(f"Queued scan job {job['_id']} for {url}")
+        return job["_id"]
+
+    async def get(self, job_id: str):
+        return await self.store.get(job_id)
+
+    async def full_result(self, job: dict) -> dict:
+        """A finished job's result with its policy text re-attached from the result cache or `policy_texts`."""
+        result = dict(job["result"])
+        text_hash = result.pop("policy_text_hash", None)
+        if text_hash:
+            cached = scan_cache.peek(job["url"]) or {}
+            text = cached.get("raw_policy_text")
+            if not text or policy_text_hash(text) != text_hash:
+                text = await get_policy_text(text_hash)
+            result["raw_policy_text"] = text or ""
+        return result
+
+    @contextmanager
+    def _watching(self, job_id: str):
+        """
+        Register a waiter on a job for the duration of the block. Entries exist only while
+        someone waits, so unknown jobs and jobs finished by other processes leave none behind.
+        """
+        watch = self._signals.get(job_id)
+        if watch is None:
+            watch = self._signals[job_id] = _Watch()
+        watch.waiters += 1
+        try:
+            yield watch
+        finally:
+            watch.waiters -= 1
+            if not watch.waiters and self._signals.get(job_id) is watch:
+                del self._signals[job_id]
+
+    def _notify(self, job_id: str, terminal: bool = False):
+        watch = self._signals.pop(job_id, None) if terminal else self._signals.get(job_id)
+        if watch is not None:
+            signal = watch.event
+            if not terminal:
+                watch.event = asyncio.Event()
+            signal.set()
+
+    async def _changed(self, signal: asyncio.Event):
+        # Local workers signal immediately; jobs run by other processes are picked up by polling
+        try:
+            await asyncio.wait_for(signal.wait(), JOB_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+    async def wait(self, job_id: str, timeout: float = None):
+        """Wait until the job reaches a terminal status; returns the job (or None if unknown)."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout else None
+        job = await self.store.get(job_id)
+        if job is None or job["status"] in TERMINAL_STATUSES:
+            return job
+        with self._watching(job_id) as watch:
+            while True:
+                signal = watch.event
+                job = await self.store.get(job_id)
+                if job is None or job["status"] in TERMINAL_STATUSES:
+                    return job
+                if deadline and loop.time() > deadline:
+                    raise asyncio.TimeoutError(f"Job {job_id} still {job['status']} after {timeout}s")
+                await self._changed(signal)
+
+    async def events(self, job_id: str):
+        """Yield (event, data) pairs for each recorded stage, ending with the terminal status."""
+        if await self.store.get(job_id) is None:
+            yield "error", {"error": "Job not found"}
+            return
+        sent = 0
+        with self._watching(job_id) as watch:
+            while True:
+                signal = watch.event
+                job = await self.store.get(job_id)
+                if job is None:
+                    yield "error", {"error": "Job not found"}
+                    return
+                for event in job["events"][sent:]:
+                    yield "stage", event
+                sent = len(job["events"])
+                if job["status"] in TERMINAL_STATUSES:
+                    yield job["status"], {"job_id": job_id, "status": job["status"], "error": job["error"]}
+                    return
+                await self._changed(signal)
+
+    async def _worker(self, n: int):
+        while True:
+            try:
+                job = await self.store.claim()
+            except Exception:
+                logging.exception(f"Scan worker {n} failed to claim a job")
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._process(job)
+
+    async def _process(self, job: dict):
+        job_id, url = job["_id"], job["url"]
+        with request_context(job.get("request_id") or job_id):
+            if job["attempts"] > JOB_MAX_ATTEMPTS:
+                logging.error(f"Scan job {job_id} for {url} abandoned after {job['attempts'] - 1} attempts")
+                await self.store.finish(job_id, "failed", error=f"Scan abandoned after {job['attempts'] - 1} attempts")
+            else:
+                await self._run_job(job_id, url)
+        self._notify(job_id, terminal=True)
+
+    async def _join_broadcast(self, job_id: str, key: str) -> _Broadcast:
+        broadcast = self._broadcasts.get(key)
+        if broadcast is None:
+            broadcast = self._broadcasts[key] = _Broadcast()
+        elif broadcast.events:
+            # Joining a scan already under way: catch up on the stages it has reported
+            for event in broadcast.events:
+                await self.store.add_event(job_id, event)
+            self._notify(job_id)
+        broadcast.job_ids.append(job_id)
+        return broadcast
+
+    def _leave_broadcast(self, job_id: str, key: str, broadcast: _Broadcast):
+        broadcast.job_ids.remove(job_id)
+        if not broadcast.job_ids and self._broadcasts.get(key) is broadcast:
+            del self._broadcasts[key]
+
+    async def _run_job(self, job_id: str, url: str):
+        logging.info(f"Running scan job {job_id} for {url}")
+        # Concurrent jobs for a URL share one scan (see scan_cache); each of them gets its stage events
+        key = normalize_url(url)
+        broadcast = await self._join_broadcast(job_id, key)
+
+        async def on_stage(stage, status, elapsed_ms):
+            event = {"stage": stage, "status": status, "elapsed_ms": elapsed_ms, "at": datetime.utcnow()}
+            broadcast.events.append(event)
+            for follower in list(broadcast.job_ids):
+                await self.store.add_event(follower, event)
+                self._notify(follower)
+
+        try:
+            # A stale hit refreshes in the background after this job has finished,
+            # so only a real miss reports its stages to the job
+            result = await scan_cache.get_or_scan(
+                url, lambda: run_scan(url, on_stage=on_stage), refresh_fn=lambda: run_scan(url)
+            )
+            await self.store.finish(job_id, "done", result=_stored_result(result))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.exception(f"Scan job {job_id} failed")
+            await self.store.finish(job_id, "failed", error=str(e))
+        finally:
+            self._leave_broadcast(job_id, key, broadcast)
+
+
+def _make_store() -> JobStore:
+    return MemoryJobStore() if JOB_STORE == "memory" else MongoJobStore()
+
+
+job_queue = JobQueue(_make_store())
@@ -0,0 +1,292 @@
+import json
+import os
+import random
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from backend.utils.resilience import TokenBucket, CircuitBreaker, backoff_delay
+from backend.utils.metrics import OPERATION_SECONDS, LLM_ERRORS, LLM_RETRIES, LLM_TOKENS
+
+GEMINI_MODEL = "gemini-2.5-flash"
+
+# Quota, in requests and (estimated) tokens per minute; 0 disables the limit
+LLM_RPM = float(os.getenv("LLM_RPM", "60"))
+LLM_TPM = float(os.getenv("LLM_TPM", "250000"))
+# Seconds a single attempt may take, and a whole generate() call including retries
+LLM_CALL_TIMEOUT = float(os.getenv("LLM_CALL_TIMEOUT", "30"))
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))
+# Send a duplicate request when the first has not answered after this many seconds; 0 disables hedging
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "0"))
+LLM_CALL_WORKERS = int(os.getenv("LLM_CALL_WORKERS", "16"))
+# Attempts abandoned at their timeout keep a worker thread until the SDK call returns;
+# with this many still running, calls fail fast instead of queueing behind them
+LLM_MAX_ABANDONED = int(os.getenv("LLM_MAX_ABANDONED", str(max(LLM_CALL_WORKERS // 2, 1))))
+
+# Error types (by class name, so google.api_core need not be imported) worth retrying
+RETRYABLE_ERRORS = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+    "DeadlineExceeded", "GatewayTimeout", "BadGateway", "Aborted",
+    "TimeoutError", "ConnectionError", "RetryableLLMError",
+}
+
+
+class LLMError(Exception):
+    pass
+
+class RetryableLLMError(LLMError):
+    """A transient failure (quota, overload, timeout) that may succeed on retry."""
+
+class CircuitOpenError(LLMError):
+    """Raised instead of calling the LLM while its circuit breaker is open."""
+
+
+def is_retryable(error: Exception) -> bool:
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+def estimate_tokens(prompt: str, max_output_tokens: int) -> int:
+    """Rough token cost of a call (about 4 characters per token) for the TPM limit."""
+    return len(prompt) // 4 + max_output_tokens
+
+
+class LLMClient:
+    """Minimal text-generation interface used by the summarizers."""
+
+    def generate(self, prompt: str, max_output_tokens: int = 1500, timeout: float = None) -> str:
+        raise NotImplementedError
+
+    def available(self) -> bool:
+        """False while calls are known to fail, so callers can go straight to a fallback."""
+        return True
+
+    def warm(self):
+        """Do any one-off setup (SDK import, model handle) ahead of the first call."""
+
+
+class GeminiClient(LLMClient):
+    """Gemini through one model handle, created on first use and shared by all threads."""
+
+    def __init__(self, model_name: str = GEMINI_MODEL, api_key: str = None):
+        self.model_name = model_name
+        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    # The SDK (and grpc under it) takes a while to import; only pay for it when used
+                    import google.generativeai as genai
+                    if self.api_key:
+                        genai.configure(api_key=self.api_key)
+                    self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def warm(self):
+        self._get_model()
+
+    def generate(self, prompt: str, max_output_tokens: int = 1500, timeout: float = None) -> str:
+        response = self._get_model().generate_content(
+            prompt,
+            generation_config={"max_output_tokens": max_output_tokens},
+            request_options={"timeout": timeout} if timeout else None,
+        )
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            LLM_TOKENS.labels(kind="prompt").inc(getattr(usage, "prompt_token_count", 0) or 0)
+            LLM_TOKENS.labels(kind="output").inc(getattr(usage, "candidates_token_count", 0) or 0)
+
+        text_output = ""
+        for c in getattr(response, "candidates", []):
+            for part in getattr(getattr(c, "content", None), "parts", []):
+                if hasattr(part, "text") and part.text.strip():
+                    text_output += part.text.strip() + " "
+        return text_output.strip()
+
+
+class ResilientLLMClient(LLMClient):
+    """
+    Wraps an LLMClient with RPM/TPM token buckets, per-attempt timeouts and an
+    overall deadline, retries with jittered exponential backoff on transient
+    errors, a circuit breaker, and optional hedged requests.
+    """
+
+    def __init__(self, inner: LLMClient, rpm: float = LLM_RPM, tpm: float = LLM_TPM,
+                 call_timeout: float = LLM_CALL_TIMEOUT, deadline: float = LLM_DEADLINE,
+                 max_retries: int = LLM_MAX_RETRIES, hedge_after: float = LLM_HEDGE_AFTER,
+                 max_abandoned: int = LLM_MAX_ABANDONED):
+        self.inner = inner
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.call_timeout = call_timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.hedge_after = hedge_after
+        self.max_abandoned = max_abandoned
+        self.breaker = CircuitBreaker("llm", LLM_BREAKER_THRESHOLD, LLM_BREAKER_RESET)
+        # Attempts run here so a hung call can be abandoned at its timeout
+        self._executor = ThreadPoolExecutor(max_workers=LLM_CALL_WORKERS, thread_name_prefix="llm-call")
+        self.stats = {"calls": 0, "retries": 0, "timeouts": 0, "hedges": 0, "rejected": 0, "abandoned": 0}
+        self._abandoned = 0
+        self._abandoned_lock = threading.Lock()
+
+    def available(self) -> bool:
+        return self.breaker.available() and self._abandoned < self.max_abandoned
+
+    def warm(self):
+        self.inner.warm()
+
+    def _admit(self, cost: int, deadline: float) -> bool:
+        if not self.requests.acquire(1, deadline):
+            return False
+        if self.tokens.acquire(cost, deadline):
+            return True
+        self.requests.refund(1)
+        return False
+
+    def _try_admit(self, cost: int) -> bool:
+        """Take quota for one more request only if both buckets have it now."""
+        if self.requests.try_acquire(1):
+            return False
+        if self.tokens.try_acquire(cost):
+            self.requests.refund(1)
+            return False
+        return True
+
+    def _abandon(self, futures: list):
+        """Stop waiting on `futures`; those already running are counted until they return."""
+        for future in futures:
+            if future.cancel():
+                continue
+            with self._abandoned_lock:
+                self._abandoned += 1
+                self.stats["abandoned"] += 1
+            future.add_done_callback(self._abandoned_done)
+
+    def _abandoned_done(self, future):
+        with self._abandoned_lock:
+            self._abandoned -= 1
+
+    def _attempt(self, prompt: str, max_output_tokens: int, cost: int, deadline: float) -> str:
+        """One attempt, hedged with a duplicate request if the first is slow and quota allows."""
+        timeout = min(self.call_timeout, deadline - time.monotonic())
+        if timeout <= 0:
+            raise TimeoutError("LLM call deadline passed")
+        futures = [self._executor.submit(self.inner.generate, prompt, max_output_tokens, timeout)]
+        try:
+            return self._await_attempt(futures, prompt, max_output_tokens, cost, timeout)
+        finally:
+            self._abandon([future for future in futures if not future.done()])
+
+    def _await_attempt(self, futures: list, prompt: str, max_output_tokens: int, cost: int, timeout: float) -> str:
+        started = time.monotonic()
+        if self.hedge_after and self.hedge_after < timeout:
+            done, _ = wait(futures, timeout=self.hedge_after)
+            # Quota is only charged for a hedge that is actually sent
+            if not done and self._abandoned < self.max_abandoned and self._try_admit(cost):
+                self.stats["hedges"] += 1
+                futures.append(self._executor.submit(self.inner.generate, prompt, max_output_tokens, timeout))
+
+        error = None
+        pending = set(futures)
+        while pending:
+            remaining = timeout - (time.monotonic() - started)
+            done, pending = wait(pending, timeout=max(remaining, 0), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = error or future.exception()
+        if error is not None and not pending:
+            raise error
+        self.stats["timeouts"] += 1
+        raise TimeoutError(f"LLM call exceeded {timeout:.1f}s")
+
+    def generate(self, prompt: str, max_output_tokens: int = 1500, timeout: float = None) -> str:
+        deadline = time.monotonic() + (timeout or self.deadline)
+        cost = estimate_tokens(prompt, max_output_tokens)
+        self.stats["calls"] += 1
+        for attempt in range(self.max_retries + 1):
+            # Checked per attempt and before any quota is taken: a failure while half-open
+            # re-opens the circuit mid-retry, and rejected calls should not use up the rate limit
+            if not self.breaker.allow():
+                self.stats["rejected"] += 1
+                LLM_ERRORS.labels(error="CircuitOpenError").inc()
+                raise CircuitOpenError("LLM circuit is open")
+            if self._abandoned >= self.max_abandoned:
+                self.breaker.release()
+                self.stats["rejected"] += 1
+                LLM_ERRORS.labels(error="TooManyAbandoned").inc()
+                raise RetryableLLMError(f"{self._abandoned} timed-out LLM calls are still running")
+            if not self._admit(cost, deadline):
+                self.breaker.release()
+                raise TimeoutError("LLM rate limit would exceed the call deadline")
+            try:
+                with OPERATION_SECONDS.labels(operation="llm_call").time():
+                    result = self._attempt(prompt, max_output_tokens, cost, deadline)
+            except Exception as e:
+                LLM_ERRORS.labels(error=type(e).__name__).inc()
+                # Non-retryable ones too: an invalid key or a rejected request fails every call alike
+                self.breaker.record_failure()
+                if not is_retryable(e):
+                    raise
+                delay = backoff_delay(attempt, LLM_BACKOFF_BASE, LLM_BACKOFF_MAX)
+                if attempt == self.max_retries or time.monotonic() + delay >= deadline:
+                    raise
+                self.stats["retries"] += 1
+                LLM_RETRIES.inc()
+                logging.warning(f"LLM attempt {attempt + 1} failed ({type(e).__name__}: {e}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+        raise LLMError("LLM retries exhausted")
+
+
+class FakeLLMClient(LLMClient):
+    """
+    Local stand-in with artificial latency and injected errors, for exercising
+    the summarizers and the resilience policies without network access or API quota.
+    `slow_rate` of calls take `slow_latency` instead, to produce a latency tail.
+    """
+
+    def __init__(self, latency: float = 0.5, fail_every: int = 0, error_rate: float = 0.0,
+                 error: type = RetryableLLMError, slow_rate: float = 0.0, slow_latency: float = 5.0,
+                 seed: int = None):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.error_rate = error_rate
+        self.error = error
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def generate(self, prompt: str, max_output_tokens: int = 1500, timeout: float = None) -> str:
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            slow = self._random.random() < self.slow_rate
+            failing = (self.fail_every and call % self.fail_every == 0) or self._random.random() < self.error_rate
+        latency = self.slow_latency if slow else self.latency
+        time.sleep(min(latency, timeout) if timeout else latency)
+        if timeout and latency > timeout:
+            raise TimeoutError(f"Fake LLM call {call} timed out")
+        if failing:
+            raise self.error(f"Fake LLM failure on call {call}")
+        excerpt = " ".join(prompt.split()[-60:])
+        logging.debug(f"FakeLLMClient call {call} ({len(prompt)} chars)")
+        return json.dumps({
+            "summary": excerpt[:max_output_tokens * 4],
+            "bullets": [excerpt[i * 40:(i + 1) * 40] or "n/a" for i in range(5)],
+            "tone": "neutral",
+            "risks": [],
+        })
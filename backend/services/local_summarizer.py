@@ -0,0 +1,104 @@
+import logging
+import re
+import numpy as np
+from backend.services.summarizer_backend import SummarizerBackend, empty_summary
+from backend.utils.text_features import scan_text, keyword_counts
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_LEGAL_RE = re.compile(r"\b(?:herein|hereby|hereunder|pursuant|notwithstanding|shall|thereof|whereas)\b", re.IGNORECASE)
+_FRIENDLY_RE = re.compile(r"\b(?:you'll|we'll|don't|we're|you're|simply|easy|happy)\b", re.IGNORECASE)
+
+MIN_SENTENCE_CHARS = 30
+MAX_SENTENCE_CHARS = 600
+# TextRank is quadratic in sentences; longer policies are pre-filtered to the most risk-relevant ones
+MAX_RANKED_SENTENCES = 300
+RISK_WEIGHT = 0.5
+# Families a bullet should cover, most important first
+BULLET_FAMILIES = ["sharing", "third_party", "tracking", "data_collection", "user_rights"]
+
+
+def split_sentences(text: str) -> list:
+    sentences = (s.strip() for s in _SENTENCE_RE.split(text))
+    return [s for s in sentences if MIN_SENTENCE_CHARS <= len(s) <= MAX_SENTENCE_CHARS]
+
+def textrank(sentences: list, damping: float = 0.85, iterations: int = 30) -> np.ndarray:
+    """PageRank over the TF-IDF cosine-similarity graph of `sentences`."""
+    from sklearn.feature_extraction.text import TfidfVectorizer  # deferred: sklearn is slow to import
+    tfidf = TfidfVectorizer(stop_words="english").fit_transform(sentences)
+    similarity = (tfidf @ tfidf.T).toarray()
+    np.fill_diagonal(similarity, 0.0)
+    row_sums = similarity.sum(axis=1, keepdims=True)
+    row_sums[row_sums == 0] = 1.0
+    transition = similarity / row_sums
+    n = len(sentences)
+    ranks = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        ranks = (1 - damping) / n + damping * transition.T @ ranks
+    return ranks
+
+def _tone(text: str, sentence_count: int) -> str:
+    sentence_count = max(sentence_count, 1)
+    if len(_LEGAL_RE.findall(text)) / sentence_count > 0.15:
+        return "legalistic"
+    if len(_FRIENDLY_RE.findall(text)) / sentence_count > 0.1:
+        return "friendly"
+    return "neutral"
+
+
+class LocalSummarizer(SummarizerBackend):
+    """
+    CPU-only extractive summarizer: ranks sentences with TextRank over TF-IDF,
+    boosts those mentioning risk keyword families and fills the same
+    summary/bullets/tone/risks schema as the LLM path.
+    """
+
+    name = "local"
+
+    def summarize(self, prompt: str, text: str, max_tokens: int = 1500) -> dict:
+        sentences = split_sentences(text)
+        if not sentences:
+            return empty_summary("Insufficient policy text.")
+        families = [keyword_counts(scan_text(s)) for s in sentences]
+        risk_hits = np.array([sum(f.values()) - f["user_rights"] for f in families], dtype=float)
+
+        if len(sentences) > MAX_RANKED_SENTENCES:
+            keep = np.sort(np.argsort(-risk_hits, kind="stable")[:MAX_RANKED_SENTENCES])
+            sentences = [sentences[i] for i in keep]
+            families = [families[i] for i in keep]
+            risk_hits = risk_hits[keep]
+
+        try:
+            ranks = textrank(sentences) if len(sentences) > 1 else np.ones(1)
+        except ValueError:
+            # Only stop words: fall back to document order
+            ranks = np.linspace(1.0, 0.5, len(sentences))
+        scores = ranks * (1 + RISK_WEIGHT * risk_hits)
+        order = list(np.argsort(-scores, kind="stable"))
+
+        summary_idx = sorted(order[:3])
+        bullets_idx = []
+        for family in BULLET_FAMILIES:
+            best = next((i for i in order if families[i][family] and i not in bullets_idx), None)
+            if best is not None:
+                bullets_idx.append(best)
+        for i in order:
+            if len(bullets_idx) >= 5:
+                break
+            if i not in bullets_idx:
+                bullets_idx.append(i)
+        bullets = [sentences[i] for i in bullets_idx]
+        bullets += ["Not stated in the policy."] * (5 - len(bullets))
+
+        risks = [
+            sentences[i] for i in order
+            if families[i]["sharing"] or (families[i]["third_party"] and families[i]["tracking"])
+        ][:5]
+
+        logging.info(f"Local summary built from {len(sentences)} sentences")
+        return {
+            "summary": " ".join(sentences[i] for i in summary_idx),
+            "bullets": bullets,
+            "tone": _tone(text, len(sentences)),
+            "risks": risks,
+            "engine": self.name,
+        }
@@ -1,32 +1,98 @@
-import re
+import os
 import numpy as np
-import joblib
 import logging
-from sklearn.feature_extraction.text import TfidfVectorizer
+from backend.utils.micro_batcher import MicroBatcher
+from backend.utils.model_artifacts import is_artifact, load_artifact
+from backend.utils.service_registry import registry
+from backend.utils.text_features import scan_text, keyword_counts
 
-try:
-    model = joblib.load("models/transparency_model.pkl")
-    vectorizer = joblib.load("models/vectorizer.pkl")
-    print("Loaded trained model and vectorizer.")
-except Exception:
-    print("No trained model found. Using fallback scoring system.")
-    model = None
-    vectorizer = None
+# Memory-mapped exports of the two pickles below (python -m backend.utils.model_artifacts export-transparency),
+# or a model trained on the streaming hashing vectorizer (... model_artifacts train-hashing), which
+# featurizes huge policies chunk by chunk in bounded memory
+TRANSPARENCY_ARTIFACT_DIR = os.getenv("TRANSPARENCY_ARTIFACT_DIR", "models/transparency")
+
+def load_transparency_model():
+    """(model, vectorizer), or (None, None) when no trained model is available."""
+    model_path = os.path.join(TRANSPARENCY_ARTIFACT_DIR, "model")
+    vectorizer_path = os.path.join(TRANSPARENCY_ARTIFACT_DIR, "vectorizer")
+    if is_artifact(model_path) and is_artifact(vectorizer_path):
+        logging.info(f"Loaded model and vectorizer artifacts from {TRANSPARENCY_ARTIFACT_DIR}.")
+        return load_artifact(model_path), load_artifact(vectorizer_path)
+    try:
+        import joblib
+        model = joblib.load("models/transparency_model.pkl")
+        vectorizer = joblib.load("models/vectorizer.pkl")
+        logging.info("Loaded trained model and vectorizer.")
+        return model, vectorizer
+    except Exception:
+        logging.info("No trained model found. Using fallback scoring system.")
+        return None, None
+
+registry.register("transparency_model", load_transparency_model)
 
 def extract_features(policy_text: str):
     """
     Basic keyword-based scoring fallback if ML model not available.
     Returns: Dict of computed heuristic scores.
     """
-    text = policy_text.lower()
-    features = {
-        "data_collection": len(re.findall(r"collect|gather|store|retain", text)),
-        "third_party": len(re.findall(r"third.?party|affiliate|partner", text)),
-        "tracking": len(re.findall(r"track|cookie|analytics|beacon", text)),
-        "sharing": len(re.findall(r"share|sell|disclose|transfer", text)),
-        "user_rights": len(re.findall(r"access|delete|opt.?out|control|consent", text)),
+    return keyword_counts(scan_text(policy_text))
+
+LABEL_MAP = {0: "Risky", 1: "Neutral", 2: "Safe"}
+
+def _heuristic_transparency(policy_text: str) -> dict:
+    feats = extract_features(policy_text)
+
+    risk_points = (
+        feats["data_collection"] * 2 +
+        feats["third_party"] * 3 +
+        feats["tracking"] * 2 +
+        feats["sharing"] * 4 -
+        feats["user_rights"] * 3
+    )
+
+    raw_score = max(0, 100 - risk_points * 2)
+    score = min(raw_score, 100)
+
+    if score > 75:
+        label = "Safe"
+    elif score > 45:
+        label = "Neutral"
+    else:
+        label = "Risky"
+
+    return {
+        "score": round(score, 2),
+        "label": label,
+        "confidence": round(abs(score - 50) / 50, 2)
     }
-    return features
+
+def predict_transparency_batch(texts: list) -> list:
+    """
+    Score many policies with one vectorizer.transform and one predict_proba call.
+    Results keep input order.
+    """
+    if not texts:
+        return []
+    try:
+        model, vectorizer = registry.get("transparency_model")
+        if model and vectorizer:
+            X = vectorizer.transform(texts)
+            probs = model.predict_proba(X)
+            results = []
+            for pred_prob in probs:
+                confidence = float(np.max(pred_prob))
+                results.append({
+                    "score": round(confidence * 100, 2),
+                    "label": LABEL_MAP.get(int(np.argmax(pred_prob)), "Neutral"),
+                    "confidence": confidence
+                })
+            return results
+
+        return [_heuristic_transparency(text) for text in texts]
+
+    except Exception:
+        logging.exception("Model prediction failed.")
+        return [{"score": 0.0, "label": "Unknown", "confidence": 0.0} for _ in texts]
 
 def predict_transparency(policy_text: str) -> dict:
     """
@@ -37,46 +103,6 @@ def predict_transparency(policy_text: str) -> dict:
         "confidence": float
     }
     """
-    try:
-        if model and vectorizer:
-            X = vectorizer.transform([policy_text])
-            pred_prob = model.predict_proba(X)[0]
-            pred_label = np.argmax(pred_prob)
-            confidence = float(np.max(pred_prob))
-            score = round(confidence * 100, 2)
-
-            # interpret labels
-            label_map = {0: "Risky", 1: "Neutral", 2: "Safe"}
-            label = label_map.get(pred_label, "Neutral")
-            return {"score": score, "label": label, "confidence": confidence}
-
+    return predict_transparency_batch([policy_text])[0]
 
-        feats = extract_features(policy_text)
-
-        risk_points = (
-            feats["data_collection"] * 2 +
-            feats["third_party"] * 3 +
-            feats["tracking"] * 2 +
-            feats["sharing"] * 4 -
-            feats["user_rights"] * 3
-        )
-
-        raw_score = max(0, 100 - risk_points * 2)
-        score = min(raw_score, 100)
-
-        if score > 75:
-            label = "Safe"
-        elif score > 45:
-            label = "Neutral"
-        else:
-            label = "Risky"
-
-        return {
-            "score": round(score, 2),
-            "label": label,
-            "confidence": round(abs(score - 50) / 50, 2)
-        }
-
-    except Exception as e:
-        logging.exception("Model prediction failed.")
-        return {"score": 0.0, "label": "Unknown", "confidence": 0.0}
+transparency_batcher = MicroBatcher(predict_transparency_batch)
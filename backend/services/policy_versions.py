@@ -0,0 +1,129 @@
+import difflib
+import hashlib
+import logging
+import os
+import re
+from backend.database import get_policy_version, save_policy_version
+from backend.services.ai_service import get_summarizer
+from backend.services.summary_cache import cached_process_policy, is_cacheable, policy_key, summary_cache
+from backend.utils.analyze_policy import process_policy_update, PROMPT_VERSION
+from backend.utils.executor import run_blocking
+from backend.utils.passage_ranker import RISK_TOPICS
+from backend.utils.url_utils import normalize_url
+
+# Above this share of changed text a full re-summary is cheaper and more faithful than a delta
+POLICY_DIFF_MAX_RATIO = float(os.getenv("POLICY_DIFF_MAX_RATIO", "0.5"))
+# Changes of fewer words than this are treated as cosmetic and keep the previous summary,
+# unless a changed paragraph touches a risk topic (sale, sharing, tracking, retention, rights)
+POLICY_DIFF_MIN_WORDS = int(os.getenv("POLICY_DIFF_MIN_WORDS", "5"))
+# Paragraph text is kept only for policies below this size (Mongo documents max out at 16 MB)
+POLICY_VERSION_MAX_CHARS = int(os.getenv("POLICY_VERSION_MAX_CHARS", str(4 * 1024 * 1024)))
+DIFF_REPORT_LIMIT = 20
+DIFF_SNIPPET_CHARS = 300
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_WORD_RE = re.compile(r"\w+")
+
+
+def split_paragraphs(text: str) -> list:
+    """
+    Normalized paragraphs of a policy. Browser text separates blocks with
+    newlines; flattened text from the HTTP fallback is split into sentences.
+    """
+    blocks = text.split("\n")
+    if len(blocks) <= 1:
+        blocks = _SENTENCE_RE.split(text)
+    paragraphs = (_WHITESPACE_RE.sub(" ", b).strip() for b in blocks)
+    return [p for p in paragraphs if len(p) >= 3]
+
+def paragraph_hash(paragraph: str) -> str:
+    return hashlib.sha1(paragraph.lower().encode("utf-8")).hexdigest()[:16]
+
+def diff_paragraphs(old_hashes: list, old_paragraphs: list, new_hashes: list, new_paragraphs: list) -> dict:
+    added, removed, changed = [], [], []
+    matcher = difflib.SequenceMatcher(None, old_hashes, new_hashes, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "insert":
+            added.extend(new_paragraphs[j1:j2])
+        elif tag == "delete":
+            removed.extend(old_paragraphs[i1:i2])
+        elif tag == "replace":
+            changed.append({"before": "\n".join(old_paragraphs[i1:i2]), "after": "\n".join(new_paragraphs[j1:j2])})
+    return {"added": added, "removed": removed, "changed": changed}
+
+def changed_words(diff: dict) -> int:
+    """Words added or removed: whole added/removed paragraphs, and a word-level diff of changed ones."""
+    count = sum(len(_WORD_RE.findall(p)) for p in diff["added"] + diff["removed"])
+    for c in diff["changed"]:
+        before = _WORD_RE.findall(c["before"].lower())
+        after = _WORD_RE.findall(c["after"].lower())
+        matcher = difflib.SequenceMatcher(None, before, after, autojunk=False)
+        count += sum(max(i2 - i1, j2 - j1) for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal")
+    return count
+
+def touches_risk_topic(diff: dict) -> bool:
+    """Whether any added, removed or changed paragraph mentions a risk topic."""
+    paragraphs = diff["added"] + diff["removed"] + [c["before"] + "\n" + c["after"] for c in diff["changed"]]
+    text = "\n".join(paragraphs).lower()
+    return any(pattern.search(text) for pattern, _ in RISK_TOPICS.values())
+
+def _snip(text: str) -> str:
+    return text if len(text) <= DIFF_SNIPPET_CHARS else text[:DIFF_SNIPPET_CHARS] + "..."
+
+def _report(status: str, resummarized: str, diff: dict = None, previous: dict = None) -> dict:
+    report = {"status": status, "resummarized": resummarized}
+    if previous is not None:
+        report["previous_version_at"] = previous.get("updated_at")
+    if diff is not None:
+        report["counts"] = {k: len(v) for k, v in diff.items()}
+        report["added"] = [_snip(p) for p in diff["added"][:DIFF_REPORT_LIMIT]]
+        report["removed"] = [_snip(p) for p in diff["removed"][:DIFF_REPORT_LIMIT]]
+        report["changed"] = [
+            {"before": _snip(c["before"]), "after": _snip(c["after"])}
+            for c in diff["changed"][:DIFF_REPORT_LIMIT]
+        ]
+    return report
+
+async def summarize_with_history(url: str, policy_text: str):
+    """
+    Summarize a policy, re-analyzing only what changed since the last scan of `url`.
+    Returns (summary, changes) where `changes` is the "what changed" report.
+    """
+    key = normalize_url(url)
+    paragraphs = split_paragraphs(policy_text)
+    hashes = [paragraph_hash(p) for p in paragraphs]
+    previous = await get_policy_version(key)
+
+    if not previous or previous.get("prompt_version") != PROMPT_VERSION or not previous.get("paragraphs"):
+        summary = await cached_process_policy(policy_text)
+        changes = _report("new", "full")
+    else:
+        diff = diff_paragraphs(previous["hashes"], previous["paragraphs"], hashes, paragraphs)
+        added_text = "\n".join(diff["added"] + [c["after"] for c in diff["changed"]])
+        removed_text = "\n".join(diff["removed"] + [c["before"] for c in diff["changed"]])
+        delta = len(added_text) + len(removed_text)
+        if not any(diff.values()):
+            summary, mode = previous["summary"], "none"
+        elif changed_words(diff) < POLICY_DIFF_MIN_WORDS and not touches_risk_topic(diff):
+            summary, mode = previous["summary"], "none"
+        elif delta > POLICY_DIFF_MAX_RATIO * len(policy_text) or get_summarizer().name != "gemini":
+            # The extractive engines need the whole policy, and are cheap enough to rerun in full
+            summary, mode = await cached_process_policy(policy_text), "full"
+        else:
+            logging.info(f"Policy at {key} changed by {delta} characters, re-summarizing the delta")
+            summary, mode = await run_blocking(process_policy_update, previous["summary"], added_text, removed_text), "delta"
+            if is_cacheable(summary):
+                await summary_cache.put(policy_key(policy_text), summary)
+            else:
+                summary, mode = await cached_process_policy(policy_text), "full"
+        changes = _report("changed" if any(diff.values()) else "unchanged", mode, diff, previous)
+
+    if is_cacheable(summary) and len(policy_text) <= POLICY_VERSION_MAX_CHARS:
+        await save_policy_version(key, {
+            "hashes": hashes,
+            "paragraphs": paragraphs,
+            "summary": summary,
+            "prompt_version": PROMPT_VERSION,
+        })
+    return summary, changes
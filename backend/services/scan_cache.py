@@ -0,0 +1,133 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from backend.utils.url_utils import normalize_url
+
+SCAN_CACHE_MAX_BYTES = int(os.getenv("SCAN_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+SCAN_CACHE_TTL = float(os.getenv("SCAN_CACHE_TTL", str(6 * 3600)))
+# How long past its TTL an entry may still be served while a refresh runs in the background
+SCAN_CACHE_STALE_TTL = float(os.getenv("SCAN_CACHE_STALE_TTL", str(24 * 3600)))
+
+
+class _Entry:
+    __slots__ = ("value", "size", "fresh_until", "stale_until")
+
+    def __init__(self, value, size, fresh_until, stale_until):
+        self.value = value
+        self.size = size
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+
+class ScanResultCache:
+    """
+    Scan results keyed by normalized URL, bounded by an approximate memory
+    budget in bytes with LRU eviction and a per-entry TTL. Expired entries
+    are served stale while one background scan refreshes them, and
+    concurrent misses for the same URL share a single in-flight scan.
+    """
+
+    def __init__(self, max_bytes: int = SCAN_CACHE_MAX_BYTES, ttl: float = SCAN_CACHE_TTL,
+                 stale_ttl: float = SCAN_CACHE_STALE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._inflight = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    async def get_or_scan(self, url: str, scan_fn, refresh_fn=None):
+        """
+        Return the cached result for `url`, or await `scan_fn()` (shared by concurrent callers).
+        A stale entry is refreshed in the background with `refresh_fn()`, or `scan_fn()` if not given;
+        it outlives the caller, so it must not report to anything tied to this request.
+        """
+        key = normalize_url(url)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and now < entry.stale_until:
+            self._entries.move_to_end(key)
+            if now < entry.fresh_until:
+                self.hits += 1
+                return entry.value
+            self.stale_hits += 1
+            if key not in self._inflight:
+                logging.info(f"Serving stale scan for {key}, refreshing in background")
+                self._start(key, refresh_fn or scan_fn)
+            return entry.value
+
+        self.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start(key, scan_fn)
+        else:
+            self.coalesced += 1
+            logging.info(f"Joining in-flight scan for {key}")
+        # Shield so one client disconnecting does not cancel the scan for everyone else
+        return await asyncio.shield(task)
+
+    def _start(self, key: str, scan_fn):
+        task = asyncio.ensure_future(self._run(key, scan_fn))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._finish(key, t))
+        return task
+
+    def _finish(self, key: str, task):
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(f"Scan for {key} failed: {task.exception()}")
+
+    async def _run(self, key: str, scan_fn):
+        result = await scan_fn()
+        self.set(key, result)
+        return result
+
+    def peek(self, url: str):
+        """The cached result for `url`, fresh or stale, without touching LRU order or statistics."""
+        entry = self._entries.get(normalize_url(url))
+        return entry.value if entry is not None and time.monotonic() < entry.stale_until else None
+
+    def set(self, key: str, value):
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            logging.warning(f"Scan result for {key} ({size} bytes) exceeds cache budget, not cached")
+            return
+        self.invalidate(key)
+        now = time.monotonic()
+        self._entries[key] = _Entry(value, size, now + self.ttl, now + self.ttl + self.stale_ttl)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
+
+    def invalidate(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "in_flight": len(self._inflight),
+        }
+
+
+scan_cache = ScanResultCache()
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import os
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from backend.models import ScanResult, TrackerInfo, PageCapture
+from backend.utils.page_capture import capture_page
+from backend.utils.policy_fetcher import policy_text_from_capture
+from backend.services.policy_versions import summarize_with_history
+from backend.utils.feature_extractor import extract_features
+from backend.utils.score_engine import risk_batcher
+from backend.utils.web_scanner import scan_capture
+from backend.utils.ip_lookup import get_website_country
+from backend.utils.executor import run_blocking
+from backend.utils.cpu_pool import cpu_pool, score_policy
+from backend.database import save_scan_result
+from backend.utils.metrics import SCAN_STAGE_SECONDS, SCANS_IN_FLIGHT, SCANS_TOTAL
+from backend.utils.tracing import span
+
+# Per-stage timeouts in seconds; a stage that overruns falls back to its default result
+STAGE_TIMEOUTS = {
+    "fetch": float(os.getenv("STAGE_TIMEOUT_FETCH", "240")),
+    "summarize": float(os.getenv("STAGE_TIMEOUT_SUMMARIZE", "120")),
+    "score": float(os.getenv("STAGE_TIMEOUT_SCORE", "10")),
+    "web_scan": float(os.getenv("STAGE_TIMEOUT_WEB_SCAN", "10")),
+    "geo": float(os.getenv("STAGE_TIMEOUT_GEO", "10")),
+    "save": float(os.getenv("STAGE_TIMEOUT_SAVE", "10")),
+}
+
+NO_POLICY_SUMMARY = {"summary": "No policy text found"}
+UNKNOWN_RISK = {"classification": "Unknown", "score": 0.0}
+UNKNOWN_GEO = {
+    "ip": None, "country": "Unknown", "city": None, "region": None,
+    "org": None, "latitude": None, "longitude": None
+}
+
+# Optional async callback(stage, status, elapsed_ms) notified as stages start and finish
+_stage_listener: ContextVar = ContextVar("stage_listener", default=None)
+
+async def _notify_stage(name: str, status: str, elapsed_ms: float = None):
+    listener = _stage_listener.get()
+    if listener is None:
+        return
+    try:
+        await listener(name, status, elapsed_ms)
+    except Exception:
+        logging.exception(f"Stage listener failed for '{name}'")
+
+async def run_stage(name: str, awaitable, timings: dict, default=None):
+    """Await one pipeline stage under its timeout, recording elapsed milliseconds in `timings`."""
+    start = time.perf_counter()
+    status = "done"
+    await _notify_stage(name, "started")
+    with span(name) as stage_span:
+        try:
+            return await asyncio.wait_for(awaitable, STAGE_TIMEOUTS[name])
+        except asyncio.TimeoutError:
+            logging.warning(f"Stage '{name}' timed out after {STAGE_TIMEOUTS[name]}s")
+            status = "timeout"
+            return default
+        except Exception:
+            logging.exception(f"Stage '{name}' failed")
+            status = "failed"
+            return default
+        finally:
+            elapsed = time.perf_counter() - start
+            timings[name] = round(elapsed * 1000, 1)
+            stage_span.status = status
+            SCAN_STAGE_SECONDS.labels(stage=name, status=status).observe(elapsed)
+            await _notify_stage(name, status, timings[name])
+
+def _fallback_urls(url: str) -> list:
+    return [
+        f"{url.rsplit('/', 1)[0]}/privacy" if '/' in url else f"{url}/privacy",
+        f"{url.rsplit('/', 1)[0]}/legal" if '/' in url else f"{url}/legal",
+        f"{url.rsplit('/', 1)[0]}/privacy-policy" if '/' in url else f"{url}/privacy-policy",
+    ]
+
+async def fetch_stage(url: str):
+    """Capture the page, trying the usual policy paths if it yields no text."""
+    # One navigation feeds both the policy text and the web scan
+    capture = await capture_page(url)
+    policy_text = policy_text_from_capture(capture)
+    logging.info(f"Fetched {len(policy_text)} characters from {url}")
+
+    # If no policy text or URL is problematic, try fallback URLs
+    if not policy_text or "grok.com/c/" in url:
+        logging.info(f"No policy text found for {url} or problematic URL, trying fallbacks...")
+        for fb in _fallback_urls(url):
+            logging.info(f"Trying fallback URL: {fb}")
+            fb_capture = await capture_page(fb)
+            fb_text = policy_text_from_capture(fb_capture)
+            if fb_text:
+                logging.info(f"Fetched {len(fb_text)} characters from {fb}")
+                return fb, fb_capture, fb_text
+    return url, capture, policy_text
+
+async def analysis_stage(url: str, policy_text: str, timings: dict):
+    """
+    Summarize the policy (only its changes, if `url` was scanned before),
+    then derive features and the risk score from it.
+    """
+    if not policy_text:
+        return NO_POLICY_SUMMARY, {}, UNKNOWN_RISK, None
+    summary, changes = await run_stage(
+        "summarize", summarize_with_history(url, policy_text), timings, (NO_POLICY_SUMMARY, None)
+    )
+
+    async def _score():
+        if cpu_pool.enabled:
+            return await cpu_pool.run(score_policy, policy_text, summary)
+        features = await run_blocking(extract_features, policy_text, summary)
+        return features, await risk_batcher.submit(features)
+
+    features, risk = await run_stage("score", _score(), timings, ({}, UNKNOWN_RISK))
+    return summary, features, risk, changes
+
+async def _web_scan(capture: PageCapture) -> dict:
+    return scan_capture(capture)
+
+def scan_document(result: dict) -> dict:
+    """The document persisted for a scan result returned by `run_scan`."""
+    doc = {k: v for k, v in result.items() if k != "timings"}
+    doc["created_at"] = datetime.utcnow()
+    return doc
+
+async def run_scan(url: str, on_stage=None, persist: bool = True) -> dict:
+    """
+    Full scan as a staged pipeline: fetch first, then summarization+scoring,
+    web scan and geo lookup concurrently, then persistence (skipped when
+    `persist` is False, e.g. for batches that bulk-insert).
+    `on_stage(stage, status, elapsed_ms)` is awaited as each stage starts and finishes.
+    """
+    token = _stage_listener.set(on_stage)
+    SCANS_IN_FLIGHT.inc()
+    SCANS_TOTAL.inc()
+    try:
+        # One trace per scan; the stages below become its child spans
+        with span("scan", url=url):
+            return await _run_scan(url, persist)
+    finally:
+        SCANS_IN_FLIGHT.dec()
+        _stage_listener.reset(token)
+
+async def _run_scan(url: str, persist: bool) -> dict:
+    timings = {}
+    start = time.perf_counter()
+
+    fetched = await run_stage("fetch", fetch_stage(url), timings)
+    if fetched is None:
+        fetched = (url, PageCapture(url=url, source="none", error="fetch stage failed"), "")
+    url, capture, policy_text = fetched
+
+    (summary, features, risk, changes), scan_data, geo_info = await asyncio.gather(
+        analysis_stage(url, policy_text, timings),
+        run_stage("web_scan", _web_scan(capture), timings, {"trackers": [], "third_party": [], "cookies": []}),
+        run_stage("geo", get_website_country(url), timings, UNKNOWN_GEO),
+    )
+    logging.info(f"Found {len(scan_data.get('trackers', []))} trackers")
+    if "error" in scan_data:
+        logging.warning(f"Web scan failed: {scan_data['error']}")
+
+    result = ScanResult(
+        url=url,
+        summary=summary.get("summary", ""),
+        classification=risk["classification"],
+        score=risk["score"],
+        trackers=[
+            TrackerInfo(
+                name=t["name"],
+                category=t.get("category", "Unknown"),
+                owner=t.get("owner"),
+                domain=t.get("domain"),
+                blocked=t.get("blocked", False)
+            )
+            for t in scan_data.get("trackers", [])
+        ],
+        third_party=scan_data.get("third_party", []),
+        cookies=scan_data.get("cookies", []),
+        raw_policy_text=policy_text,
+        features=features,
+        policy_changes=changes,
+        policy_passages=summary.get("passages")
+    )
+    final_result = {**result.dict(), "geo": geo_info}
+    if persist:
+        await run_stage("save", save_scan_result(scan_document(final_result)), timings)
+
+    timings["total"] = round((time.perf_counter() - start) * 1000, 1)
+    final_result["timings"] = timings
+    logging.info(f"Scan complete in {timings['total']}ms: {timings}")
+    return final_result
@@ -0,0 +1,14 @@
+class SummarizerBackend:
+    """
+    A policy summarization engine. `summarize` returns a dict with the
+    summary/bullets/tone/risks schema that `process_policy` validates.
+    """
+
+    name = "base"
+
+    def summarize(self, prompt: str, text: str, max_tokens: int = 1500) -> dict:
+        raise NotImplementedError
+
+
+def empty_summary(message: str) -> dict:
+    return {"summary": message, "bullets": [], "tone": "unknown", "risks": []}
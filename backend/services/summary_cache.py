@@ -0,0 +1,96 @@
+import hashlib
+import logging
+import os
+import re
+from backend.utils.lru_cache import TTLCache
+from backend.utils.analyze_policy import process_policy, PROMPT_VERSION
+from backend.services.ai_service import get_summarizer
+from backend.utils.executor import run_blocking
+from backend.database import get_cached_summary, save_cached_summary, prune_summary_cache
+
+SUMMARY_CACHE_SIZE = int(os.getenv("SUMMARY_CACHE_SIZE", "512"))
+SUMMARY_CACHE_TTL = float(os.getenv("SUMMARY_CACHE_TTL", str(24 * 3600)))
+
+# Summaries that signal a failed or degraded LLM call; these are never cached
+_ERROR_PREFIXES = ("Error", "AI summarization unavailable", "Gemini error", "No policy text found", "Insufficient policy text")
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def policy_key(policy_text: str, prompt_version: str = PROMPT_VERSION, engine: str = None) -> str:
+    """
+    Content address of a policy summary: hash of the whitespace-normalized
+    text, the prompt version and the summarizer engine that produced it.
+    """
+    engine = engine or get_summarizer().name
+    normalized = _WHITESPACE_RE.sub(" ", policy_text).strip()
+    return hashlib.sha256(f"{prompt_version}:{engine}\0{normalized}".encode("utf-8")).hexdigest()
+
+def is_cacheable(summary: dict) -> bool:
+    bullets = summary.get("bullets") or []
+    return (
+        # A local fallback produced while the LLM was down must not be served as the LLM summary
+        summary.get("engine") == get_summarizer().name and
+        not str(summary.get("summary", "")).startswith(_ERROR_PREFIXES)
+        and len(bullets) == 5
+        and "Missing bullet" not in bullets
+    )
+
+
+class SummaryCache:
+    """In-memory LRU/TTL tier in front of the persistent `summary_cache` Mongo collection."""
+
+    def __init__(self, max_entries: int = SUMMARY_CACHE_SIZE, ttl: float = SUMMARY_CACHE_TTL):
+        self.memory = TTLCache(max_entries=max_entries, ttl=ttl)
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    async def get(self, key: str):
+        summary = self.memory.get(key)
+        if summary is not None:
+            self.memory_hits += 1
+            return summary
+        summary = await get_cached_summary(key, PROMPT_VERSION)
+        if summary is not None:
+            self.persistent_hits += 1
+            self.memory.set(key, summary)
+            return summary
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, summary: dict):
+        self.memory.set(key, summary)
+        await save_cached_summary(key, summary, PROMPT_VERSION)
+
+    async def prune(self) -> int:
+        """Drop persisted summaries from earlier prompt versions (expired ones go by TTL index)."""
+        deleted = await prune_summary_cache(PROMPT_VERSION)
+        if deleted:
+            logging.info(f"Pruned {deleted} cached summaries from earlier prompt versions")
+        return deleted
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.persistent_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.memory_hits + self.persistent_hits) / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+        }
+
+
+summary_cache = SummaryCache()
+
+async def cached_process_policy(policy_text: str) -> dict:
+    """process_policy with repeat policies served from the summary cache instead of the LLM."""
+    key = policy_key(policy_text)
+    summary = await summary_cache.get(key)
+    if summary is not None:
+        logging.info(f"Summary cache hit for policy {key[:12]}")
+        return summary
+    summary = await run_blocking(process_policy, policy_text)
+    if is_cacheable(summary):
+        await summary_cache.put(key, summary)
+    return summary
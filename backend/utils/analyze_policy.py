@@ -1,6 +1,10 @@
 from backend.services.ai_service import ai_summarize
 import logging
 import json
+from backend.utils.tracing import log_payload
+
+# Bump whenever the prompt below changes so cached summaries are not reused across prompt versions
+PROMPT_VERSION = "2"
 
 def process_policy(policy_text: str) -> dict:
     logging.info(f"Processing policy text with {len(policy_text)} characters")
@@ -16,19 +20,56 @@ def process_policy(policy_text: str) -> dict:
         "'tone' (one of: friendly, neutral, legalistic), "
         "'risks' (an array of high-risk clauses related to data sharing, sale, or tracking). "
         "Ensure the bullets array contains exactly 5 items, each a concise string. "
-        "Return only the JSON object, with no additional text or commentary.\n\n"
-        f"Privacy Policy Text:\n{policy_text}"
+        "Return only the JSON object, with no additional text or commentary. "
+        "Long policies are abridged to their most relevant passages; \"[...]\" marks omitted text.\n\n"
+        "Privacy Policy Text:"
     )
 
+    # The summarizer appends the policy text (or its selected passages) to the prompt
     payload = {
         "prompt": prompt,
         "text": policy_text,
         "max_tokens": 3500  # Increased from 2000
     }
+    return _summarize(payload)
+
+def process_policy_update(previous_summary: dict, added_text: str, removed_text: str) -> dict:
+    """
+    Re-analyze only the changed parts of a policy: the previous summary is
+    revised in light of the added and removed passages.
+    """
+    logging.info(f"Updating summary with {len(added_text)} added and {len(removed_text)} removed characters")
+    prompt = (
+        "You are a privacy policy summarizer and analyzer. "
+        "A privacy policy you previously summarized has changed. "
+        "Revise the previous analysis so it reflects the current policy, and return a JSON object "
+        "with exactly these keys: 'summary' (a concise 3-sentence summary), "
+        "'bullets' (an array of exactly 5 short bullet highlights), "
+        "'tone' (one of: friendly, neutral, legalistic), "
+        "'risks' (an array of high-risk clauses related to data sharing, sale, or tracking). "
+        "Drop points that only depended on removed passages. "
+        "Return only the JSON object, with no additional text or commentary.\n\n"
+        f"Previous analysis:\n{json.dumps({k: previous_summary.get(k) for k in ('summary', 'bullets', 'tone', 'risks')})}\n\n"
+        "Changed passages, each prefixed with [removed] or [added]:"
+    )
+    # Every line carries its label so passage selection cannot separate text from what happened to it
+    changes = [f"[removed] {line}" for line in removed_text.splitlines() if line.strip()]
+    changes += [f"[added] {line}" for line in added_text.splitlines() if line.strip()]
+    payload = {
+        "prompt": prompt,
+        "text": "\n".join(changes),
+        "max_tokens": 3500,
+        "local_fallback": False
+    }
+    summary = _summarize(payload)
+    # Passage offsets would point into the change list, not the policy
+    summary.pop("passages", None)
+    return summary
 
+def _summarize(payload: dict) -> dict:
     try:
         response = ai_summarize(payload)
-        logging.info(f"Raw AI summary response ({len(json.dumps(response))} characters): {json.dumps(response)[:200]}...")
+        log_payload("Raw AI summary response", response)
         # Handle string or dict response
         if isinstance(response, str):
             response = json.loads(response)
@@ -47,9 +88,8 @@ def process_policy(policy_text: str) -> dict:
                 "tone": response.get("tone", "neutral"),
                 "risks": response.get("risks", [])
             }
-        logging.info(f"Processed summary ({len(response['summary'])} characters): {response['summary'][:100]}...")
-        logging.info(f"Processed bullets ({len(response['bullets'])} items): {response['bullets']}")
+        logging.info(f"Processed summary ({len(response['summary'])} characters, {len(response['risks'])} risks)")
         return response
     except Exception as e:
         logging.exception(f"Failed to process policy: {str(e)}")
-        return {"summary": f"Error processing policy: {str(e)}", "bullets": [], "tone": "neutral", "risks": []}
\ No newline at end of file
+        return {"summary": f"Error processing policy: {str(e)}", "bullets": [], "tone": "neutral", "risks": []}
@@ -0,0 +1,182 @@
+import asyncio
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from backend.utils.executor import run_blocking
+from backend.utils.feature_extractor import extract_features
+from backend.utils.html_stream import extract_html, HTML_CHUNK_SIZE, HTML_MAX_BYTES
+from backend.utils.score_engine import predict_risk_batch
+from backend.utils.service_registry import registry
+
+# Worker processes for CPU-bound scan work; 0 keeps that work on the blocking thread pool
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(min(os.cpu_count() or 1, 4))))
+# Tasks submitted but not finished; further submitters wait for a slot (backpressure)
+CPU_QUEUE_LIMIT = int(os.getenv("CPU_QUEUE_LIMIT", str(max(CPU_WORKERS, 1) * 4)))
+# How long a submitter waits for a slot before CpuPoolBusy; 0 waits indefinitely
+CPU_QUEUE_TIMEOUT = float(os.getenv("CPU_QUEUE_TIMEOUT", "30"))
+# On shutdown, in-flight tasks get this long to finish before being cancelled
+CPU_SHUTDOWN_TIMEOUT = float(os.getenv("CPU_SHUTDOWN_TIMEOUT", "10"))
+
+
+class CpuPoolBusy(RuntimeError):
+    """Raised when no task slot frees up within the queue timeout."""
+
+class CpuPoolClosed(RuntimeError):
+    """Raised for tasks submitted after shutdown began."""
+
+
+# Tasks: module-level functions so they pickle by name into the workers
+
+def _init_worker():
+    # Each worker loads the models once, not per task
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - [cpu %(process)d] %(message)s")
+    registry.get("risk_model")
+
+def _ping() -> int:
+    return os.getpid()
+
+def score_policy(policy_text: str, summary: dict):
+    """(features, risk) for a policy: feature extraction followed by the risk model."""
+    features = extract_features(policy_text, summary)
+    return features, predict_risk_batch([features])[0]
+
+def extract_page(body: bytes, encoding: str = None, max_bytes: int = HTML_MAX_BYTES):
+    """(visible text, raw resources) of an HTML body, as `extract_html` returns them."""
+    chunks = (body[i:i + HTML_CHUNK_SIZE] for i in range(0, len(body), HTML_CHUNK_SIZE))
+    return extract_html(chunks, encoding=encoding, max_bytes=max_bytes)
+
+def parse_json(text: str):
+    """json.loads, for LLM replies."""
+    return json.loads(text)
+
+
+class CpuPool:
+    """
+    A process pool for CPU-bound scan work, so parsing, feature extraction and scoring run on every
+    core instead of contending for the GIL with the event loop. At most
+    `queue_limit` tasks are outstanding; later callers wait for a slot. With no
+    workers configured, tasks run on the blocking thread pool instead.
+    """
+
+    def __init__(self, workers: int = CPU_WORKERS, queue_limit: int = CPU_QUEUE_LIMIT):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = None
+        self._slots = None
+        self._loop = None
+        self._in_flight = 0
+        self._closing = False
+        self.stats_counts = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "restarts": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn, not fork: the parent runs an event loop and threads that must not be copied mid-state
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+
+    async def start(self):
+        """Spawn the workers and wait until each has run its initializer."""
+        self._closing = False
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.queue_limit)
+        if not self.enabled:
+            return
+        started = time.perf_counter()
+        self._executor = self._new_executor()
+        loop = self._loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*(loop.run_in_executor(self._executor, _ping) for _ in range(self.workers)))
+        logging.info(f"CPU pool started {len(set(pids))} workers in {round((time.perf_counter() - started) * 1000)}ms")
+
+    async def run(self, func, *args, timeout: float = CPU_QUEUE_TIMEOUT):
+        """Run `func(*args)` in a worker once a slot is free (waiting at most `timeout` seconds for one)."""
+        if self._closing:
+            raise CpuPoolClosed("CPU pool is shutting down")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.queue_limit)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout or None)
+        except asyncio.TimeoutError:
+            self.stats_counts["rejected"] += 1
+            raise CpuPoolBusy(f"No CPU task slot free after {timeout}s ({self.queue_limit} in flight)")
+        self.stats_counts["submitted"] += 1
+        self._in_flight += 1
+        try:
+            result = await self._submit(func, *args)
+            self.stats_counts["completed"] += 1
+            return result
+        except Exception:
+            self.stats_counts["failed"] += 1
+            raise
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+
+    def call(self, func, *args, timeout: float = CPU_QUEUE_TIMEOUT):
+        """
+        `run` for synchronous code on a blocking-pool thread (the summarizers): blocks until
+        the task is done. Runs `func` inline when the pool is disabled or stopped, or when
+        called on the event loop itself, which must not block on its own tasks.
+        """
+        loop = self._loop
+        if self._executor is None or loop is None or loop.is_closed():
+            return func(*args)
+        try:
+            asyncio.get_running_loop()
+            return func(*args)
+        except RuntimeError:
+            pass
+        return asyncio.run_coroutine_threadsafe(self.run(func, *args, timeout=timeout), loop).result()
+
+    async def _submit(self, func, *args):
+        if self._executor is None:
+            return await run_blocking(func, *args)
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self._executor
+            try:
+                return await loop.run_in_executor(executor, functools.partial(func, *args))
+            except BrokenProcessPool:
+                # A worker died (OOM kill, segfault) and took the pool with it: the first task
+                # to notice replaces the pool, then each affected task is retried once
+                if self._executor is executor and not self._closing:
+                    logging.error("CPU pool broken; restarting workers")
+                    self.stats_counts["restarts"] += 1
+                    self._executor = self._new_executor()
+                    executor.shutdown(wait=False, cancel_futures=True)
+                if attempt or self._executor is None:
+                    raise
+
+    async def stop(self, timeout: float = CPU_SHUTDOWN_TIMEOUT):
+        """Refuse new tasks, give in-flight ones `timeout` seconds, then stop the workers."""
+        self._closing = True
+        if self._slots is not None:
+            deadline = time.monotonic() + timeout
+            while self.in_flight and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+            if self.in_flight:
+                logging.warning(f"Cancelling {self.in_flight} CPU tasks still running after {timeout}s")
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+        self._loop = None
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def stats(self) -> dict:
+        return {**self.stats_counts, "workers": self.workers, "queue_limit": self.queue_limit, "in_flight": self.in_flight}
+
+
+cpu_pool = CpuPool()
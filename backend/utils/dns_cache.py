@@ -0,0 +1,93 @@
+import asyncio
+import ipaddress
+import logging
+import os
+import socket
+from backend.utils.lru_cache import TTLCache
+
+try:
+    import aiodns  # reports record TTLs; without it getaddrinfo is used with DNS_DEFAULT_TTL
+    AIODNS_AVAILABLE = True
+except ImportError:
+    AIODNS_AVAILABLE = False
+
+DNS_CACHE_SIZE = int(os.getenv("DNS_CACHE_SIZE", "4096"))
+# Record TTLs are clamped into this range; failures are remembered for DNS_NEGATIVE_TTL
+DNS_MIN_TTL = float(os.getenv("DNS_MIN_TTL", "30"))
+DNS_MAX_TTL = float(os.getenv("DNS_MAX_TTL", "3600"))
+DNS_DEFAULT_TTL = float(os.getenv("DNS_DEFAULT_TTL", "300"))
+DNS_NEGATIVE_TTL = float(os.getenv("DNS_NEGATIVE_TTL", "60"))
+DNS_TIMEOUT = float(os.getenv("DNS_TIMEOUT", "5"))
+
+
+def is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return True
+    except ValueError:
+        return False
+
+
+class DNSCache:
+    """
+    Async hostname -> IP resolution cached for each record's TTL. Concurrent
+    lookups of the same host share one query, and failures are cached briefly.
+    """
+
+    def __init__(self, max_entries: int = DNS_CACHE_SIZE):
+        # Failures are cached as "" so they can be told apart from misses
+        self._cache = TTLCache(max_entries=max_entries, ttl=DNS_DEFAULT_TTL)
+        self._inflight = {}
+        self._resolver = None
+        self.hits = 0
+        self.misses = 0
+
+    async def resolve(self, host: str):
+        """An IP address for `host` (IPv4 preferred), or None if it does not resolve."""
+        host = host.lower().rstrip(".")
+        if is_ip(host):
+            return host.strip("[]")
+        cached = self._cache.get(host)
+        if cached is not None:
+            self.hits += 1
+            return cached or None
+        self.misses += 1
+        task = self._inflight.get(host)
+        if task is None:
+            task = asyncio.ensure_future(self._resolve_and_cache(host))
+            self._inflight[host] = task
+            task.add_done_callback(lambda _: self._inflight.pop(host, None))
+        return await asyncio.shield(task)
+
+    async def _resolve_and_cache(self, host: str):
+        try:
+            ip, ttl = await asyncio.wait_for(self._lookup(host), DNS_TIMEOUT)
+        except Exception as e:
+            logging.warning(f"DNS lookup failed for {host}: {e}")
+            self._cache.set(host, "", ttl=DNS_NEGATIVE_TTL)
+            return None
+        self._cache.set(host, ip, ttl=min(max(ttl, DNS_MIN_TTL), DNS_MAX_TTL))
+        return ip
+
+    async def _lookup(self, host: str):
+        """(ip, ttl_seconds) for `host`."""
+        if AIODNS_AVAILABLE:
+            if self._resolver is None:
+                self._resolver = aiodns.DNSResolver()
+            try:
+                records = await self._resolver.query(host, "A")
+                if records:
+                    return records[0].host, min(r.ttl for r in records)
+            except aiodns.error.DNSError:
+                # No A record (IPv6-only host) or a resolver quirk: let the system resolver decide
+                pass
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        infos.sort(key=lambda info: info[0] != socket.AF_INET)
+        return infos[0][4][0], DNS_DEFAULT_TTL
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._cache)}
+
+
+dns_cache = DNSCache()
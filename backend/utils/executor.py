@@ -0,0 +1,20 @@
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+BLOCKING_WORKERS = int(os.getenv("BLOCKING_WORKERS", "16"))
+
+# Shared, bounded pool for blocking calls (LLM SDKs, sockets, sync HTTP) made from async handlers
+_executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="blocking")
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking callable on the shared thread pool without stalling the event loop."""
+    loop = asyncio.get_running_loop()
+    # Carry the caller's context (request ID, current span) into the worker thread
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_executor, functools.partial(context.run, func, *args, **kwargs))
+
+def shutdown_executor():
+    _executor.shutdown(wait=False, cancel_futures=True)
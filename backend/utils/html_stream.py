@@ -0,0 +1,117 @@
+import codecs
+import logging
+import os
+from html.parser import HTMLParser
+
+# Bodies beyond this many bytes are not read at all
+HTML_MAX_BYTES = int(os.getenv("HTML_MAX_BYTES", str(5 * 1024 * 1024)))
+HTML_CHUNK_SIZE = 64 * 1024
+
+SKIP_TAGS = {"script", "style", "nav", "noscript", "template"}
+RESOURCE_TAGS = {"script", "iframe", "img"}
+
+
+class _StreamingExtractor(HTMLParser):
+    """Incremental parser that keeps only visible text and resource URLs, never a tree."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._skip_depth = 0
+        # Data for one text node can arrive over several feeds; it is emitted at the next tag
+        self._pending = []
+        self.items = []
+
+    def _flush_text(self):
+        if self._pending:
+            text = "".join(self._pending).strip()
+            self._pending = []
+            if text:
+                self.items.append(("text", text))
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        if tag in RESOURCE_TAGS:
+            src = dict(attrs).get("src")
+            if src:
+                self.items.append(("resource", {"src": src, "tag": tag}))
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._pending.append(data)
+
+    def close(self):
+        super().close()
+        self._flush_text()
+
+    def drain(self):
+        items, self.items = self.items, []
+        return items
+
+
+class HtmlExtractor:
+    """
+    Push-style parsing: `feed` byte chunks as they arrive and get back the items
+    `iter_html` would yield for them, then `close`. Feeding stops counting once
+    `max_bytes` have been consumed; `done` tells the caller to stop reading.
+    """
+
+    def __init__(self, encoding: str = "utf-8", max_bytes: int = HTML_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.consumed = 0
+        self._parser = _StreamingExtractor()
+        self._decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+
+    @property
+    def done(self) -> bool:
+        return self.consumed >= self.max_bytes
+
+    def feed(self, chunk: bytes) -> list:
+        if self.done:
+            return []
+        if self.consumed + len(chunk) > self.max_bytes:
+            chunk = chunk[:self.max_bytes - self.consumed]
+        self.consumed += len(chunk)
+        self._parser.feed(self._decoder.decode(chunk))
+        if self.done:
+            logging.warning(f"HTML body truncated at {self.max_bytes} bytes")
+        return self._parser.drain()
+
+    def close(self) -> list:
+        self._parser.feed(self._decoder.decode(b"", final=True))
+        self._parser.close()
+        return self._parser.drain()
+
+
+def iter_html(chunks, encoding: str = "utf-8", max_bytes: int = HTML_MAX_BYTES):
+    """
+    Parse an iterable of byte chunks, yielding ("text", str) blocks and
+    ("resource", {"src", "tag"}) items as they are seen. Reading stops once
+    `max_bytes` have been consumed.
+    """
+    extractor = HtmlExtractor(encoding, max_bytes)
+    for chunk in chunks:
+        yield from extractor.feed(chunk)
+        if extractor.done:
+            break
+    yield from extractor.close()
+
+def collect_html(items):
+    """(text, resources) from parsed items; text blocks are joined with spaces."""
+    blocks, resources = [], []
+    for kind, value in items:
+        if kind == "text":
+            blocks.append(value)
+        else:
+            resources.append(value)
+    return " ".join(blocks), resources
+
+def extract_html(chunks, encoding: str = "utf-8", max_bytes: int = HTML_MAX_BYTES):
+    """Collect `iter_html` output into (text, resources)."""
+    return collect_html(iter_html(chunks, encoding, max_bytes))
@@ -1,27 +1,21 @@
-import requests
-import socket
+import logging
+from urllib.parse import urlsplit
+from backend.services.geo_service import geo_service, make_geo
+from backend.utils.dns_cache import dns_cache
 
-def get_website_country(url: str):
+async def get_website_country(url: str):
+    """Geo record for the server hosting `url`: cached DNS, then the geo backends behind their cache."""
     try:
-       
-        hostname = url.replace("https://", "").replace("http://", "").split("/")[0]
-        ip_address = socket.gethostbyname(hostname)
+        hostname = urlsplit(url if "//" in url else f"//{url}").hostname
+        ip_address = await dns_cache.resolve(hostname) if hostname else None
+        if ip_address is None:
+            raise ValueError(f"cannot resolve {hostname}")
 
-        response = requests.get(f"https://ipapi.co/{ip_address}/json/")
-        data = response.json()
-
-        return {
-            "ip": ip_address,
-            "country": data.get("country_name", "Unknown"),
-            "city": data.get("city", "Unknown"),
-            "region": data.get("region", "Unknown"),
-            "org": data.get("org", "Unknown"),
-            "latitude": data.get("latitude"),   
-            "longitude": data.get("longitude")  
-        }
+        geo = await geo_service.lookup(ip_address)
+        return geo if geo is not None else make_geo(ip_address, "none")
 
     except Exception as e:
-        print(f"Geo lookup failed for {url}: {e}")
+        logging.warning(f"Geo lookup failed for {url}: {e}")
         return {
             "ip": None,
             "country": "Unknown",
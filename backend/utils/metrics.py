@@ -0,0 +1,190 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Minimal Prometheus client: counters, gauges and histograms with labels, rendered
+# in the text exposition format by `render()`. Values are per process; with
+# several uvicorn workers each one is scraped separately.
+
+PREFIX = "privacypulse_"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_metrics = []
+_collectors = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = PREFIX + name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def labels(self, **labels):
+        return _Child(self, self._key(labels))
+
+    def samples(self):
+        """(suffix, labels, value) triples for rendering."""
+        with self._lock:
+            items = list(self._values.items())
+        return [("", dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class _Child:
+    """A metric bound to one set of label values."""
+
+    def __init__(self, metric: _Metric, key: tuple):
+        self._metric = metric
+        self._key = key
+
+    def __getattr__(self, name):
+        method = getattr(self._metric, f"_{name}")
+        return lambda *args, **kwargs: method(self._key, *args, **kwargs)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _inc(self, key: tuple, amount: float = 1):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def inc(self, amount: float = 1):
+        self._inc(self._key({}), amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _set(self, key: tuple, value: float):
+        with self._lock:
+            self._values[key] = value
+
+    def _inc(self, key: tuple, amount: float = 1):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _dec(self, key: tuple, amount: float = 1):
+        self._inc(key, -amount)
+
+    def set(self, value: float):
+        self._set(self._key({}), value)
+
+    def inc(self, amount: float = 1):
+        self._inc(self._key({}), amount)
+
+    def dec(self, amount: float = 1):
+        self._inc(self._key({}), -amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def _observe(self, key: tuple, value: float):
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def _time(self, key: tuple):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._observe(key, time.perf_counter() - started)
+
+    def observe(self, value: float):
+        self._observe(self._key({}), value)
+
+    def time(self):
+        """Context manager observing the seconds spent inside it."""
+        return self._time(self._key({}))
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items()]
+        samples = []
+        for key, (counts, total, count) in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                samples.append(("_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append(("_sum", labels, total))
+            samples.append(("_count", labels, count))
+        return samples
+
+
+def register_collector(collect):
+    """
+    Add a callable run at scrape time, returning (name, kind, help, [(labels, value), ...])
+    tuples; for figures already kept elsewhere, such as cache statistics.
+    """
+    _collectors.append(collect)
+
+def render() -> str:
+    """Every metric and collector output in the Prometheus text format."""
+    lines = []
+    for metric in _metrics:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for suffix, labels, value in metric.samples():
+            lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+    for collect in _collectors:
+        for name, kind, help, samples in collect():
+            lines.append(f"# HELP {PREFIX}{name} {help}")
+            lines.append(f"# TYPE {PREFIX}{name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{PREFIX}{name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# Shared metrics, recorded where the work happens
+
+HTTP_REQUEST_SECONDS = Histogram("http_request_seconds", "HTTP request latency", ("method", "route", "status"))
+SCAN_STAGE_SECONDS = Histogram("scan_stage_seconds", "Scan pipeline stage latency", ("stage", "status"))
+SCANS_IN_FLIGHT = Gauge("scans_in_flight", "Scans currently running")
+SCANS_TOTAL = Counter("scans_total", "Scans run through the pipeline")
+OPERATION_SECONDS = Histogram(
+    "operation_seconds", "Latency of browser launches, navigations, LLM attempts and database writes", ("operation",)
+)
+PLAYWRIGHT_ATTEMPTS = Counter("playwright_attempts_total", "Playwright page captures by outcome", ("outcome",))
+PAGE_CAPTURES = Counter("page_captures_total", "Page captures by the source that produced them", ("source",))
+LLM_ERRORS = Counter("llm_errors_total", "Failed LLM attempts by error type", ("error",))
+LLM_RETRIES = Counter("llm_retries_total", "LLM attempts retried after a transient error")
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens reported by Gemini", ("kind",))
@@ -0,0 +1,50 @@
+import asyncio
+import logging
+from backend.utils.executor import run_blocking
+
+
+class MicroBatcher:
+    """
+    Merges single requests that arrive within `max_wait_ms` of each other into one
+    call of `batch_fn(items) -> results` (run on the blocking thread pool), and
+    resolves each caller with its own result.
+    """
+
+    def __init__(self, batch_fn, max_batch_size: int = 64, max_wait_ms: float = 5):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending = []
+        self._timer = None
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch):
+        items = [item for item, _ in batch]
+        try:
+            results = await run_blocking(self.batch_fn, items)
+        except Exception as e:
+            logging.exception(f"Micro-batch of {len(items)} failed")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
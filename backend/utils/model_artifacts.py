@@ -0,0 +1,567 @@
+import itertools
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import unicodedata
+import warnings
+import zlib
+from collections import Counter
+import numpy as np
+
+# Compact model artifacts: a directory holding meta.json plus one uncompressed .npy
+# file per array. Arrays are opened with mmap_mode="r", so loading is a few
+# page-table entries instead of an unpickle, and every worker process maps the same
+# file pages from the OS page cache instead of holding a private copy.
+# Inference needs only numpy; sklearn/joblib are only imported to export.
+
+META_FILE = "meta.json"
+FORMAT_VERSION = 1
+
+
+def save_artifact(path: str, kind: str, arrays: dict, **meta):
+    os.makedirs(path, exist_ok=True)
+    for name, array in arrays.items():
+        # Plain C-contiguous arrays without pickled objects, so np.load can mmap them
+        np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+    with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+        json.dump({"kind": kind, "format": FORMAT_VERSION, "arrays": sorted(arrays), **meta}, f, indent=2)
+
+def read_artifact(path: str):
+    """(meta, {name: memory-mapped array}) for an artifact directory."""
+    with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format {meta.get('format')} in {path}")
+    arrays = {
+        name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r", allow_pickle=False)
+        for name in meta["arrays"]
+    }
+    return meta, arrays
+
+def is_artifact(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+class ForestModel:
+    """
+    A fitted random forest (or single decision tree) as flat node arrays: every
+    tree's nodes concatenated, child indices made global, leaves storing class
+    fractions. predict_proba matches sklearn's for the same input.
+    """
+
+    def __init__(self, meta: dict, arrays: dict):
+        self.classes_ = np.array(meta["classes"])
+        self.feature_names_in_ = meta.get("feature_names")
+        self.max_depth = meta["max_depth"]
+        self.roots = arrays["roots"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.value = arrays["value"]
+
+    def predict_proba(self, X) -> np.ndarray:
+        # sklearn compares float32 inputs against float64 thresholds; do the same for identical splits
+        X = np.asarray(X, dtype=np.float32)
+        n_trees = len(self.roots)
+        # One node per (sample, tree), all advanced a level at a time; pairs that
+        # reached a leaf drop out of `active`, so deep trees do not drag shallow ones along
+        nodes = np.tile(self.roots, len(X))
+        rows = np.repeat(np.arange(len(X)), n_trees)
+        active = np.arange(len(nodes))
+        for _ in range(self.max_depth):
+            current = nodes[active]
+            left = self.left[current]
+            inner = left >= 0
+            active, current, left = active[inner], current[inner], left[inner]
+            if not len(active):
+                break
+            go_left = X[rows[active], self.feature[current]] <= self.threshold[current]
+            nodes[active] = np.where(go_left, left, self.right[current])
+        return self.value[nodes].reshape(len(X), n_trees, -1).mean(axis=1)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class LinearModel:
+    """
+    A linear classifier as coef/intercept arrays plus how its scores become
+    probabilities: "binary" (sigmoid), "softmax" or "ovr" (normalized sigmoids).
+    Covers LogisticRegression and MultinomialNB.
+    """
+
+    def __init__(self, meta: dict, arrays: dict):
+        self.classes_ = np.array(meta["classes"])
+        self.link = meta["link"]
+        self.coef = arrays["coef"]
+        self.intercept = arrays["intercept"]
+
+    def decision_function(self, X) -> np.ndarray:
+        if isinstance(X, SparseRows):
+            scores = np.empty((X.shape[0], self.coef.shape[0]))
+            for i in range(X.shape[0]):
+                start, end = X.indptr[i], X.indptr[i + 1]
+                scores[i] = self.coef[:, X.indices[start:end]] @ X.data[start:end]
+            return scores + self.intercept
+        return np.asarray(X, dtype=np.float64) @ self.coef.T + self.intercept
+
+    def predict_proba(self, X) -> np.ndarray:
+        scores = self.decision_function(X)
+        if self.link == "binary":
+            positive = 1 / (1 + np.exp(-scores[:, 0]))
+            return np.column_stack([1 - positive, positive])
+        if self.link == "ovr":
+            probs = 1 / (1 + np.exp(-scores))
+            return probs / probs.sum(axis=1, keepdims=True)
+        scores = scores - scores.max(axis=1, keepdims=True)
+        probs = np.exp(scores)
+        return probs / probs.sum(axis=1, keepdims=True)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class SparseRows:
+    """CSR-style rows (data, indices, indptr) produced by TfidfModel.transform."""
+
+    def __init__(self, data, indices, indptr, n_features: int):
+        self.data = data
+        self.indices = indices
+        self.indptr = indptr
+        self.shape = (len(indptr) - 1, n_features)
+
+    def toarray(self) -> np.ndarray:
+        dense = np.zeros(self.shape)
+        for i in range(self.shape[0]):
+            start, end = self.indptr[i], self.indptr[i + 1]
+            dense[i, self.indices[start:end]] = self.data[start:end]
+        return dense
+
+
+class _TextVectorizer:
+    """Analyzer and weighting settings shared by the vocabulary and hashing vectorizers."""
+
+    def __init__(self, meta: dict, arrays: dict):
+        self.idf = arrays.get("idf")
+        self.n_features = meta["n_features"]
+        self.lowercase = meta["lowercase"]
+        self.strip_accents = meta["strip_accents"]
+        self.token_pattern = re.compile(meta["token_pattern"])
+        self.stop_words = frozenset(meta["stop_words"] or ())
+        self.ngram_range = tuple(meta["ngram_range"])
+        self.binary = meta["binary"]
+        self.sublinear_tf = meta["sublinear_tf"]
+        self.norm = meta["norm"]
+
+    def tokenize(self, text: str) -> list:
+        if self.lowercase:
+            text = text.lower()
+        if self.strip_accents == "unicode":
+            text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+        elif self.strip_accents == "ascii":
+            text = unicodedata.normalize("NFKD", text).encode("ASCII", "ignore").decode("ASCII")
+        return [t for t in self.token_pattern.findall(text) if t not in self.stop_words]
+
+    def ngrams(self, tokens: list, skip: int = 0) -> list:
+        """Terms of `tokens` in sklearn's _word_ngrams order, leaving out those lying entirely in the first `skip` tokens."""
+        min_n, max_n = self.ngram_range
+        terms = tokens[skip:] if min_n == 1 else []
+        for n in range(max(min_n, 2), max_n + 1):
+            terms.extend(" ".join(tokens[i:i + n]) for i in range(max(0, skip - n + 1), len(tokens) - n + 1))
+        return terms
+
+    def analyze(self, text: str) -> list:
+        return self.ngrams(self.tokenize(text))
+
+    def weigh(self, columns: np.ndarray, counts: np.ndarray):
+        """Raw term counts for one document -> its normalized tf-idf weights."""
+        tf = np.ones(len(counts)) if self.binary else counts.astype(np.float64)
+        if self.sublinear_tf:
+            tf = np.log(tf) + 1
+        if self.idf is not None:
+            tf = tf * self.idf[columns]
+        if self.norm == "l2":
+            scale = np.sqrt((tf ** 2).sum())
+        elif self.norm == "l1":
+            scale = np.abs(tf).sum()
+        else:
+            scale = 0
+        return tf / scale if scale else tf
+
+    def document_counts(self, text):
+        """(columns, counts) of one document, sorted by column."""
+        raise NotImplementedError
+
+    def transform(self, texts: list) -> SparseRows:
+        data, indices, indptr = [], [], [0]
+        for text in texts:
+            columns, counts = self.document_counts(text)
+            data.append(self.weigh(columns, counts))
+            indices.append(columns)
+            indptr.append(indptr[-1] + len(columns))
+        return SparseRows(
+            np.concatenate(data) if data else np.empty(0),
+            np.concatenate(indices) if indices else np.empty(0, dtype=np.int64),
+            np.array(indptr),
+            self.n_features,
+        )
+
+
+class TfidfModel(_TextVectorizer):
+    """
+    A fitted word TfidfVectorizer without its vocabulary dict: terms are kept as a
+    sorted UTF-8 byte-string array (binary-searched with np.searchsorted), next to
+    their column numbers and the IDF weights. transform matches sklearn's.
+    """
+
+    def __init__(self, meta: dict, arrays: dict):
+        super().__init__(meta, arrays)
+        self.terms = arrays["terms"]
+        self.columns = arrays["columns"]
+
+    def lookup(self, tokens: list) -> np.ndarray:
+        """Column of each token in the vocabulary, -1 for unknown ones."""
+        if not tokens:
+            return np.empty(0, dtype=np.int64)
+        # The query array gets its own width, so long tokens are not truncated into false matches
+        query = np.array([t.encode("utf-8") for t in tokens])
+        positions = np.minimum(np.searchsorted(self.terms, query), len(self.terms) - 1)
+        found = self.terms[positions] == query
+        return np.where(found, self.columns[positions], -1)
+
+    def document_counts(self, text: str):
+        # Each distinct term is looked up once
+        terms = Counter(self.analyze(text))
+        columns = self.lookup(list(terms))
+        counts = np.fromiter(terms.values(), dtype=np.int64, count=len(terms))
+        known = columns >= 0
+        columns, counts = columns[known], counts[known]
+        order = np.argsort(columns)
+        return columns[order], counts[order]
+
+
+HASHING_CHUNK_CHARS = 64 * 1024
+# A chunk tail holding no whitespace, which may continue into the next chunk
+_TAIL = re.compile(r"\S*\Z")
+_NGRAM_MIX = np.uint64(0x100000001B3)
+_HASH_MEMO_LIMIT = 200_000
+
+def iter_chunks(text: str, size: int = HASHING_CHUNK_CHARS):
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+class HashingTfidfModel(_TextVectorizer):
+    """
+    Stateless vectorizer: a token's column is the CRC32 of its UTF-8 bytes modulo
+    n_features and an n-gram's mixes its tokens' hashes, so there is no vocabulary
+    to load, and IDF weights fitted with `fit_hashing_vectorizer` are applied per
+    column. Documents are consumed as a stream of chunks (a str is split into
+    HASHING_CHUNK_CHARS pieces), each token is hashed once per document and
+    counts go into one fixed n_features array, so memory is bounded by the chunk
+    size and n_features rather than the document's length.
+    Token patterns must not match whitespace; the default one does not.
+    """
+
+    def _ngram_columns(self, hashes: np.ndarray, skip: int) -> np.ndarray:
+        """Columns of the n-grams over `hashes` (token hashes), except those lying in the first `skip`."""
+        min_n, max_n = self.ngram_range
+        parts = [hashes[skip:]] if min_n == 1 else []
+        for n in range(max(min_n, 2), max_n + 1):
+            start = max(0, skip - n + 1)
+            count = len(hashes) - n + 1 - start
+            if count <= 0:
+                continue
+            mixed = hashes[start:start + count].copy()
+            for k in range(1, n):
+                # uint64 arithmetic wraps, as the mix intends
+                mixed = mixed * _NGRAM_MIX ^ hashes[start + k:start + k + count]
+            parts.append(mixed)
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return (np.concatenate(parts) % np.uint64(self.n_features)).astype(np.int64)
+
+    def document_counts(self, text):
+        chunks = iter_chunks(text) if isinstance(text, str) else text
+        counts = np.zeros(self.n_features, dtype=np.int64)
+        hashed = {}
+        carry, previous = "", np.empty(0, dtype=np.uint64)
+        history = self.ngram_range[1] - 1
+        for chunk in itertools.chain(chunks, [None]):
+            if chunk is None:
+                buffer, carry = carry, ""
+            else:
+                buffer = carry + chunk
+                # Hold back a trailing partial word so no token is split across chunks
+                cut = _TAIL.search(buffer).start()
+                if cut == 0 and len(buffer) < 4 * HASHING_CHUNK_CHARS:
+                    carry = buffer
+                    continue
+                cut = cut or len(buffer)
+                buffer, carry = buffer[:cut], buffer[cut:]
+            tokens = self.tokenize(buffer)
+            for token in set(tokens).difference(hashed):
+                hashed[token] = zlib.crc32(token.encode("utf-8"))
+            # The last n-1 tokens of the previous chunk complete this chunk's first n-grams
+            hashes = np.concatenate([previous, np.fromiter(map(hashed.__getitem__, tokens), np.uint64, len(tokens))])
+            counts += np.bincount(self._ngram_columns(hashes, len(previous)), minlength=self.n_features)
+            previous = hashes[len(hashes) - history:] if history else hashes[:0]
+            if len(hashed) > _HASH_MEMO_LIMIT:
+                hashed.clear()
+        columns = np.flatnonzero(counts)
+        return columns, counts[columns]
+
+
+LOADERS = {"forest": ForestModel, "linear": LinearModel, "tfidf": TfidfModel, "hashing": HashingTfidfModel}
+
+def load_artifact(path: str):
+    meta, arrays = read_artifact(path)
+    return LOADERS[meta["kind"]](meta, arrays)
+
+
+# Export: sklearn objects -> artifact directories
+
+def _json_classes(classes) -> list:
+    return [c.item() if hasattr(c, "item") else c for c in classes]
+
+def export_forest(model, path: str):
+    """Export a fitted RandomForestClassifier/ExtraTreesClassifier or DecisionTreeClassifier."""
+    trees = [e.tree_ for e in getattr(model, "estimators_", [model])]
+    if getattr(model, "n_outputs_", 1) != 1:
+        raise ValueError("Only single-output forests can be exported")
+    offsets = np.cumsum([0] + [t.node_count for t in trees])
+    globalize = lambda children, offset: np.where(children >= 0, children + offset, -1)
+    value = np.concatenate([t.value[:, 0, :] for t in trees]).astype(np.float64)
+    # Older sklearn stores class counts in the leaves, newer ones fractions; normalize either way
+    value /= np.maximum(value.sum(axis=1, keepdims=True), 1e-300)
+    save_artifact(
+        path, "forest",
+        {
+            "roots": offsets[:-1].astype(np.int32),
+            "left": np.concatenate([globalize(t.children_left, o) for t, o in zip(trees, offsets)]).astype(np.int32),
+            "right": np.concatenate([globalize(t.children_right, o) for t, o in zip(trees, offsets)]).astype(np.int32),
+            "feature": np.concatenate([np.maximum(t.feature, 0) for t in trees]).astype(np.int32),
+            "threshold": np.concatenate([t.threshold for t in trees]).astype(np.float64),
+            "value": value,
+        },
+        classes=_json_classes(model.classes_),
+        max_depth=int(max(t.max_depth for t in trees)),
+        feature_names=[str(n) for n in getattr(model, "feature_names_in_", [])] or None,
+        source=type(model).__name__,
+    )
+
+def export_linear(model, path: str):
+    """Export a fitted LogisticRegression or MultinomialNB."""
+    name = type(model).__name__
+    if name == "MultinomialNB":
+        # predict_proba is a softmax over the joint log likelihood, which is linear in X
+        coef, intercept, link = model.feature_log_prob_, model.class_log_prior_, "softmax"
+    elif name == "LogisticRegression":
+        coef, intercept = model.coef_, model.intercept_
+        multi_class = getattr(model, "multi_class", "auto")
+        if len(model.classes_) == 2:
+            link = "binary"
+        elif multi_class == "ovr" or (multi_class in ("auto", "deprecated") and model.solver == "liblinear"):
+            link = "ovr"
+        else:
+            link = "softmax"
+    else:
+        raise ValueError(f"Cannot export {name}; supported linear models are LogisticRegression and MultinomialNB")
+    save_artifact(
+        path, "linear",
+        {"coef": np.asarray(coef, dtype=np.float64), "intercept": np.asarray(intercept, dtype=np.float64)},
+        classes=_json_classes(model.classes_), link=link, source=name,
+    )
+
+def export_tfidf(vectorizer, path: str):
+    """Export a fitted word-analyzer TfidfVectorizer (or CountVectorizer, which has no IDF)."""
+    if vectorizer.analyzer != "word" or vectorizer.tokenizer is not None or vectorizer.preprocessor is not None:
+        raise ValueError("Only word analyzers with the built-in tokenizer and preprocessor can be exported")
+    if vectorizer.strip_accents not in (None, "ascii", "unicode"):
+        raise ValueError("Custom strip_accents callables cannot be exported")
+    vocabulary = sorted((term.encode("utf-8"), column) for term, column in vectorizer.vocabulary_.items())
+    arrays = {
+        "terms": np.array([term for term, _ in vocabulary]),
+        "columns": np.array([column for _, column in vocabulary], dtype=np.int32),
+    }
+    if getattr(vectorizer, "use_idf", False):
+        arrays["idf"] = np.asarray(vectorizer.idf_, dtype=np.float64)
+    stop_words = vectorizer.get_stop_words()
+    save_artifact(
+        path, "tfidf", arrays,
+        n_features=len(vocabulary),
+        lowercase=vectorizer.lowercase,
+        strip_accents=vectorizer.strip_accents,
+        token_pattern=vectorizer.token_pattern,
+        stop_words=sorted(stop_words) if stop_words else None,
+        ngram_range=list(vectorizer.ngram_range),
+        binary=vectorizer.binary,
+        sublinear_tf=getattr(vectorizer, "sublinear_tf", False),
+        norm=getattr(vectorizer, "norm", None),
+        source=type(vectorizer).__name__,
+    )
+
+
+def fit_hashing_vectorizer(texts: list, path: str, n_features: int = 2 ** 18, ngram_range=(1, 2),
+                           lowercase: bool = True, token_pattern: str = r"(?u)\b\w\w+\b", stop_words=None,
+                           sublinear_tf: bool = False, norm: str = "l2") -> HashingTfidfModel:
+    """Fit smoothed IDF weights (as TfidfVectorizer computes them) over `texts` and save a hashing artifact."""
+    meta = {
+        "n_features": n_features, "lowercase": lowercase, "strip_accents": None, "token_pattern": token_pattern,
+        "stop_words": sorted(stop_words) if stop_words else None, "ngram_range": list(ngram_range),
+        "binary": False, "sublinear_tf": sublinear_tf, "norm": norm,
+    }
+    counter = HashingTfidfModel(meta, {})
+    document_frequency = np.zeros(n_features, dtype=np.int64)
+    for text in texts:
+        document_frequency[counter.document_counts(text)[0]] += 1
+    idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1
+    save_artifact(path, "hashing", {"idf": idf}, **meta, source="fit_hashing_vectorizer")
+    return load_artifact(path)
+
+def _to_csr(rows: SparseRows):
+    from scipy.sparse import csr_matrix
+    return csr_matrix((rows.data, rows.indices, rows.indptr), shape=rows.shape)
+
+def train_hashing_model(texts: list, labels: list, output: str, test_size: float = 0.2, seed: int = 0,
+                        baseline: tuple = None, **vectorizer_options) -> dict:
+    """
+    Fit a hashing vectorizer and a LogisticRegression on a train split of `texts`,
+    export both under `output` (model/, vectorizer/), and report held-out accuracy,
+    next to that of a `baseline` (model, vectorizer) pair such as the current pickles.
+    """
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import train_test_split
+
+    train_x, test_x, train_y, test_y = train_test_split(
+        texts, labels, test_size=test_size, random_state=seed, stratify=labels)
+    vectorizer = fit_hashing_vectorizer(train_x, os.path.join(output, "vectorizer"), **vectorizer_options)
+    model = LogisticRegression(max_iter=1000).fit(_to_csr(vectorizer.transform(train_x)), train_y)
+    export_linear(model, os.path.join(output, "model"))
+    compact = load_artifact(os.path.join(output, "model"))
+    report = {
+        "train_size": len(train_x),
+        "test_size": len(test_x),
+        "accuracy": float(np.mean(compact.predict(vectorizer.transform(test_x)) == np.asarray(test_y))),
+    }
+    if baseline:
+        baseline_model, baseline_vectorizer = baseline
+        predicted = baseline_model.predict(baseline_vectorizer.transform(test_x))
+        report["baseline_accuracy"] = float(np.mean(predicted == np.asarray(test_y)))
+    return report
+
+
+def check_forest(model, path: str, samples: int = 2000, seed: int = 0) -> float:
+    """Largest predict_proba difference between `model` and its export on random inputs spanning the split thresholds."""
+    compact = load_artifact(path)
+    rng = np.random.default_rng(seed)
+    thresholds = [compact.threshold[(compact.feature == f) & (compact.left >= 0)] for f in range(model.n_features_in_)]
+    X = np.column_stack([
+        rng.choice(t, samples) + rng.choice([-1e-3, 0, 1e-3], samples) if len(t) else rng.normal(size=samples)
+        for t in thresholds
+    ])
+    with warnings.catch_warnings():
+        # Models fitted on a DataFrame warn about the plain array; columns are in fit order
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        expected = model.predict_proba(X)
+    return float(np.abs(expected - compact.predict_proba(X)).max())
+
+def check_text_model(model, vectorizer, model_path: str, vectorizer_path: str, texts: list = None,
+                     samples: int = 200, seed: int = 0) -> float:
+    """Largest predict_proba difference on `texts`, or on documents sampled from the vocabulary."""
+    compact_model, compact_vectorizer = load_artifact(model_path), load_artifact(vectorizer_path)
+    if not texts:
+        rng = np.random.default_rng(seed)
+        terms = list(vectorizer.vocabulary_)
+        texts = [" ".join(rng.choice(terms, rng.integers(1, 200))) for _ in range(samples)]
+    expected = model.predict_proba(vectorizer.transform(texts))
+    actual = compact_model.predict_proba(compact_vectorizer.transform(texts))
+    return float(np.abs(expected - actual).max())
+
+
+def _memory_kb() -> dict:
+    """Private (anonymous) and file-backed resident memory of this process, from /proc (Linux)."""
+    with open("/proc/self/status") as f:
+        fields = dict(line.split(":", 1) for line in f)
+    return {key: int(fields[key].split()[0]) for key in ("RssAnon", "RssFile")}
+
+def _measure_load(fmt: str, paths: list) -> dict:
+    """Load `paths` in a fresh interpreter and report wall time and resident memory growth."""
+    script = (
+        "import json, time\n"
+        "from backend.utils.model_artifacts import _memory_kb, load_artifact\n"
+        "before = _memory_kb()\n"
+        "started = time.perf_counter()\n"
+        f"paths = {paths!r}\n"
+        + ("import joblib\nobjs = [joblib.load(p) for p in paths]\n" if fmt == "joblib" else
+           "objs = [load_artifact(p) for p in paths]\n")
+        + "elapsed = time.perf_counter() - started\n"
+        "after = _memory_kb()\n"
+        "print(json.dumps({'load_ms': round(elapsed * 1000, 1), **{k: after[k] - before[k] for k in after}}))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv: list = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export sklearn models to memory-mappable artifacts")
+    commands = parser.add_subparsers(dest="command", required=True)
+    risk = commands.add_parser("export-risk", help="random forest risk model (.pkl) -> artifact dir")
+    risk.add_argument("model")
+    risk.add_argument("output")
+    text = commands.add_parser("export-transparency", help="transparency model + vectorizer (.pkl) -> artifact dirs")
+    text.add_argument("model")
+    text.add_argument("vectorizer")
+    text.add_argument("output", help="directory receiving model/ and vectorizer/")
+    train = commands.add_parser("train-hashing", help="train a hashing-vectorizer transparency model from a CSV")
+    train.add_argument("data", help="CSV with text and label columns")
+    train.add_argument("output", help="directory receiving model/ and vectorizer/")
+    train.add_argument("--n-features", type=int, default=2 ** 18)
+    train.add_argument("--ngram-max", type=int, default=2)
+    train.add_argument("--baseline", nargs=2, metavar=("MODEL", "VECTORIZER"),
+                       help="current transparency pickles, scored on the same held-out split")
+    compare = commands.add_parser("compare", help="load time and RSS growth of joblib files vs their artifacts")
+    compare.add_argument("--joblib", nargs="+", required=True)
+    compare.add_argument("--artifact", nargs="+", required=True)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "compare":
+        for fmt, paths in (("joblib", args.joblib), ("artifact", args.artifact)):
+            runs = [_measure_load(fmt, paths) for _ in range(3)]
+            best = min(runs, key=lambda r: r["load_ms"])
+            print(f"{fmt:<9} load {best['load_ms']:>8.1f} ms   private rss +{best['RssAnon'] / 1024:.1f} MiB"
+                  f"   shareable (file-backed) rss +{best['RssFile'] / 1024:.1f} MiB")
+        return
+
+    import joblib
+    if args.command == "train-hashing":
+        import csv
+        with open(args.data, newline="", encoding="utf-8") as f:
+            rows = [(row["text"], row["label"]) for row in csv.DictReader(f)]
+        labels = [int(label) if label.lstrip("-").isdigit() else label for _, label in rows]
+        baseline = tuple(joblib.load(p) for p in args.baseline) if args.baseline else None
+        report = train_hashing_model([text for text, _ in rows], labels, args.output, baseline=baseline,
+                                     n_features=args.n_features, ngram_range=(1, args.ngram_max))
+        logging.info(f"Trained hashing model -> {args.output}: {report}")
+    elif args.command == "export-risk":
+        model = joblib.load(args.model)
+        export_forest(model, args.output)
+        logging.info(f"Exported {args.model} -> {args.output} (max |Δp| = {check_forest(model, args.output):.2e})")
+    else:
+        model, vectorizer = joblib.load(args.model), joblib.load(args.vectorizer)
+        model_path, vectorizer_path = os.path.join(args.output, "model"), os.path.join(args.output, "vectorizer")
+        export_linear(model, model_path)
+        export_tfidf(vectorizer, vectorizer_path)
+        drift = check_text_model(model, vectorizer, model_path, vectorizer_path)
+        logging.info(f"Exported {args.model} + {args.vectorizer} -> {args.output} (max |Δp| = {drift:.2e})")
+
+
+if __name__ == "__main__":
+    main()
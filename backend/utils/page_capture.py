@@ -0,0 +1,128 @@
+from urllib.parse import urljoin, urlparse
+import logging
+import asyncio
+from backend.models import PageCapture, PageResource
+from backend.utils.html_stream import HtmlExtractor, HTML_CHUNK_SIZE, HTML_MAX_BYTES, collect_html
+from backend.utils.cpu_pool import cpu_pool, extract_page
+from backend.utils.metrics import OPERATION_SECONDS, PLAYWRIGHT_ATTEMPTS, PAGE_CAPTURES
+from backend.utils.tracing import span
+from backend.services.http_client import http_client
+from backend.services.browser_pool import browser_pool
+
+# After DOMContentLoaded, give late-loading trackers this long to settle
+NETWORK_IDLE_TIMEOUT_MS = 10000
+
+CAPTURE_SCRIPT = """
+    () => ({
+        text: document.body ? document.body.innerText : "",
+        resources: Array.from(document.querySelectorAll('script[src], iframe[src], img[src]'))
+            .map(el => ({ src: el.src, tag: el.tagName.toLowerCase() }))
+    })
+"""
+
+def _to_resources(base_url: str, raw: list) -> list:
+    resources = []
+    for r in raw:
+        src = urljoin(base_url, r["src"])
+        domain = urlparse(src).hostname
+        if domain:
+            resources.append(PageResource(src=src, domain=domain.lower(), tag=r["tag"]))
+    return resources
+
+async def _capture_with_playwright(url: str) -> PageCapture:
+    async with browser_pool.page() as page:
+        logging.info(f"Navigating to {url}")
+        with span("navigation", url=url), OPERATION_SECONDS.labels(operation="navigation").time():
+            response = await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+            try:
+                await page.wait_for_load_state("networkidle", timeout=NETWORK_IDLE_TIMEOUT_MS)
+            except Exception:
+                logging.info(f"Network not idle after {NETWORK_IDLE_TIMEOUT_MS}ms, capturing anyway")
+        data = await page.evaluate(CAPTURE_SCRIPT)
+        cookies = await page.context.cookies()
+        headers = await response.all_headers() if response else {}
+        return PageCapture(
+            url=page.url,
+            status=response.status if response else None,
+            text=data["text"] or "",
+            resources=_to_resources(page.url, data["resources"]),
+            cookies=[c["name"] for c in cookies],
+            headers={k.lower(): v for k, v in headers.items()},
+            source="playwright"
+        )
+
+async def _capture_with_http(url: str) -> PageCapture:
+    # An unchanged page (304 to its ETag/Last-Modified) reuses the last capture instead of re-parsing
+    headers, cached = http_client.conditional_headers(url)
+    async with http_client.stream(url, headers) as response:
+        if http_client.not_modified(url, response, cached):
+            return cached.model_copy(deep=True)
+        response.raise_for_status()
+        encoding = response.charset_encoding or "utf-8"
+        if cpu_pool.enabled:
+            # Workers keep no parser state between tasks, so the capped body is parsed in one
+            # task there; the event loop only holds the raw bytes, never a tree or the text
+            body = bytearray()
+            async for chunk in http_client.iter_body(response, HTML_MAX_BYTES, HTML_CHUNK_SIZE):
+                body.extend(chunk)
+            text, raw = await cpu_pool.run(extract_page, bytes(body), encoding)
+        else:
+            # Each chunk is parsed as it arrives (off the event loop), so the whole body is never held
+            extractor = HtmlExtractor(encoding, HTML_MAX_BYTES)
+            items = []
+            async for chunk in http_client.iter_body(response, chunk_size=HTML_CHUNK_SIZE):
+                items.extend(await cpu_pool.run(extractor.feed, chunk))
+                if extractor.done:
+                    break
+            items.extend(extractor.close())
+            text, raw = collect_html(items)
+        final_url = str(response.url)
+        capture = PageCapture(
+            url=final_url,
+            status=response.status_code,
+            text=text,
+            resources=_to_resources(final_url, raw),
+            cookies=list(response.cookies.keys()),
+            headers={k.lower(): v for k, v in response.headers.items()},
+            source="http"
+        )
+    if capture.status == 200:
+        http_client.remember(url, capture.headers, capture)
+    return capture
+
+async def capture_page(url: str) -> PageCapture:
+    """
+    Navigate to `url` once and collect everything later stages need:
+    visible text, embedded resources, cookies and response headers.
+    """
+    logging.info(f"Capturing page {url}")
+    if not url.startswith(("http://", "https://")):
+        url = "https://" + url
+    # Try Playwright with retries
+    for attempt in range(3):
+        try:
+            logging.info(f"Attempting Playwright for {url} (Attempt {attempt + 1})")
+            capture = await _capture_with_playwright(url)
+            logging.info(f"Captured {len(capture.text)} characters, {len(capture.resources)} resources, "
+                         f"{len(capture.cookies)} cookies with Playwright")
+            PLAYWRIGHT_ATTEMPTS.labels(outcome="success").inc()
+            PAGE_CAPTURES.labels(source="playwright").inc()
+            return capture
+        except Exception:
+            logging.exception(f"Playwright failed for {url} on attempt {attempt + 1}")
+            PLAYWRIGHT_ATTEMPTS.labels(outcome="retry" if attempt < 2 else "failure").inc()
+            if attempt < 2:
+                logging.info("Retrying in 2 seconds...")
+                await asyncio.sleep(2)
+            continue
+    # Fallback to a plain HTTP fetch
+    try:
+        logging.info(f"Attempting HTTP fetch for {url}")
+        capture = await _capture_with_http(url)
+        logging.info(f"Captured {len(capture.text)} characters with HTTP fetch")
+        PAGE_CAPTURES.labels(source="http").inc()
+        return capture
+    except Exception as e:
+        logging.exception(f"HTTP fetch failed for {url}")
+        PAGE_CAPTURES.labels(source="none").inc()
+        return PageCapture(url=url, source="none", error=str(e))
@@ -0,0 +1,126 @@
+import math
+import os
+import re
+
+# Passages are built from whole lines/sentences up to this size
+PASSAGE_MAX_CHARS = int(os.getenv("PASSAGE_MAX_CHARS", "1200"))
+PASSAGE_PREVIEW_CHARS = 80
+GAP_MARKER = "\n[...]\n"
+
+# Privacy-risk topics and how much a passage about each is worth to the summary
+RISK_TOPICS = {
+    "sale": (re.compile(r"\bsell|\bsold\b|\bsale of\b|\bmonetiz"), 4.0),
+    "sharing": (re.compile(r"shar(?:e|ing)|disclos|transfer|third.?part|partner|affiliate"), 3.0),
+    "tracking": (re.compile(r"track|cookie|pixel|beacon|analytics|advertis|fingerprint|profil"), 3.0),
+    "retention": (re.compile(r"retain|retention|\bstore[sd]?\b|as long as|period of|\bdelet"), 2.0),
+    "rights": (re.compile(r"opt.?out|\baccess\b|rectif|portab|\beras|right to|consent|gdpr|ccpa"), 2.0),
+}
+# The opening passage usually names the controller and scope of the policy
+INTRO_BONUS = 1.0
+
+_LINE_RE = re.compile(r"[^\n]+")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+_HEADING_RE = re.compile(r"^\s*(?:\d+(?:\.\d+)*\.?\s+)?[A-Z][^.!?]{0,78}$")
+
+
+def _units(text: str):
+    """(start, end) spans of lines, with over-long lines split at sentence ends."""
+    for line in _LINE_RE.finditer(text):
+        start, end = line.span()
+        if not text[start:end].strip():
+            continue
+        if end - start <= PASSAGE_MAX_CHARS:
+            yield start, end
+            continue
+        cuts = [start] + [m.end() for m in _SENTENCE_END_RE.finditer(text, start, end)] + [end]
+        for a, b in zip(cuts, cuts[1:]):
+            # Sentences that are still too long are hard-cut
+            while b - a > PASSAGE_MAX_CHARS:
+                yield a, a + PASSAGE_MAX_CHARS
+                a += PASSAGE_MAX_CHARS
+            if a < b:
+                yield a, b
+
+def split_passages(text: str) -> list:
+    """
+    Split a policy into passages of up to PASSAGE_MAX_CHARS, starting a new
+    passage at each heading-like line. Returns (start, end) offsets into `text`.
+    """
+    passages = []
+    current = None
+    for start, end in _units(text):
+        is_heading = _HEADING_RE.match(text[start:end]) is not None
+        if current and (is_heading or end - current[0] > PASSAGE_MAX_CHARS):
+            passages.append(tuple(current))
+            current = None
+        if current is None:
+            current = [start, end]
+        else:
+            current[1] = end
+    if current:
+        passages.append(tuple(current))
+    return passages
+
+def score_passage(passage: str) -> tuple:
+    """Risk value of a passage and the topics it touches; repeated hits add with diminishing returns."""
+    lowered = passage.lower()
+    score, topics = 0.0, []
+    for topic, (pattern, weight) in RISK_TOPICS.items():
+        hits = len(pattern.findall(lowered))
+        if hits:
+            score += weight * math.log1p(hits)
+            topics.append(topic)
+    return score, topics
+
+def select_passages(text: str, budget_chars: int) -> tuple:
+    """
+    Pack the most risk-relevant passages of `text` into `budget_chars`.
+    Returns (selected_text, report); the selection keeps document order, marks
+    skipped stretches with "[...]", and the report lists the chosen spans.
+    """
+    if len(text) <= budget_chars:
+        return text, {
+            "strategy": "full",
+            "total_chars": len(text),
+            "selected_chars": len(text),
+            "coverage": 1.0,
+            "spans": [{"start": 0, "end": len(text), "topics": [], "score": None}],
+        }
+
+    candidates = []
+    for index, (start, end) in enumerate(split_passages(text)):
+        score, topics = score_passage(text[start:end])
+        if index == 0:
+            score += INTRO_BONUS
+        if score > 0:
+            candidates.append({"start": start, "end": end, "score": round(score, 3), "topics": topics})
+
+    # Greedy knapsack by value per character; smaller passages may still fit once large ones do not
+    chosen, used = [], 0
+    for passage in sorted(candidates, key=lambda p: (-p["score"] / (p["end"] - p["start"]), p["start"])):
+        cost = passage["end"] - passage["start"] + len(GAP_MARKER)
+        if used + cost <= budget_chars:
+            chosen.append(passage)
+            used += cost
+    chosen.sort(key=lambda p: p["start"])
+
+    pieces, previous_end = [], None
+    for passage in chosen:
+        if previous_end is not None:
+            gap = text[previous_end:passage["start"]]
+            pieces.append("\n" if not gap.strip() else GAP_MARKER)
+        pieces.append(text[passage["start"]:passage["end"]].strip())
+        previous_end = passage["end"]
+    selected = "".join(pieces)
+
+    spans = [
+        {**p, "preview": text[p["start"]:p["end"]].strip()[:PASSAGE_PREVIEW_CHARS]}
+        for p in chosen
+    ]
+    return selected, {
+        "strategy": "ranked",
+        "total_chars": len(text),
+        "selected_chars": len(selected),
+        "coverage": round(sum(p["end"] - p["start"] for p in chosen) / len(text), 3),
+        "spans": spans,
+    }
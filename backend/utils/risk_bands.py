@@ -0,0 +1,7 @@
+# Score bands: below NEUTRAL_SCORE is Safe, from RISKY_SCORE up is Risky.
+# Kept free of imports so the database layer can use them without loading the models
+NEUTRAL_SCORE = 33
+RISKY_SCORE = 66
+
+def classify_score(score: float) -> str:
+    return "Safe" if score < NEUTRAL_SCORE else "Neutral" if score < RISKY_SCORE else "Risky"
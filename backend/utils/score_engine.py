@@ -1,42 +1,75 @@
-import os, logging, pandas as pd
-from joblib import load
+import os, logging, warnings
 import numpy as np
+from backend.utils.micro_batcher import MicroBatcher
+from backend.utils.model_artifacts import is_artifact, load_artifact
+from backend.utils.risk_bands import classify_score
+from backend.utils.service_registry import registry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-MODEL_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "ai_pipeline", "output", "trained_model_8_features.pkl")
+MODEL_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "ai_pipeline", "output")
+MODEL_PATH = os.path.join(MODEL_DIR, "trained_model_8_features.pkl")
+# Memory-mapped export of MODEL_PATH (python -m backend.utils.model_artifacts export-risk)
+MODEL_ARTIFACT_PATH = os.getenv("RISK_MODEL_ARTIFACT", os.path.join(MODEL_DIR, "risk_model"))
 
 def load_model():
-    if os.path.exists(MODEL_PATH):
+    if is_artifact(MODEL_ARTIFACT_PATH):
+        logger.info(f"Loading model artifact from {MODEL_ARTIFACT_PATH}")
+        return load_artifact(MODEL_ARTIFACT_PATH)
+    elif os.path.exists(MODEL_PATH):
         logger.info(f"Loading model from {MODEL_PATH}")
+        # joblib pulls in sklearn on unpickling; both are deferred until the model is first needed
+        from joblib import load
         return load(MODEL_PATH)
     else:
         logger.warning(f"No trained model found at {MODEL_PATH}. Using heuristic fallback.")
         return None
 
-model = load_model()
+registry.register("risk_model", load_model)
 
 EXPECTED_FEATURES = [
     "length_chars", "num_sentences", "avg_sentence_length", "num_risks",
     "uses_third_party", "mentions_cookies", "mentions_data_sale", "mentions_tracking"
 ]
 
-def predict_risk(features: dict):
+def _classify(score: float) -> dict:
+    return {"classification": classify_score(score), "score": round(score, 2)}
+
+def _heuristic_score(features: dict) -> float:
+    return min(
+        100,
+        features.get("num_risks", 0) * 40 +
+        (1 if features.get("length_chars", 0) > 5000 else 0) * 20
+    )
+
+def feature_matrix(features_list: list) -> np.ndarray:
+    """Stack feature dicts into one (n, 8) float matrix in EXPECTED_FEATURES order."""
+    matrix = np.zeros((len(features_list), len(EXPECTED_FEATURES)), dtype=np.float64)
+    for i, features in enumerate(features_list):
+        matrix[i] = [float(features.get(k, 0.0)) for k in EXPECTED_FEATURES]
+    return matrix
+
+def predict_risk_batch(features_list: list) -> list:
+    """Score many feature dicts with a single predict_proba call; results keep input order."""
+    if not features_list:
+        return []
     try:
-        feature_vector = pd.DataFrame([{k: float(features.get(k, 0.0)) for k in EXPECTED_FEATURES}])
-        if model:
-            prob = model.predict_proba(feature_vector)[0][1]
-            score = float(prob * 100)
-        else:
+        model = registry.get("risk_model")
+        if not model:
             raise ValueError("Model not loaded")
+        with warnings.catch_warnings():
+            # The model was fitted on a DataFrame; column order matches EXPECTED_FEATURES
+            warnings.filterwarnings("ignore", message="X does not have valid feature names")
+            probs = model.predict_proba(feature_matrix(features_list))[:, 1]
+        scores = [float(p * 100) for p in probs]
     except Exception as e:
         logger.exception(f"[Score Engine] Model prediction failed: {e}")
-        score = min(
-            100,
-            features.get("num_risks", 0) * 40 +
-            (1 if features.get("length_chars", 0) > 5000 else 0) * 20
-        )
-
-    classification = "Safe" if score < 33 else "Neutral" if score < 66 else "Risky"
-    return {"classification": classification, "score": round(score, 2)}
+        scores = [_heuristic_score(f) for f in features_list]
+    return [_classify(score) for score in scores]
+
+def predict_risk(features: dict):
+    return predict_risk_batch([features])[0]
+
+# Concurrent scans arriving within a few ms share one model call
+risk_batcher = MicroBatcher(predict_risk_batch)
@@ -0,0 +1,118 @@
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from backend.utils.executor import run_blocking
+
+PENDING, LOADING, READY, FAILED = "pending", "loading", "ready", "failed"
+
+
+class _Service:
+    def __init__(self, name: str, loader, required: bool):
+        self.name = name
+        self.loader = loader
+        self.is_async = inspect.iscoroutinefunction(loader)
+        self.required = required
+        self.state = PENDING
+        self.value = None
+        self.error = None
+        self.load_ms = None
+        self.lock = threading.Lock()
+        self.task = None
+
+
+class ServiceRegistry:
+    """
+    Heavy dependencies (models, LLM SDK, browser, database setup) registered by
+    name and loaded once: on first `get`, or ahead of time by `warm_up` in the
+    background so startup does not wait for them. Readiness means every
+    required service loaded; optional ones may fail and leave their callers
+    on a fallback.
+    """
+
+    def __init__(self):
+        self._services = {}
+        self._warm_up_task = None
+        self.started_at = time.monotonic()
+
+    def register(self, name: str, loader, required: bool = False):
+        self._services[name] = _Service(name, loader, required)
+
+    def _record(self, service: _Service, started: float, value=None, error: Exception = None):
+        service.load_ms = round((time.perf_counter() - started) * 1000, 1)
+        if error is None:
+            service.value, service.state = value, READY
+            logging.info(f"Service {service.name} ready in {service.load_ms}ms")
+        else:
+            service.error, service.state = f"{type(error).__name__}: {error}", FAILED
+            logging.error(f"Service {service.name} failed to load: {service.error}")
+
+    def get(self, name: str):
+        """The loaded service, loading it now if needed (sync loaders only); None if loading failed."""
+        service = self._services[name]
+        if service.state in (READY, FAILED):
+            return service.value
+        with service.lock:
+            if service.state not in (READY, FAILED):
+                service.state = LOADING
+                started = time.perf_counter()
+                try:
+                    self._record(service, started, value=service.loader())
+                except Exception as e:
+                    self._record(service, started, error=e)
+        return service.value
+
+    def loaded(self, name: str):
+        """The service if it has finished loading, without triggering a load."""
+        service = self._services[name]
+        return service.value if service.state == READY else None
+
+    async def aget(self, name: str):
+        service = self._services[name]
+        if not service.is_async:
+            return service.value if service.state in (READY, FAILED) else await run_blocking(self.get, name)
+        if service.task is None:
+            # Async loaders run once; concurrent callers await the same load
+            service.task = asyncio.ensure_future(self._load_async(service))
+        return await asyncio.shield(service.task)
+
+    async def _load_async(self, service: _Service):
+        service.state = LOADING
+        started = time.perf_counter()
+        try:
+            self._record(service, started, value=await service.loader())
+        except Exception as e:
+            self._record(service, started, error=e)
+        return service.value
+
+    async def warm_up(self):
+        """Load every registered service concurrently; sync loaders run on the blocking pool."""
+        await asyncio.gather(*(self.aget(name) for name in self._services))
+        logging.info(f"Warm-up finished {round((time.monotonic() - self.started_at) * 1000)}ms after start")
+
+    def start_warm_up(self):
+        self._warm_up_task = asyncio.create_task(self.warm_up())
+
+    def stop_warm_up(self):
+        if self._warm_up_task is not None and not self._warm_up_task.done():
+            self._warm_up_task.cancel()
+
+    @property
+    def ready(self) -> bool:
+        return all(s.state == READY for s in self._services.values() if s.required) and all(
+            s.state in (READY, FAILED) for s in self._services.values()
+        )
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "uptime_s": round(time.monotonic() - self.started_at, 1),
+            "services": {
+                s.name: {"state": s.state, "required": s.required, "load_ms": s.load_ms, "error": s.error}
+                for s in self._services.values()
+            },
+        }
+
+
+registry = ServiceRegistry()
@@ -0,0 +1,82 @@
+import re
+from collections import Counter
+
+# Every keyword either extractor looks for, plus sentence dots, factored by shared
+# prefix so the engine tests one branch per position instead of ~25 alternatives.
+# No keyword is a prefix of another, so match boundaries equal those of the
+# original per-family `re.findall` passes on ordinary text.
+_SCAN = re.compile(
+    r"a(?:ffiliate|nalytics|ccess)"
+    r"|beacon"
+    r"|co(?:llect|okie|n(?:trol|sent))"
+    r"|d(?:isclose|elete)"
+    r"|gather"
+    r"|opt.?out"
+    r"|partner"
+    r"|retain"
+    r"|s(?:tore|ell|hare|ale of data)"
+    r"|t(?:hird.?party|ra(?:ck|nsfer))"
+    r"|\."
+)
+# Classifies a matched string; the named groups are finer than the keyword
+# families so the presence flags can be read off too.
+_CLASSIFIER = re.compile(
+    r"(?P<collect>collect|gather|store|retain)"
+    r"|(?P<third_party>third.?party)"
+    r"|(?P<partner>affiliate|partner)"
+    r"|(?P<track>track)"
+    r"|(?P<cookie>cookie)"
+    r"|(?P<analytics>analytics)"
+    r"|(?P<beacon>beacon)"
+    r"|(?P<sell>sell)"
+    r"|(?P<share>share|disclose|transfer)"
+    r"|(?P<rights>access|delete|opt.?out|control|consent)"
+    r"|(?P<sale_of_data>sale of data)"
+    r"|(?P<dot>\.)"
+)
+
+# Keyword families used by the heuristic transparency score
+FAMILY_GROUPS = {
+    "data_collection": ("collect",),
+    "third_party": ("third_party", "partner"),
+    "tracking": ("track", "cookie", "analytics", "beacon"),
+    "sharing": ("sell", "share"),
+    "user_rights": ("rights",),
+}
+
+def scan_text(text: str) -> dict:
+    """
+    Count every keyword group and sentence dot in one regex pass over the lowercased `text`.
+    Also records whether a literal "third party"/"third-party" was seen.
+    """
+    counts = dict.fromkeys(_CLASSIFIER.groupindex, 0)
+    third_party_literal = False
+    # findall and the tally run in C; only the few distinct matched strings are classified in Python
+    for matched, n in Counter(_SCAN.findall(text.lower())).items():
+        group = _CLASSIFIER.fullmatch(matched).lastgroup
+        counts[group] += n
+        if group != "dot" and "." in matched:
+            # `third.party` / `opt.out` swallow a dot that str.count(".") would see
+            counts["dot"] += n * matched.count(".")
+        if group == "third_party" and matched[5] in " -":
+            third_party_literal = True
+    counts["third_party_literal"] = int(third_party_literal)
+    return counts
+
+def keyword_counts(counts: dict) -> dict:
+    """Heuristic keyword-family counts (the `model_service.extract_features` shape)."""
+    return {family: sum(counts[g] for g in groups) for family, groups in FAMILY_GROUPS.items()}
+
+def risk_model_features(text: str, counts: dict, summary: dict) -> dict:
+    """The 8-feature vector expected by `score_engine`."""
+    num_sentences = counts["dot"] or 1
+    return {
+        "length_chars": len(text),
+        "num_sentences": num_sentences,
+        "avg_sentence_length": len(text.split()) / num_sentences,
+        "num_risks": len(summary.get("risks", [])),
+        "uses_third_party": 1 if counts["third_party_literal"] else 0,
+        "mentions_cookies": 1 if counts["cookie"] else 0,
+        "mentions_data_sale": 1 if counts["sell"] or counts["sale_of_data"] else 0,
+        "mentions_tracking": 1 if counts["track"] or counts["analytics"] else 0,
+    }
@@ -0,0 +1,101 @@
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Finished traces kept in memory for /traces
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "100"))
+# Fraction of debug-level payload dumps (LLM responses and the like) actually written
+PAYLOAD_LOG_SAMPLE_RATE = float(os.getenv("PAYLOAD_LOG_SAMPLE_RATE", "0.01"))
+PAYLOAD_LOG_MAX_CHARS = int(os.getenv("PAYLOAD_LOG_MAX_CHARS", "2000"))
+
+request_id_var: ContextVar = ContextVar("request_id", default=None)
+_current_span: ContextVar = ContextVar("current_span", default=None)
+recent_traces = deque(maxlen=TRACE_BUFFER_SIZE)
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps each log record with the request ID of the context that emitted it."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get() or "-"
+        return True
+
+
+@contextmanager
+def request_context(request_id: str = None):
+    """Run the block (and tasks it starts) under `request_id`, or a fresh one."""
+    token = request_id_var.set(request_id or new_request_id())
+    try:
+        yield request_id_var.get()
+    finally:
+        request_id_var.reset(token)
+
+
+class Span:
+    def __init__(self, name: str, trace: dict, parent, attrs: dict):
+        self.name = name
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:8]
+        self.parent_id = parent.span_id if parent else None
+        self.attrs = attrs
+        self.status = "ok"
+        self.started = time.time()
+        self._perf = time.perf_counter()
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def finish(self):
+        self.trace["spans"].append({
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.started,
+            "duration_ms": round((time.perf_counter() - self._perf) * 1000, 1),
+            "status": self.status,
+            **({"attrs": self.attrs} if self.attrs else {}),
+        })
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Time the block as a child of the current span. Starts a new trace, under the
+    current request ID, when there is none; the trace is kept in `recent_traces`
+    once its root span ends. Works across `await`: tasks inherit the current span.
+    """
+    parent = _current_span.get()
+    trace = parent.trace if parent else {"request_id": request_id_var.get() or new_request_id(), "spans": []}
+    current = Span(name, trace, parent, attrs)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = type(e).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        current.finish()
+        if parent is None:
+            trace["name"] = name
+            trace["duration_ms"] = trace["spans"][-1]["duration_ms"]
+            recent_traces.append(trace)
+            logging.debug(f"Trace {name}: " + ", ".join(f"{s['name']}={s['duration_ms']}ms" for s in trace["spans"]))
+
+
+def log_payload(label: str, payload):
+    """Debug-log a (truncated) payload for a sample of calls; free when debug logging is off."""
+    if not logging.getLogger().isEnabledFor(logging.DEBUG) or random.random() >= PAYLOAD_LOG_SAMPLE_RATE:
+        return
+    text = payload if isinstance(payload, str) else json.dumps(payload, default=str)
+    logging.debug(f"{label} ({len(text)} characters): {text[:PAYLOAD_LOG_MAX_CHARS]}")
@@ -0,0 +1,163 @@
+import ipaddress
+import json
+import logging
+import os
+from backend.utils.service_registry import registry
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+TRACKER_RULES_PATH = os.getenv("TRACKER_RULES_PATH", os.path.join(DATA_DIR, "trackers.json"))
+PUBLIC_SUFFIX_PATH = os.getenv("PUBLIC_SUFFIX_PATH", os.path.join(DATA_DIR, "public_suffixes.dat"))
+
+# When a domain is listed under several categories, the most privacy-invasive one is reported
+CATEGORY_PRIORITY = [
+    "FingerprintingInvasive", "Cryptomining", "Advertising", "Analytics",
+    "Social", "FingerprintingGeneral", "Email", "Content",
+]
+CATEGORY_LABELS = {
+    "FingerprintingInvasive": "Fingerprinting",
+    "FingerprintingGeneral": "Fingerprinting",
+}
+
+# Trie node keys; DNS labels are never empty, so these cannot collide with one
+_VALUE = ""
+_EXCEPTION = "!"
+
+
+class SuffixTrie:
+    """
+    Domains stored as reversed-label paths (com -> doubleclick -> ad), so finding
+    the most specific rule covering a hostname takes one dict step per label.
+    """
+
+    def __init__(self):
+        self.root = {}
+        self.size = 0
+
+    def insert(self, domain: str, value):
+        node = self.root
+        for label in reversed(domain.split(".")):
+            node = node.setdefault(label, {})
+        if _VALUE not in node:
+            self.size += 1
+        node[_VALUE] = value
+
+    def longest_match(self, labels: list):
+        """(value, depth) of the deepest rule that is a suffix of `labels`, or (None, 0)."""
+        node, found, depth = self.root, None, 0
+        for i in range(len(labels) - 1, -1, -1):
+            node = node.get(labels[i])
+            if node is None:
+                break
+            if _VALUE in node:
+                found, depth = node[_VALUE], len(labels) - i
+        return found, depth
+
+
+class PublicSuffixList:
+    """publicsuffix.org rules (plain, "*." wildcard and "!" exception) for eTLD+1 lookups."""
+
+    def __init__(self, rules):
+        self.root = {}
+        for rule in rules:
+            rule = rule.strip().lower()
+            if not rule or rule.startswith("//"):
+                continue
+            exception = rule.startswith("!")
+            node = self.root
+            for label in reversed(rule.lstrip("!").split(".")):
+                node = node.setdefault(label, {})
+            node[_EXCEPTION if exception else _VALUE] = True
+
+    def suffix_length(self, labels: list) -> int:
+        """Number of trailing labels forming the public suffix; unknown TLDs count as one."""
+        node, length = self.root, 1
+        for depth, i in enumerate(range(len(labels) - 1, -1, -1), start=1):
+            exact, wild = node.get(labels[i]), node.get("*")
+            if exact is not None and _EXCEPTION in exact:
+                # "!www.ck": the suffix is the rule minus its leftmost label
+                return depth - 1
+            if (exact is not None and _VALUE in exact) or (wild is not None and _VALUE in wild):
+                length = depth
+            node = exact if exact is not None else wild
+            if node is None:
+                break
+        return length
+
+    def registrable_domain(self, host: str) -> str:
+        """eTLD+1 of `host` (e.g. news.bbc.co.uk -> bbc.co.uk); IPs and bare suffixes come back as-is."""
+        host = host.lower().rstrip(".")
+        if _is_ip(host):
+            return host
+        labels = host.split(".")
+        n = self.suffix_length(labels)
+        return host if len(labels) <= n else ".".join(labels[-(n + 1):])
+
+
+def _is_ip(host: str) -> bool:
+    # Hostnames cannot end in a digit (TLDs are alphabetic), so most skip the parse
+    if not (host[-1:].isdigit() or ":" in host):
+        return False
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return True
+    except ValueError:
+        return False
+
+
+class TrackerIndex:
+    """
+    Tracker ruleset compiled into a SuffixTrie: `lookup(host)` returns the
+    owning company and category of the most specific listed domain covering `host`.
+    """
+
+    def __init__(self, services: dict, suffixes: PublicSuffixList):
+        self.suffixes = suffixes
+        self.trie = SuffixTrie()
+        self.owner_domains = {}
+        ranked = sorted(
+            services.get("categories", {}).items(),
+            key=lambda item: CATEGORY_PRIORITY.index(item[0]) if item[0] in CATEGORY_PRIORITY else len(CATEGORY_PRIORITY),
+        )
+        for category, entities in ranked:
+            label = CATEGORY_LABELS.get(category, category)
+            for entity in entities:
+                for owner, sites in entity.items():
+                    for domains in sites.values():
+                        if not isinstance(domains, list):
+                            continue
+                        for domain in domains:
+                            domain = domain.lower()
+                            # First (highest priority) category wins for a domain listed twice
+                            if self.trie.longest_match(domain.split("."))[1] == domain.count(".") + 1:
+                                continue
+                            self.trie.insert(domain, {"domain": domain, "owner": owner, "category": label})
+                            self.owner_domains.setdefault(owner, set()).add(domain)
+
+    def __len__(self):
+        return self.trie.size
+
+    def lookup(self, host: str):
+        """{"domain", "owner", "category"} for a tracker hostname, or None."""
+        return self.trie.longest_match(host.lower().rstrip(".").split("."))[0]
+
+    def owner_of(self, host: str):
+        match = self.lookup(host)
+        return match["owner"] if match else None
+
+    def registrable_domain(self, host: str) -> str:
+        return self.suffixes.registrable_domain(host)
+
+
+def load_tracker_index(rules_path: str = TRACKER_RULES_PATH, suffix_path: str = PUBLIC_SUFFIX_PATH) -> TrackerIndex:
+    with open(suffix_path, encoding="utf-8") as f:
+        suffixes = PublicSuffixList(f)
+    with open(rules_path, encoding="utf-8") as f:
+        index = TrackerIndex(json.load(f), suffixes)
+    logging.info(f"Loaded {len(index)} tracker domains from {rules_path}")
+    return index
+
+def tracker_index() -> TrackerIndex:
+    """The shared index, compiled on first use or during warm-up."""
+    return registry.get("tracker_index")
+
+registry.register("tracker_index", load_tracker_index)
@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+from backend.utils.tracker_index import TRACKER_RULES_PATH, PUBLIC_SUFFIX_PATH, PublicSuffixList
+
+# Public sources the tracker index is built from; `python -m backend.utils.tracker_lists fetch` refreshes them
+DISCONNECT_URL = os.getenv(
+    "DISCONNECT_URL",
+    "https://raw.githubusercontent.com/disconnectme/disconnect-tracking-protection/master/services.json",
+)
+EASYPRIVACY_URL = os.getenv("EASYPRIVACY_URL", "https://easylist.to/easylist/easyprivacy.txt")
+TRACKERDB_URL = os.getenv(
+    "TRACKERDB_URL",
+    "https://raw.githubusercontent.com/whotracksme/whotracks.me/master/whotracksme/data/assets/trackerdb.sql",
+)
+PUBLIC_SUFFIX_URL = os.getenv("PUBLIC_SUFFIX_URL", "https://publicsuffix.org/list/public_suffix_list.dat")
+
+# Category for EasyPrivacy domains Disconnect does not list; ranked below every Disconnect category
+EASYPRIVACY_CATEGORY = "Tracking"
+
+# WhoTracks.Me trackerdb categories in Disconnect's terms. Infrastructure (cdn, hosting,
+# tag managers under "essential", browser extensions) is not tracking and is left out.
+TRACKERDB_CATEGORIES = {
+    "advertising": "Advertising",
+    "pornvertising": "Advertising",
+    "site_analytics": "Analytics",
+    "social_media": "Social",
+    "audio_video_player": "Content",
+    "comments": "Content",
+    "customer_interaction": "Content",
+    "misc": EASYPRIVACY_CATEGORY,
+    "unknown": EASYPRIVACY_CATEGORY,
+    None: EASYPRIVACY_CATEGORY,
+}
+
+# "||tracker.example^" or "||tracker.example^$third-party": a whole-domain block.
+# Rules with paths, wildcards or a $domain= restriction only block parts of a site and are skipped.
+_DOMAIN_RULE = re.compile(r"^\|\|([a-z0-9.-]+\.[a-z]{2,})\^(?:\$([^\s]*))?$")
+
+
+def easyprivacy_domains(lines) -> set:
+    """Domains blocked outright by an Adblock Plus format list such as EasyPrivacy."""
+    domains = set()
+    for line in lines:
+        match = _DOMAIN_RULE.match(line.strip().lower())
+        if match and "domain=" not in (match.group(2) or ""):
+            domains.add(match.group(1).strip("."))
+    return domains
+
+
+def trackerdb_services(sql: str) -> dict:
+    """WhoTracks.Me trackerdb.sql (a SQLite dump) in the Disconnect services.json layout, one entity per company."""
+    db = sqlite3.connect(":memory:")
+    try:
+        db.executescript(sql)
+        rows = db.execute("""
+            SELECT c.name, COALESCE(co.name, t.name), COALESCE(t.website_url, co.website_url), d.domain
+            FROM tracker_domains d
+            JOIN trackers t ON t.id = d.tracker
+            LEFT JOIN categories c ON c.id = t.category_id
+            LEFT JOIN companies co ON co.id = t.company_id
+            ORDER BY d.domain
+        """).fetchall()
+    finally:
+        db.close()
+    entities = {}
+    for category, owner, website, domain in rows:
+        if category not in TRACKERDB_CATEGORIES:
+            continue
+        sites = entities.setdefault(TRACKERDB_CATEGORIES[category], {}).setdefault(owner.strip(), {})
+        sites.setdefault(website or f"https://{domain}/", []).append(domain.lower())
+    return {"categories": {
+        category: [{owner: sites} for owner, sites in sorted(owners.items())]
+        for category, owners in entities.items()
+    }}
+
+def _listed_domains(services: dict) -> set:
+    return {
+        domain.lower()
+        for entities in services.get("categories", {}).values()
+        for entity in entities
+        for sites in entity.values()
+        for domains in sites.values() if isinstance(domains, list)
+        for domain in domains
+    }
+
+def merge_services(services: dict, extra: dict) -> dict:
+    """`services` with the entities of `extra` appended, minus domains `services` already lists."""
+    listed = _listed_domains(services)
+    categories = {category: list(entities) for category, entities in services.get("categories", {}).items()}
+    for category, entities in extra.get("categories", {}).items():
+        for entity in entities:
+            kept = {
+                owner: {site: [d for d in domains if d not in listed] for site, domains in sites.items()}
+                for owner, sites in entity.items()
+            }
+            kept = {owner: {site: ds for site, ds in sites.items() if ds} for owner, sites in kept.items()}
+            kept = {owner: sites for owner, sites in kept.items() if sites}
+            if kept:
+                categories.setdefault(category, []).append(kept)
+    return {**services, "categories": categories}
+
+def merge_rules(services: dict, extra_domains: set, suffixes: PublicSuffixList) -> dict:
+    """
+    Disconnect services.json with `extra_domains` appended under EASYPRIVACY_CATEGORY,
+    each owned by its registrable domain (EasyPrivacy names no companies).
+    """
+    listed = _listed_domains(services)
+    owners = {}
+    for domain in sorted(extra_domains - listed):
+        owners.setdefault(suffixes.registrable_domain(domain), []).append(domain)
+    merged = dict(services)
+    merged["categories"] = {
+        **services.get("categories", {}),
+        EASYPRIVACY_CATEGORY: services.get("categories", {}).get(EASYPRIVACY_CATEGORY, []) + [
+            {owner: {f"https://{owner}/": domains}} for owner, domains in sorted(owners.items())
+        ],
+    }
+    return merged
+
+def build_rules(disconnect: dict, trackerdb_sql: str, easyprivacy_lines, suffixes: PublicSuffixList) -> dict:
+    """The bundled ruleset: Disconnect, then WhoTracks.Me companies, then EasyPrivacy's remaining domains."""
+    rules = merge_services(disconnect, trackerdb_services(trackerdb_sql)) if trackerdb_sql else dict(disconnect)
+    rules = merge_rules(rules, easyprivacy_domains(easyprivacy_lines), suffixes)
+    rules["about"] = (
+        f"Disconnect services.json ({DISCONNECT_URL}), WhoTracks.Me trackerdb ({TRACKERDB_URL}, CC BY 4.0) "
+        f"and EasyPrivacy domain rules ({EASYPRIVACY_URL}); built by backend.utils.tracker_lists"
+    )
+    return rules
+
+def write_atomic(files):
+    """Write (path, content) pairs, each through a temporary file so readers never see a partial one."""
+    for path, content in files:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp, path)
+
+
+def fetch(rules_path: str = TRACKER_RULES_PATH, suffix_path: str = PUBLIC_SUFFIX_PATH, timeout: float = 60):
+    """Download the public suffix list and the three tracker sources, and write the files the index loads."""
+    import httpx
+
+    def download(url: str) -> str:
+        logging.info(f"Downloading {url}")
+        response = httpx.get(url, timeout=timeout, follow_redirects=True)
+        response.raise_for_status()
+        return response.text
+
+    suffix_text = download(PUBLIC_SUFFIX_URL)
+    rules = build_rules(
+        json.loads(download(DISCONNECT_URL)),
+        download(TRACKERDB_URL),
+        download(EASYPRIVACY_URL).splitlines(),
+        PublicSuffixList(suffix_text.splitlines()),
+    )
+    # Write both only after every download succeeded, so a failure never leaves a mixed set
+    write_atomic([(suffix_path, suffix_text), (rules_path, json.dumps(rules, indent=1))])
+    logging.info(f"Wrote {rules_path} and {suffix_path}")
+
+
+def build(disconnect_path: str, trackerdb_path: str = None, easyprivacy_path: str = None,
+          rules_path: str = TRACKER_RULES_PATH, suffix_path: str = PUBLIC_SUFFIX_PATH):
+    """`fetch` from local copies of the sources, e.g. when the build machine has no network."""
+    def read(path):
+        if not path:
+            return ""
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    with open(suffix_path, encoding="utf-8") as f:
+        suffixes = PublicSuffixList(f)
+    rules = build_rules(json.loads(read(disconnect_path)), read(trackerdb_path), read(easyprivacy_path).splitlines(), suffixes)
+    write_atomic([(rules_path, json.dumps(rules, indent=1))])
+    logging.info(f"Wrote {rules_path}")
+
+
+def main(argv: list = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Refresh the tracker ruleset and public suffix list")
+    commands = parser.add_subparsers(dest="command", required=True)
+    refresh = commands.add_parser("fetch", help="download Disconnect, WhoTracks.Me, EasyPrivacy and the public suffix list")
+    refresh.add_argument("--rules", default=TRACKER_RULES_PATH, help="tracker rules JSON to write")
+    refresh.add_argument("--suffixes", default=PUBLIC_SUFFIX_PATH, help="public suffix list to write")
+    offline = commands.add_parser("build", help="build the ruleset from local copies of the sources")
+    offline.add_argument("--disconnect", required=True, help="Disconnect services.json")
+    offline.add_argument("--trackerdb", help="WhoTracks.Me trackerdb.sql")
+    offline.add_argument("--easyprivacy", help="EasyPrivacy filter list")
+    offline.add_argument("--rules", default=TRACKER_RULES_PATH, help="tracker rules JSON to write")
+    offline.add_argument("--suffixes", default=PUBLIC_SUFFIX_PATH, help="public suffix list to read")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "fetch":
+        fetch(args.rules, args.suffixes)
+    else:
+        build(args.disconnect, args.trackerdb, args.easyprivacy, args.rules, args.suffixes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Load on the CPU pool: scoring throughput (feature extraction plus the risk
+model) against worker count, and how late the event loop runs meanwhile.
+0 workers is the blocking thread pool, where every task shares the GIL
+with the event loop. Throughput should grow with processes up to the
+core count.
+
+    python -m benchmarks.bench_cpu_pool [--workers 0 1 2 4] [--tasks 200] [--policy-kb 250]
+"""
+import argparse
+import asyncio
+import os
+import time
+from backend.utils.cpu_pool import CpuPool, score_policy
+
+POLICY_PART = (
+    "We collect your personal information, including your email address and location, and share "
+    "it with third-party advertising partners. We may sell data to affiliates. Cookies and similar "
+    "tracking technologies are retained indefinitely. You may opt out or request deletion at any time.\n"
+)
+
+
+async def loop_lag(stop: asyncio.Event, interval: float = 0.01) -> list:
+    """How late each `interval` sleep wakes up, until `stop` is set."""
+    lags = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+    return lags
+
+
+async def run(workers: int, tasks: int, policy: str):
+    pool = CpuPool(workers=workers, queue_limit=max(workers, 1) * 4)
+    await pool.start()
+    summary = {"summary": "", "risks": []}
+    await pool.run(score_policy, policy, summary)  # model load and imports, not measured
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(loop_lag(stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(pool.run(score_policy, policy, summary, timeout=0) for _ in range(tasks)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    lags = sorted(await lag)
+    await pool.stop()
+    return tasks / elapsed, lags[len(lags) // 2] * 1000, lags[-1] * 1000
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--policy-kb", type=int, default=250, help="policy text size per task")
+    args = parser.parse_args(argv)
+
+    policy = POLICY_PART * (args.policy_kb * 1024 // len(POLICY_PART))
+    print(f"{args.tasks} score_policy tasks of {len(policy) // 1024}KB on {os.cpu_count()} cores")
+    print(f"{'workers':>8} {'kind':<9} {'tasks/s':>8} {'loop lag p50':>13} {'max':>8}")
+    for workers in args.workers:
+        throughput, lag_p50, lag_max = asyncio.run(run(workers, args.tasks, policy))
+        kind = "processes" if workers else "threads"
+        print(f"{workers:>8} {kind:<9} {throughput:>8.1f} {lag_p50:>11.1f}ms {lag_max:>6.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Feature extraction on large synthetic policies: the single-pass engine against
+the separate regex passes and substring scans it replaced.
+
+    python -m benchmarks.bench_features [--sizes 1 5 20]
+"""
+import argparse
+import random
+import re
+import time
+from backend.services import model_service
+from backend.utils.feature_extractor import extract_features
+
+WORDS = (
+    "we collect gather store retain third party third-party affiliates partner tracking cookies "
+    "analytics beacon share sell disclose transfer access delete opt-out control consent"
+).split()
+FILLER = (
+    "the your information data policy personal services website provide may use our "
+    "with to of and for in on by this you are is be"
+).split()
+
+
+def synthetic_policy(size_mb: float, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    words, length = [], 0
+    while length < size_mb * 1024 * 1024:
+        word = rng.choice(WORDS) if rng.random() < 0.05 else rng.choice(FILLER)
+        if rng.random() < 0.06:
+            word += "."
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def before(text: str, summary: dict):
+    """The two extractors as they were: five findall passes, then substring scans and a split."""
+    lower = text.lower()
+    counts = {
+        "data_collection": len(re.findall(r"collect|gather|store|retain", lower)),
+        "third_party": len(re.findall(r"third.?party|affiliate|partner", lower)),
+        "tracking": len(re.findall(r"track|cookie|analytics|beacon", lower)),
+        "sharing": len(re.findall(r"share|sell|disclose|transfer", lower)),
+        "user_rights": len(re.findall(r"access|delete|opt.?out|control|consent", lower)),
+    }
+    lower_txt = text.lower()
+    num_sentences = text.count(".") or 1
+    features = {
+        "length_chars": len(text),
+        "num_sentences": num_sentences,
+        "avg_sentence_length": len(text.split()) / num_sentences,
+        "num_risks": len(summary.get("risks", [])),
+        "uses_third_party": 1 if "third party" in lower_txt or "third-party" in lower_txt else 0,
+        "mentions_cookies": 1 if "cookie" in lower_txt else 0,
+        "mentions_data_sale": 1 if "sell" in lower_txt or "sale of data" in lower_txt else 0,
+        "mentions_tracking": 1 if "track" in lower_txt or "analytics" in lower_txt else 0,
+    }
+    return counts, features
+
+
+def after(text: str, summary: dict):
+    # The two public entry points, as the scan pipeline calls them
+    return model_service.extract_features(text), extract_features(text, summary)
+
+
+def best_of(fn, *args, runs: int = 3):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 5, 20], help="policy sizes in MB")
+    args = parser.parse_args(argv)
+    print(f"{'size':>7} {'before':>9} {'after':>9} {'speedup':>8}  identical")
+    for size in args.sizes:
+        text = synthetic_policy(size)
+        old_s, old = best_of(before, text, {})
+        new_s, new = best_of(after, text, {})
+        print(f"{size:>5g}MB {old_s * 1000:>7.0f}ms {new_s * 1000:>7.0f}ms {old_s / new_s:>7.2f}x  {old == new}")
+
+
+if __name__ == "__main__":
+    main()
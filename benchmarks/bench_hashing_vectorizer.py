@@ -0,0 +1,146 @@
+"""
+Throughput and peak RSS of vectorizing one large policy: the streaming hashing
+vectorizer against the TfidfVectorizer pickle it replaces (and the vocabulary
+artifact exported from that). Each (vectorizer, size) runs in a fresh
+subprocess, so peaks do not mix; peak RSS is measured above what the
+loaded vectorizer and the input text already take.
+
+    python -m benchmarks.bench_hashing_vectorizer [--sizes 1 5 10] [--vectorizer models/vectorizer.pkl]
+
+Without `--vectorizer`, a (1,2)-gram TfidfVectorizer is fitted on a synthetic
+corpus (the training data is not in the repo). Needs scikit-learn and joblib.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+CORPUS_DOCS = 200
+CORPUS_DOC_CHARS = 20_000
+VOCABULARY_WORDS = 20_000
+
+
+def words(seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    return np.array(["".join(rng.choice(letters, rng.integers(2, 10))) for _ in range(VOCABULARY_WORDS)])
+
+
+def synthetic_text(vocabulary: np.ndarray, chars: int, rng) -> str:
+    # Common words drawn more often, so most terms are in the vocabulary, as with real policies
+    ranks = np.minimum(rng.zipf(1.2, chars // 6), len(vocabulary)) - 1
+    return " ".join(vocabulary[ranks])[:chars]
+
+
+def prepare(directory: str, vectorizer_path: str = None):
+    """Write the vectorizers being compared under `directory` and return their paths."""
+    import joblib
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from backend.utils.model_artifacts import export_tfidf, fit_hashing_vectorizer
+
+    vocabulary, rng = words(), np.random.default_rng(1)
+    corpus = [synthetic_text(vocabulary, CORPUS_DOC_CHARS, rng) for _ in range(CORPUS_DOCS)]
+    if vectorizer_path:
+        sklearn_vectorizer = joblib.load(vectorizer_path)
+    else:
+        sklearn_vectorizer = TfidfVectorizer(ngram_range=(1, 2)).fit(corpus)
+        vectorizer_path = os.path.join(directory, "vectorizer.pkl")
+        joblib.dump(sklearn_vectorizer, vectorizer_path)
+    export_tfidf(sklearn_vectorizer, os.path.join(directory, "tfidf"))
+    fit_hashing_vectorizer(corpus, os.path.join(directory, "hashing"),
+                           ngram_range=tuple(sklearn_vectorizer.ngram_range),
+                           lowercase=sklearn_vectorizer.lowercase, token_pattern=sklearn_vectorizer.token_pattern)
+    print(f"vectorizer: {len(sklearn_vectorizer.vocabulary_)} terms, ngram_range={sklearn_vectorizer.ngram_range}")
+    return {"sklearn pickle": vectorizer_path,
+            "tfidf artifact": os.path.join(directory, "tfidf"),
+            "hashing": os.path.join(directory, "hashing")}
+
+
+def load(path: str):
+    if path.endswith(".pkl"):
+        import joblib
+        return joblib.load(path)
+    from backend.utils.model_artifacts import load_artifact
+    return load_artifact(path)
+
+
+def _status_kb(field: str) -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def _reset_peak() -> int:
+    """Current RSS in KB, after resetting the peak to it where Linux allows, so loading is not counted."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return _status_kb("VmRSS")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _peak_kb() -> int:
+    try:
+        return _status_kb("VmHWM")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def worker(path: str, text_path: str):
+    vectorizer = load(path)
+    vectorizer.transform(["warm up the tokenizer and numpy"])
+    with open(text_path, encoding="utf-8") as f:
+        text = f.read()
+    baseline = _reset_peak()
+    started = time.perf_counter()
+    rows = vectorizer.transform([text])
+    elapsed = time.perf_counter() - started
+    nonzero = rows.nnz if hasattr(rows, "nnz") else len(rows.data)
+    print(json.dumps({"seconds": elapsed, "peak_mb": (_peak_kb() - baseline) / 1024, "nonzero": int(nonzero)}))
+
+
+def measure(path: str, text_path: str):
+    out = subprocess.run([sys.executable, "-m", "benchmarks.bench_hashing_vectorizer", "--worker", path, text_path],
+                         capture_output=True, text=True)
+    if out.returncode != 0:
+        return None, out.stderr.strip().splitlines()[-1]
+    return json.loads(out.stdout.strip().splitlines()[-1]), None
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 5, 10], help="policy sizes in MB")
+    parser.add_argument("--vectorizer", help="a fitted TfidfVectorizer pickle to compare against")
+    parser.add_argument("--worker", nargs=2, metavar=("VECTORIZER", "TEXT"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.worker:
+        worker(*args.worker)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        methods = prepare(tmp, args.vectorizer)
+        vocabulary, rng = words(), np.random.default_rng(2)
+        print(f"{'size':>6} {'vectorizer':<15} {'time':>8} {'MB/s':>6} {'peak rss':>9} {'nonzero':>8}")
+        for size in args.sizes:
+            text_path = os.path.join(tmp, f"policy_{size}.txt")
+            with open(text_path, "w", encoding="utf-8") as f:
+                f.write(synthetic_text(vocabulary, int(size * 1024 * 1024), rng))
+            for name, path in methods.items():
+                result, error = measure(path, text_path)
+                if result is None:
+                    print(f"{size:>4g}MB {name:<15} failed: {error}")
+                    continue
+                print(f"{size:>4g}MB {name:<15} {result['seconds'] * 1000:>6.0f}ms {size / result['seconds']:>6.1f} "
+                      f"{result['peak_mb']:>7.1f}MB {result['nonzero']:>8}")
+
+
+if __name__ == "__main__":
+    main()
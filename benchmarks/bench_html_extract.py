@@ -0,0 +1,113 @@
+"""
+Peak RSS and time of HTML-to-text extraction: the streaming extractor against
+the BeautifulSoup path it replaced (whole body decoded, full tree built). Each
+method runs in a fresh subprocess so peaks do not mix. BeautifulSoup is no
+longer a dependency; install beautifulsoup4 to include it.
+
+    python -m benchmarks.bench_html_extract [--sizes 1 5]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+PAGE_PART = (
+    "<div class='section'><h2>Sharing</h2><p>We share your personal information with "
+    "third-party partners and advertisers &amp; analytics providers.</p>"
+    "<script>var t = {a: 1, b: [1, 2, 3]};</script><style>.x{color:red}</style>"
+    "<img src='https://px.tracker.example/p.gif'><nav><a href='/'>Home</a></nav></div>\n"
+)
+
+
+def write_page(path: str, size_mb: float):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<html><head><title>Privacy Policy</title></head><body>")
+        for _ in range(int(size_mb * 1024 * 1024 / len(PAGE_PART))):
+            f.write(PAGE_PART)
+        f.write("</body></html>")
+
+
+def run_streaming(path: str):
+    from backend.utils.html_stream import extract_html, HTML_CHUNK_SIZE
+
+    def chunks():
+        with open(path, "rb") as f:
+            while chunk := f.read(HTML_CHUNK_SIZE):
+                yield chunk
+
+    text, resources = extract_html(chunks(), max_bytes=1 << 40)
+    return len(text), len(resources)
+
+
+def run_beautifulsoup(path: str):
+    from bs4 import BeautifulSoup
+
+    # As the old fallback did: the whole body as text (requests' response.text), then a full tree
+    with open(path, "rb") as f:
+        body = f.read().decode("utf-8")
+    soup = BeautifulSoup(body, "html.parser")
+    resources = [el["src"] for el in soup.select("script[src], iframe[src], img[src]")]
+    for tag in soup(["script", "style", "nav"]):
+        tag.decompose()
+    return len(soup.get_text(separator=" ", strip=True)), len(resources)
+
+
+METHODS = {"streaming": run_streaming, "beautifulsoup": run_beautifulsoup}
+
+
+def _peak_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def worker(method: str, path: str):
+    fn = METHODS[method]
+    # Imports happen inside fn; warm them up on a tiny page so they are not measured
+    tiny = path + ".tiny"
+    write_page(tiny, 0.001)
+    fn(tiny)
+    os.remove(tiny)
+    baseline = _peak_kb()
+    started = time.perf_counter()
+    text_chars, resources = fn(path)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({"seconds": elapsed, "peak_mb": (_peak_kb() - baseline) / 1024,
+                      "text_chars": text_chars, "resources": resources}))
+
+
+def measure(method: str, path: str):
+    out = subprocess.run([sys.executable, "-m", "benchmarks.bench_html_extract", "--worker", method, path],
+                         capture_output=True, text=True)
+    if out.returncode != 0:
+        return None, out.stderr.strip().splitlines()[-1]
+    return json.loads(out.stdout.strip().splitlines()[-1]), None
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 5], help="page sizes in MB")
+    parser.add_argument("--worker", nargs=2, metavar=("METHOD", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.worker:
+        worker(*args.worker)
+        return
+
+    print(f"{'size':>7} {'method':<14} {'time':>9} {'peak rss':>10} {'text chars':>11} {'resources':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = os.path.join(tmp, f"page_{size}.html")
+            write_page(path, size)
+            for method in METHODS:
+                result, error = measure(method, path)
+                if result is None:
+                    print(f"{size:>5g}MB {method:<14} skipped: {error}")
+                    continue
+                print(f"{size:>5g}MB {method:<14} {result['seconds'] * 1000:>7.0f}ms {result['peak_mb']:>8.1f}MB "
+                      f"{result['text_chars']:>11} {result['resources']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Cold start of the API: interpreter plus `import backend.main`, time until the
+lifespan has started and requests are accepted, and how long each registered
+service then took to warm up in the background. Each run is a fresh
+subprocess, so nothing is cached between runs but the OS page cache.
+
+    python -m benchmarks.bench_startup [--runs 5] [--settle 30] [--imports 15]
+
+Services still loading after `--settle` seconds (the database, without a
+reachable MongoDB) are reported as such. `--imports` lists the slowest
+modules under `python -X importtime`.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+
+def worker(settle: float):
+    started = time.perf_counter()
+    import backend.main as main
+    from backend.utils.service_registry import registry, PENDING, LOADING
+
+    imported = time.perf_counter()
+
+    async def cold_start():
+        async with main.lifespan(main.app):
+            accepting = time.perf_counter()
+            deadline = time.monotonic() + settle
+            while time.monotonic() < deadline:
+                if all(s["state"] not in (PENDING, LOADING) for s in registry.status()["services"].values()):
+                    break
+                await asyncio.sleep(0.05)
+            return accepting, registry.status()
+
+    accepting, status = asyncio.run(cold_start())
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "accepting_ms": (accepting - started) * 1000,
+        "services": status["services"],
+    }))
+
+
+def measure(settle: float):
+    out = subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--worker", str(settle)],
+                         capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1])
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(n: int) -> list:
+    """(cumulative ms, module) of the `n` slowest top-level imports under `-X importtime`."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import backend.main"],
+                         capture_output=True, text=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Only what backend.main imports directly (nesting is indented two spaces a level)
+        if name.startswith("   ") and not name.startswith("     "):
+            rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:n]
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--settle", type=float, default=30, help="seconds to wait for background warm-up")
+    parser.add_argument("--imports", type=int, default=15, help="slowest imports to list; 0 skips")
+    parser.add_argument("--worker", type=float, metavar="SETTLE", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.worker is not None:
+        worker(args.worker)
+        return
+
+    runs = [measure(args.settle) for _ in range(args.runs)]
+    print(f"{args.runs} cold starts, median (min-max):")
+    for key, label in (("import_ms", "import backend.main"),
+                       ("accepting_ms", "import until accepting requests")):
+        values = [run[key] for run in runs]
+        print(f"  {label:<34} {statistics.median(values):>8.0f}ms ({min(values):.0f}-{max(values):.0f})")
+
+    print("background warm-up (last run):")
+    for name, service in runs[-1]["services"].items():
+        load = f"{service['load_ms']:.0f}ms" if service["load_ms"] is not None else "-"
+        error = f"  {service['error']}" if service["error"] else ""
+        print(f"  {name:<14} {service['state']:<8} {load:>8}{error[:80]}")
+
+    if args.imports:
+        print("slowest imports of backend.main (cumulative):")
+        for ms, module in slowest_imports(args.imports):
+            print(f"  {ms:>8.1f}ms {module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Classify a million hostnames with the compiled tracker index: index build time,
+lookups per second for tracker lookup and eTLD+1, and how many were trackers.
+
+    python -m benchmarks.bench_tracker_index [--hosts 1000000] [--extra-domains 50000]
+
+`--extra-domains` pads the ruleset with made-up domains, as EasyPrivacy would
+(see `python -m backend.utils.tracker_lists fetch`), to show lookups do not slow with its size.
+"""
+import argparse
+import json
+import random
+import time
+from backend.utils.tracker_index import TRACKER_RULES_PATH, TrackerIndex, load_tracker_index
+from backend.utils.tracker_lists import merge_rules
+
+SITE_LABELS = "www cdn static img api app m shop blog news mail assets media".split()
+SITE_NAMES = "example acme shopfast newsdaily cloudhost bigretail travelco mybank foodapp social".split()
+SITE_TLDS = "com net org io co.uk com.au de fr co.jp github.io".split()
+
+
+def hostnames(index, n: int, tracker_share: float = 0.3, seed: int = 0) -> list:
+    """Mix of subdomains of listed tracker domains and of made-up first-party sites."""
+    rng = random.Random(seed)
+    trackers = sorted({domain for domains in index.owner_domains.values() for domain in domains})
+    hosts = []
+    for _ in range(n):
+        if rng.random() < tracker_share:
+            base = rng.choice(trackers)
+        else:
+            base = f"{rng.choice(SITE_NAMES)}{rng.randrange(10000)}.{rng.choice(SITE_TLDS)}"
+        depth = rng.randrange(3)
+        hosts.append(".".join([rng.choice(SITE_LABELS) for _ in range(depth)] + [base]))
+    return hosts
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=1_000_000)
+    parser.add_argument("--rules", default=TRACKER_RULES_PATH, help="tracker rules JSON")
+    parser.add_argument("--extra-domains", type=int, default=0, help="synthetic tracker domains to add")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    index = load_tracker_index(args.rules)
+    if args.extra_domains:
+        rng = random.Random(1)
+        extra = {f"t{rng.randrange(10 ** 9)}.{rng.choice(SITE_TLDS)}" for _ in range(args.extra_domains)}
+        with open(args.rules, encoding="utf-8") as f:
+            rules = merge_rules(json.load(f), extra, index.suffixes)
+        started = time.perf_counter()
+        index = TrackerIndex(rules, index.suffixes)
+    print(f"index: {len(index)} tracker domains, built in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    hosts = hostnames(index, args.hosts)
+    started = time.perf_counter()
+    matches = sum(1 for host in hosts if index.lookup(host) is not None)
+    lookup_s = time.perf_counter() - started
+    started = time.perf_counter()
+    sites = {index.registrable_domain(host) for host in hosts}
+    etld_s = time.perf_counter() - started
+
+    print(f"lookup:  {len(hosts)} hosts in {lookup_s:.2f}s ({len(hosts) / lookup_s / 1e6:.2f}M/s), {matches} trackers")
+    print(f"eTLD+1:  {len(hosts)} hosts in {etld_s:.2f}s ({len(hosts) / etld_s / 1e6:.2f}M/s), {len(sites)} sites")
+
+
+if __name__ == "__main__":
+    main()
@@ -47,40 +47,40 @@
       summary = { url: policyUrl, summary: "Backend scan failed", trackers: [], cookies: [], classification: "Unknown", score: 0.0 };
     }
 
-    // Detect trackers on page
-    const trackerList = [];
-    const seenTrackers = new Set();
-    const pageHostname = location.hostname.toLowerCase();
-
-    // Helper to process elements
-    function processElement(el, tag) {
-      if (!el.src || el.src.includes(pageHostname)) return;
+    // Classify the hosts this page loads from with the backend's tracker list, so the
+    // extension reports the same trackers as a scan (unlisted hosts are third-party, not trackers)
+    const hosts = new Set();
+    document.querySelectorAll("script[src], iframe[src], img[src]").forEach(el => {
       const domain = getDomain(el.src);
-      if (!domain) return;
-      const name = getTrackerName(el.src, domain);
-      if (!name) return;
-      const key = `${name}:${domain}`;
-      if (seenTrackers.has(key)) return;
-      seenTrackers.add(key);
-      const category = ['google', 'facebook', 'doubleclick', 'ads', 'pixel'].some(k => domain.toLowerCase().includes(k)) ? "Analytics" : "Unknown";
-      trackerList.push({ name, category, blocked: false, source: tag, domain });
+      if (domain) hosts.add(domain);
+    });
+    let pageTrackers = [];
+    let thirdParty = [];
+    try {
+      const res = await fetch(`${backend}/scan/classify`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ url: location.href, hosts: Array.from(hosts) })
+      });
+      if (!res.ok) {
+        throw new Error(`Classify request failed with status ${res.status}`);
+      }
+      const classified = (await res.json()).data || {};
+      pageTrackers = classified.trackers || [];
+      thirdParty = classified.third_party || [];
+    } catch (e) {
+      console.error("Failed to classify page trackers:", e.message);
     }
 
-    // Scripts
-    Array.from(document.querySelectorAll("script[src]")).forEach(s => processElement(s, "script"));
-    // Iframes
-    Array.from(document.querySelectorAll("iframe[src]")).forEach(f => processElement(f, "iframe"));
-    // Images
-    Array.from(document.querySelectorAll("img[src]")).forEach(i => processElement(i, "img"));
-
     // Merge trackers, avoiding duplicates
-    const existingTrackers = (summary.trackers || []).map(t => `${t.name.toLowerCase()}:${t.domain || t.name.toLowerCase()}`);
-    const uniqueTrackers = trackerList.filter(t => !existingTrackers.includes(`${t.name.toLowerCase()}:${t.domain.toLowerCase()}`));
+    const existingTrackers = new Set((summary.trackers || []).map(t => (t.domain || t.name || "").toLowerCase()));
+    const uniqueTrackers = pageTrackers.filter(t => !existingTrackers.has(t.domain.toLowerCase()));
     summary.trackers = [...(summary.trackers || []), ...uniqueTrackers];
+    summary.third_party = Array.from(new Set([...(summary.third_party || []), ...thirdParty]));
 
     // Log unique trackers
-    console.log(`Frontend detected ${uniqueTrackers.length} unique trackers:`);
-    uniqueTrackers.forEach(t => console.log(`- ${t.name} (${t.category}, ${t.source}, ${t.domain})`));
+    console.log(`Page loads ${uniqueTrackers.length} more trackers and ${thirdParty.length} other third-party sites:`);
+    uniqueTrackers.forEach(t => console.log(`- ${t.name} (${t.category}, ${t.domain})`));
     console.log(`Total trackers: ${summary.trackers.length}`);
 
     // Save updated summary
@@ -106,18 +106,4 @@
       return hostname;
     }
   }
-
-  // Helper: extract readable tracker name
-  function getTrackerName(url, domain) {
-    try {
-      const hostname = new URL(url).hostname.toLowerCase();
-      const base = hostname.replace("www.", "").split(".")[0];
-      if (base === location.hostname.toLowerCase().replace("www.", "").split(".")[0]) return null;
-      return base || "unknown";
-    } catch {
-      const parts = url.split("/");
-      const lastPart = parts[parts.length - 1]?.split("?")[0];
-      return lastPart && !lastPart.includes(domain) ? lastPart : domain.split(".")[0] || "unknown";
-    }
-  }
 })();
\ No newline at end of file
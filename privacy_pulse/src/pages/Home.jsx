@@ -21,49 +21,47 @@ export default function Home() {
     averageScore: 0,
     totalCookies: 0,
   });
+  const [classifications, setClassifications] = useState({});
 
   useEffect(() => {
-    fetch("https://privacypulse-backend.onrender.com/api/dashboard/history")
+    // Totals come from the server-side rollups; only the map needs individual scans
+    fetch("https://privacypulse-backend.onrender.com/api/dashboard/stats")
       .then((res) => res.json())
       .then((data) => {
-        const arrData = Array.isArray(data) ? data : [data];
-        setPolicyData(arrData);
-
-        const websitesAnalyzed = arrData.length;
-        const avgScore =
-          arrData.reduce((sum, item) => sum + (item.score || 0), 0) /
-          (websitesAnalyzed || 1);
-        const totalCookies = arrData.reduce(
-          (sum, item) => sum + (item.cookies ? item.cookies.length : 0),
-          0
-        );
-
         setStats({
-          websitesAnalyzed,
-          averageScore: Math.round(avgScore),
-          totalCookies,
+          websitesAnalyzed: data.scans || 0,
+          averageScore: Math.round(data.average_score || 0),
+          totalCookies: data.cookies || 0,
         });
+        setClassifications(data.classifications || {});
       })
+      .catch((err) => console.error("Error fetching dashboard stats:", err));
+
+    fetch("https://privacypulse-backend.onrender.com/api/dashboard/history?limit=50")
+      .then((res) => res.json())
+      .then((data) => setPolicyData(Array.isArray(data) ? data : [data]))
       .catch((err) => console.error("Error fetching dashboard data:", err));
   }, [location]);
 
   const handleZoomIn = () => setZoom((z) => Math.min(z + 0.2, 4));
   const handleZoomOut = () => setZoom((z) => Math.max(z - 0.2, 1));
 
+  const safeScans = classifications.Safe || 0;
   const mapStats = [
-    { title: "Total Threats", value: policyData.length, icon: Activity },
+    { title: "Total Threats", value: stats.websitesAnalyzed, icon: Activity },
     {
       title: "High-Risk Countries",
-      value: policyData.filter((t) => t.classification !== "Safe").length,
+      value: Object.values(classifications).reduce((sum, count) => sum + count, 0) - safeScans,
       icon: Shield,
     },
     {
       title: "Safe Countries",
-      value: policyData.filter((t) => t.classification === "Safe").length,
+      value: safeScans,
       icon: Globe,
     },
   ];
 
+  // Markers plot the most recent scans only
   const markers = policyData
     .map((item) => {
       if (!item.geo || !item.geo.latitude || !item.geo.longitude) return null;
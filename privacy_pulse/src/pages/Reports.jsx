@@ -15,11 +15,15 @@ export default function Reports() {
   useEffect(() => {
     const fetchReports = async () => {
       try {
-        const res = await fetch("https://privacypulse-backend.onrender.com/api/dashboard/history");
-        const data = await res.json();
+        const [pageRes, statsRes] = await Promise.all([
+          fetch("https://privacypulse-backend.onrender.com/api/dashboard/history/page?limit=50"),
+          fetch("https://privacypulse-backend.onrender.com/api/dashboard/stats"),
+        ]);
+        const { items } = await pageRes.json();
+        const stats = await statsRes.json();
 
-        const formatted = data.map((doc) => ({
-          id: doc._id.$oid,
+        const formatted = items.map((doc) => ({
+          id: doc._id,
           date: new Date(doc.created_at).toLocaleDateString(),
           domain: new URL(doc.url).hostname,
           score: doc.score,
@@ -34,16 +38,15 @@ export default function Reports() {
         setReports(formatted);
         setFilteredReports(formatted);
 
-        // Metrics
-        const totalScore = data.reduce((acc, doc) => acc + doc.score, 0);
-        const avgScore = data.length ? Math.round(totalScore / data.length) : 0;
+        // Metrics cover every scan, from the server-side rollups
+        const avgScore = Math.round(stats.average_score || 0);
 
         setMetrics([
           { title: "Privacy Score", value: avgScore + "%", color: "from-cyan-400 to-blue-400" },
           { title: "Data Shared", value: Math.round(100 - avgScore) + "%", color: "from-yellow-400 to-orange-400" },
-          { title: "Third-Party Trackers", value: data.filter(d => d.trackers.length).length, color: "from-purple-400 to-pink-400" },
-          { title: "Cookies Detected", value: data.filter(d => d.cookies.length).length, color: "from-green-400 to-emerald-400" },
-          { title: "High Risk Sites", value: data.filter(d => d.score > 50).length, color: "from-red-400 to-rose-500" },
+          { title: "Third-Party Trackers", value: stats.scans_with_trackers || 0, color: "from-purple-400 to-pink-400" },
+          { title: "Cookies Detected", value: stats.cookies || 0, color: "from-green-400 to-emerald-400" },
+          { title: "High Risk Sites", value: stats.high_risk || 0, color: "from-red-400 to-rose-500" },
         ]);
 
         setLoading(false);
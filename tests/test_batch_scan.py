@@ -0,0 +1,57 @@
+"""Batch scheduling across hosts and de-duplication of URLs that reach the same policy."""
+import asyncio
+from types import SimpleNamespace
+import pytest
+from backend.services import batch_scan
+
+
+@pytest.fixture
+def batch(monkeypatch):
+    """Run a batch with a fake scanner; returns the result lines and the order scans started in."""
+    started = []
+
+    async def run_scan(url, persist=True):
+        started.append(url)
+        await asyncio.sleep(0.05)
+        # A bare domain finds its policy on the usual fallback path
+        return {"url": url if "/privacy" in url else url.rstrip("/") + "/privacy"}
+
+    async def get_or_scan(url, scan_fn, refresh_fn=None):
+        return await scan_fn()
+
+    async def save_scan_results(docs):
+        pass
+
+    monkeypatch.setattr(batch_scan, "run_scan", run_scan)
+    monkeypatch.setattr(batch_scan, "scan_cache", SimpleNamespace(get_or_scan=get_or_scan))
+    monkeypatch.setattr(batch_scan, "save_scan_results", save_scan_results)
+    monkeypatch.setattr(batch_scan, "BATCH_CONCURRENCY", 2)
+    monkeypatch.setattr(batch_scan, "BATCH_PER_HOST_CONCURRENCY", 1)
+    monkeypatch.setattr(batch_scan, "BATCH_HOST_DELAY", 0)
+
+    def run(urls):
+        async def collect():
+            return [line async for line in batch_scan.run_batch(urls)]
+        lines = asyncio.run(collect())
+        return sorted(lines, key=lambda line: line["index"]), started
+    return run
+
+
+def test_busy_host_does_not_hold_other_workers(batch):
+    urls = ["https://a.example/1", "https://a.example/2", "https://a.example/3", "https://b.example/1"]
+    lines, started = batch(urls)
+    assert [line["status"] for line in lines] == ["done"] * 4
+    # b.example starts alongside the first a.example scan instead of queueing behind all three
+    assert started.index("https://b.example/1") == 1
+
+
+def test_urls_resolving_to_the_same_policy_are_scanned_once(batch):
+    lines, started = batch([
+        "https://acme.example",
+        "http://www.acme.example/privacy/",
+        "https://acme.example/",
+    ])
+    assert started == ["https://acme.example"]
+    assert [(line["status"], line.get("duplicate_of")) for line in lines] == [
+        ("done", None), ("duplicate", 0), ("duplicate", 0),
+    ]
@@ -0,0 +1,39 @@
+"""BrowserPool checkout when the browser misbehaves."""
+import asyncio
+import pytest
+from backend.services.browser_pool import BrowserPool
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+
+    async def new_page(self):
+        raise RuntimeError("Target page, context or browser has been closed")
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+
+    def is_connected(self):
+        return True
+
+    async def new_context(self, **kwargs):
+        self.contexts.append(FakeContext())
+        return self.contexts[-1]
+
+
+def test_context_closed_when_new_page_fails():
+    pool = BrowserPool(max_pages=1)
+    pool._browser = FakeBrowser()
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            async with pool.page():
+                pass
+    asyncio.run(main())
+    assert [context.closed for context in pool._browser.contexts] == [True]
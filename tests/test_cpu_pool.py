@@ -0,0 +1,47 @@
+"""CpuPool with a real worker process: page extraction, LLM JSON parsing and the in-flight count."""
+import asyncio
+import time
+import pytest
+from backend.utils.cpu_pool import CpuPool, extract_page, parse_json
+from backend.utils.executor import run_blocking
+
+PAGE = b"<html><body><nav>Menu</nav><p>We sell your data.</p><img src='https://px.example/p.gif'></body></html>"
+
+
+def test_extract_page_in_worker():
+    async def main():
+        pool = CpuPool(workers=1, queue_limit=2)
+        await pool.start()
+        try:
+            page = await pool.run(extract_page, PAGE, "utf-8")
+            slow = [asyncio.create_task(pool.run(time.sleep, 0.2)) for _ in range(3)]
+            await asyncio.sleep(0.1)
+            peak = pool.in_flight
+            await asyncio.gather(*slow)
+            return page, peak, pool.in_flight
+        finally:
+            await pool.stop()
+    page, peak, after = asyncio.run(main())
+    assert page == ("We sell your data.", [{"src": "https://px.example/p.gif", "tag": "img"}])
+    # Bounded by queue_limit, counted without touching the semaphore's internals
+    assert peak == 2 and after == 0
+
+
+def test_call_from_blocking_thread():
+    async def main():
+        pool = CpuPool(workers=1, queue_limit=2)
+        await pool.start()
+        try:
+            parsed = await run_blocking(pool.call, parse_json, '{"summary": "ok"}')
+            with pytest.raises(ValueError):
+                await run_blocking(pool.call, parse_json, "not json")
+            return parsed, pool.stats()
+        finally:
+            await pool.stop()
+    parsed, stats = asyncio.run(main())
+    assert parsed == {"summary": "ok"}
+    assert stats["completed"] == 1 and stats["failed"] == 1 and stats["in_flight"] == 0
+
+
+def test_call_runs_inline_without_workers():
+    assert CpuPool(workers=0).call(parse_json, "[1, 2]") == [1, 2]
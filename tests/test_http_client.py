@@ -0,0 +1,162 @@
+"""HttpClient and the streaming HTTP capture against a local stand-in server."""
+import asyncio
+import http.server
+import threading
+import time
+from types import SimpleNamespace
+import httpx
+import pytest
+from backend.services.http_client import HttpClient
+from backend.utils import page_capture
+
+POLICY_PAGE = (
+    b"<html><body><nav>Menu</nav><h1>Privacy Policy</h1><p>We share data with partners.</p>"
+    b"<script src='https://www.google-analytics.com/analytics.js'></script>"
+    b"<script>var ignored = 1;</script></body></html>"
+)
+
+
+class StandIn(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.client_address, dict(self.headers)))
+        if self.path == "/policy":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("ETag", '"v1"')
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self._send(POLICY_PAGE, etag='"v1"')
+        elif self.path == "/big":
+            self._send(b"<p>" + b"x" * (1024 * 1024) + b"</p>")
+        elif self.path.startswith("/slow"):
+            with server.lock:
+                server.active += 1
+                server.peak = max(server.peak, server.active)
+            time.sleep(0.1)
+            with server.lock:
+                server.active -= 1
+            self._send(b"ok")
+        else:
+            self._send(b"not found", status=404)
+
+    def _send(self, body: bytes, status: int = 200, etag: str = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    srv.requests, srv.lock, srv.active, srv.peak = [], threading.Lock(), 0, 0
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    srv.base = f"http://127.0.0.1:{srv.server_port}"
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture(autouse=True)
+def reset(server):
+    server.requests.clear()
+    server.peak = 0
+
+
+def run(coro_fn):
+    async def main():
+        client = HttpClient(max_connections=10, max_per_host=2, timeout=5)
+        try:
+            return await coro_fn(client)
+        finally:
+            await client.close()
+    return asyncio.run(main())
+
+
+def test_connections_are_reused(server):
+    async def fetch(client):
+        for _ in range(5):
+            (await client.get(f"{server.base}/policy", conditional=False)).raise_for_status()
+    run(fetch)
+    assert len(server.requests) == 5
+    assert len({address for _, address, _ in server.requests}) == 1
+
+
+def test_unchanged_resource_is_revalidated(server):
+    async def fetch(client):
+        first = await client.get(f"{server.base}/policy")
+        second = await client.get(f"{server.base}/policy")
+        return first, second, client.revalidated
+    first, second, revalidated = run(fetch)
+    assert not first.from_cache and second.from_cache
+    assert second.status_code == 200 and second.content == first.content == POLICY_PAGE
+    assert revalidated == 1
+    assert server.requests[1][2].get("If-None-Match") == '"v1"'
+
+
+def test_body_is_capped(server):
+    async def fetch(client):
+        return await client.get(f"{server.base}/big", max_bytes=1000)
+    assert len(run(fetch).content) == 1000
+
+
+def test_per_host_limit(server):
+    async def fetch(client):
+        await asyncio.gather(*(client.get(f"{server.base}/slow/{i}", conditional=False) for i in range(6)))
+        return client._hosts
+    hosts = run(fetch)
+    assert server.peak == 2
+    # Semaphores of idle hosts are dropped
+    assert hosts == {}
+
+
+def test_http_capture_streams_into_parser(server, monkeypatch):
+    async def capture(client):
+        monkeypatch.setattr(page_capture, "http_client", client)
+        return await page_capture._capture_with_http(f"{server.base}/policy")
+    result = run(capture)
+    assert result.source == "http" and result.status == 200
+    assert "We share data with partners." in result.text
+    assert "Menu" not in result.text and "ignored" not in result.text
+    assert [r.domain for r in result.resources] == ["www.google-analytics.com"]
+
+
+def test_http_capture_raises_on_error_status(server, monkeypatch):
+    async def capture(client):
+        monkeypatch.setattr(page_capture, "http_client", client)
+        return await page_capture._capture_with_http(f"{server.base}/missing")
+    with pytest.raises(httpx.HTTPStatusError):
+        run(capture)
+
+
+def test_capture_page_revalidates_unchanged_policy(server, monkeypatch):
+    async def no_browser(url):
+        raise RuntimeError("no browser here")
+
+    async def no_sleep(seconds):
+        pass
+
+    async def capture(client):
+        monkeypatch.setattr(page_capture, "http_client", client)
+        monkeypatch.setattr(page_capture, "_capture_with_playwright", no_browser)
+        monkeypatch.setattr(page_capture, "asyncio", SimpleNamespace(sleep=no_sleep))
+        first = await page_capture.capture_page(f"{server.base}/policy")
+        second = await page_capture.capture_page(f"{server.base}/policy")
+        return first, second, client.revalidated
+    first, second, revalidated = run(capture)
+    assert revalidated == 1
+    assert server.requests[1][2].get("If-None-Match") == '"v1"'
+    assert second.source == "http" and second.status == 200
+    assert second.text == first.text and "We share data with partners." in second.text
+    assert second.resources == first.resources
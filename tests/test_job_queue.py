@@ -0,0 +1,61 @@
+"""JobQueue: stage events for coalesced jobs, and running without MongoDB."""
+import asyncio
+from types import SimpleNamespace
+import pytest
+from backend.services import job_queue as job_queue_module
+from backend.services.job_queue import JobQueue, MemoryJobStore, MongoJobStore
+from backend.services.scan_cache import ScanResultCache
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    """A fake pipeline that reports two stages; returns the list of URLs actually scanned."""
+    scanned = []
+
+    async def run_scan(url, on_stage=None, persist=True):
+        scanned.append(url)
+        if on_stage:
+            await on_stage("fetch", "started", None)
+        await asyncio.sleep(0.1)
+        if on_stage:
+            await on_stage("fetch", "done", 100.0)
+        return {"url": url, "summary": "ok"}
+
+    monkeypatch.setattr(job_queue_module, "run_scan", run_scan)
+    monkeypatch.setattr(job_queue_module, "scan_cache", ScanResultCache())
+    return scanned
+
+
+def test_coalesced_jobs_all_get_stage_events(scans):
+    async def main():
+        queue = JobQueue(MemoryJobStore(), workers=3)
+        await queue.start()
+        try:
+            first = await queue.submit("https://acme.example")
+            await asyncio.sleep(0.05)  # joins after the scan reported its first stage
+            ids = [first] + [await queue.submit("https://acme.example/") for _ in range(2)]
+            return [await queue.wait(job_id, timeout=2) for job_id in ids]
+        finally:
+            await queue.stop()
+    jobs = asyncio.run(main())
+    assert len(scans) == 1
+    for job in jobs:
+        assert job["status"] == "done"
+        assert [(e["stage"], e["status"]) for e in job["events"]] == [("fetch", "started"), ("fetch", "done")]
+
+
+def test_falls_back_to_memory_without_mongo(scans):
+    async def ping(command):
+        raise ConnectionError("no server")
+
+    async def main():
+        queue = JobQueue(MongoJobStore(SimpleNamespace(database=SimpleNamespace(command=ping))), workers=1)
+        await queue.start()
+        try:
+            job = await queue.wait(await queue.submit("https://acme.example"), timeout=2)
+            return queue.store, job
+        finally:
+            await queue.stop()
+    store, job = asyncio.run(main())
+    assert isinstance(store, MemoryJobStore)
+    assert job["status"] == "done" and job["result"]["summary"] == "ok"
@@ -0,0 +1,78 @@
+"""ResilientLLMClient: what the circuit breaker sees and what the rate limits are charged for."""
+import threading
+import time
+import pytest
+from backend.services import llm_client
+from backend.services.llm_client import CircuitOpenError, FakeLLMClient, ResilientLLMClient, RetryableLLMError
+
+
+class InvalidArgument(Exception):
+    """Named like the google.api_core error for a bad request or API key; not retryable."""
+
+
+class BlockingClient(llm_client.LLMClient):
+    """Every call hangs, ignoring its timeout, until `release` is set."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+
+    def generate(self, prompt, max_output_tokens=1500, timeout=None):
+        self.calls += 1
+        self.release.wait()
+        return "late"
+
+
+def test_open_circuit_does_not_use_quota():
+    client = ResilientLLMClient(FakeLLMClient(latency=0), rpm=1, tpm=0, max_retries=0)
+    for _ in range(client.breaker.failure_threshold):
+        client.breaker.record_failure()
+    for _ in range(3):
+        with pytest.raises(CircuitOpenError):
+            client.generate("prompt", timeout=0.2)
+    client.breaker.record_success()
+    # The bucket's single request is still there; had a rejected call taken it, this would time out
+    assert client.generate("prompt", timeout=0.2)
+    assert client.inner.calls == 1
+
+
+def test_non_retryable_errors_open_the_circuit(monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_BREAKER_THRESHOLD", 2)
+    client = ResilientLLMClient(FakeLLMClient(latency=0, fail_every=1, error=InvalidArgument), rpm=0, tpm=0)
+    for _ in range(2):
+        with pytest.raises(InvalidArgument):
+            client.generate("prompt")
+    with pytest.raises(CircuitOpenError):
+        client.generate("prompt")
+    # Not retried either: one call each
+    assert client.inner.calls == 2
+
+
+def test_hedge_without_token_quota_is_not_sent_or_charged():
+    prompt, max_output_tokens = "prompt " * 100, 100
+    cost = llm_client.estimate_tokens(prompt, max_output_tokens)
+    # Room for two requests, but tokens for only the first
+    client = ResilientLLMClient(FakeLLMClient(latency=0.2), rpm=2, tpm=cost, hedge_after=0.05, max_retries=0)
+    assert client.generate(prompt, max_output_tokens)
+    assert client.stats["hedges"] == 0 and client.inner.calls == 1
+    assert client.requests.try_acquire(1) == 0
+
+
+def test_abandoned_attempts_are_capped():
+    inner = BlockingClient()
+    client = ResilientLLMClient(inner, rpm=0, tpm=0, call_timeout=0.05, max_retries=0, max_abandoned=1)
+    try:
+        with pytest.raises(TimeoutError):
+            client.generate("prompt")
+        assert not client.available()
+        # Fails fast rather than queueing another thread behind the hung call
+        with pytest.raises(RetryableLLMError):
+            client.generate("prompt")
+        assert inner.calls == 1
+    finally:
+        inner.release.set()
+    for _ in range(50):
+        if client.available():
+            break
+        time.sleep(0.01)
+    assert client.available() and client.stats["abandoned"] == 1
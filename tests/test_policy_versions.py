@@ -0,0 +1,86 @@
+"""Which policy edits re-summarize the delta and which keep the previous summary."""
+import asyncio
+from types import SimpleNamespace
+import pytest
+from backend.services import policy_versions
+from backend.utils.analyze_policy import PROMPT_VERSION
+
+POLICY = [
+    "Acme Privacy Policy",
+    "This policy explains how Acme handles information when you use our website and apps.",
+    "We do not sell your data.",
+    "You will recieve a notice by email when this policy is updated.",
+    "Contact us at privacy@acme.example with any questions about this document.",
+    "This policy was last reviewed by our team at the beginning of the year.",
+]
+PREVIOUS_SUMMARY = {"summary": "previous"}
+
+
+@pytest.fixture
+def summarize(monkeypatch):
+    """Run summarize_with_history on `new` with POLICY stored as the previous version."""
+    calls = []
+
+    async def get_policy_version(key):
+        paragraphs = policy_versions.split_paragraphs(stored_text)
+        return {
+            "hashes": [policy_versions.paragraph_hash(p) for p in paragraphs],
+            "paragraphs": paragraphs,
+            "summary": PREVIOUS_SUMMARY,
+            "prompt_version": PROMPT_VERSION,
+        }
+
+    async def save_policy_version(key, doc):
+        pass
+
+    async def cached_process_policy(text):
+        calls.append("full")
+        return {"summary": "full"}
+
+    def process_policy_update(summary, added, removed):
+        calls.append(("delta", added, removed))
+        return {"summary": "delta"}
+
+    async def put(key, summary):
+        pass
+
+    monkeypatch.setattr(policy_versions, "get_policy_version", get_policy_version)
+    monkeypatch.setattr(policy_versions, "save_policy_version", save_policy_version)
+    monkeypatch.setattr(policy_versions, "cached_process_policy", cached_process_policy)
+    monkeypatch.setattr(policy_versions, "process_policy_update", process_policy_update)
+    monkeypatch.setattr(policy_versions, "get_summarizer", lambda: SimpleNamespace(name="gemini"))
+    monkeypatch.setattr(policy_versions, "is_cacheable", lambda summary: True)
+    monkeypatch.setattr(policy_versions, "summary_cache", SimpleNamespace(put=put))
+
+    stored_text = ""
+
+    def run(old: str, new: str):
+        nonlocal stored_text
+        stored_text = old
+        calls.clear()
+        summary, changes = asyncio.run(policy_versions.summarize_with_history("https://acme.example/privacy", new))
+        return summary, changes, list(calls)
+    return run
+
+
+@pytest.mark.parametrize("separator", ["\n", " "], ids=["paragraphs", "flattened"])
+def test_short_risk_edit_is_resummarized(summarize, separator):
+    old = separator.join(POLICY)
+    new = old.replace("We do not sell your data.", "We sell your data.")
+    summary, changes, calls = summarize(old, new)
+    assert changes["status"] == "changed" and changes["resummarized"] == "delta"
+    assert summary == {"summary": "delta"}
+    assert "We sell your data." in calls[0][1]
+
+
+def test_typo_fix_keeps_previous_summary(summarize):
+    old = "\n".join(POLICY)
+    summary, changes, calls = summarize(old, old.replace("recieve", "receive"))
+    assert changes["status"] == "changed" and changes["resummarized"] == "none"
+    assert summary is PREVIOUS_SUMMARY and calls == []
+
+
+def test_changed_words_counts_words_not_characters():
+    diff = policy_versions.diff_paragraphs(["a"], ["We do not sell your data."], ["b"], ["We sell your data."])
+    assert policy_versions.changed_words(diff) == 2  # "do not"
+    assert policy_versions.touches_risk_topic(diff)
@@ -0,0 +1,21 @@
+"""Tracker classification of the hosts a page loads from, with the bundled ruleset."""
+from backend.utils.web_scanner import classify_hosts
+
+
+def test_only_listed_hosts_are_trackers():
+    trackers, third_party = classify_hosts("https://www.example.com/", [
+        "cdn.example.com",
+        "www.google-analytics.com",
+        "ssl.google-analytics.com",
+        "cdnjs.cloudflare.com",
+        "static.unlisted-widgets.io",
+    ])
+    assert [(t["domain"], t["owner"], t["category"]) for t in trackers] == [
+        ("www.google-analytics.com", "Google", "Analytics"),
+    ]
+    assert third_party == ["cloudflare.com", "unlisted-widgets.io"]
+
+
+def test_company_domains_are_first_party():
+    trackers, third_party = classify_hosts("https://www.facebook.com/", ["connect.facebook.net", "static.xx.fbcdn.net"])
+    assert trackers == [] and third_party == []